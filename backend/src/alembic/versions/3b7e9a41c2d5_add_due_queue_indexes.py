@@ -0,0 +1,42 @@
+"""Add due queue indexes
+
+Revision ID: 3b7e9a41c2d5
+Revises: dc32d17d6179
+Create Date: 2026-10-18 10:02:13.415208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e9a41c2d5'
+down_revision: Union[str, Sequence[str], None] = 'dc32d17d6179'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # decks_flashcards(deck_id, flashcard_id) is already covered by the primary key.
+    op.create_index(
+        'ix_progress_user_id_next_review_date',
+        'progress',
+        ['user_id', 'next_review_date'],
+        unique=False,
+        postgresql_include=['flashcard_id'],
+    )
+    op.create_index(
+        'ix_decks_flashcards_flashcard_id_deck_id',
+        'decks_flashcards',
+        ['flashcard_id', 'deck_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_decks_flashcards_flashcard_id_deck_id', table_name='decks_flashcards')
+    op.drop_index('ix_progress_user_id_next_review_date', table_name='progress')
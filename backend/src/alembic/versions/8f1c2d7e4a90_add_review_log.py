@@ -0,0 +1,43 @@
+"""Add review log
+
+Revision ID: 8f1c2d7e4a90
+Revises: 3b7e9a41c2d5
+Create Date: 2026-10-18 10:21:47.902318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f1c2d7e4a90'
+down_revision: Union[str, Sequence[str], None] = '3b7e9a41c2d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('review_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('flashcard_id', sa.Integer(), nullable=False),
+    sa.Column('quality', sa.Integer(), nullable=False),
+    sa.Column('reviewed_at', sa.DateTime(), nullable=False),
+    sa.Column('previous_review_date', sa.DateTime(), nullable=True),
+    sa.Column('interval', sa.Integer(), nullable=False),
+    sa.Column('efactor', sa.Float(), nullable=False),
+    sa.Column('repetition', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_review_log_reviewed_at', 'review_log', ['reviewed_at'], unique=False, postgresql_using='brin')
+    op.create_index('ix_review_log_user_id_reviewed_at', 'review_log', ['user_id', 'reviewed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_review_log_user_id_reviewed_at', table_name='review_log')
+    op.drop_index('ix_review_log_reviewed_at', table_name='review_log')
+    op.drop_table('review_log')
@@ -0,0 +1,41 @@
+"""Store revocation key hashes in expired_tokens
+
+Revision ID: a7e3f9b2c615
+Revises: c4d1e6f8a213
+Create Date: 2026-10-18 11:32:40.284913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3f9b2c615'
+down_revision: Union[str, Sequence[str], None] = 'c4d1e6f8a213'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DELETE FROM expired_tokens WHERE expiration_date <= now() AT TIME ZONE 'utc'")
+    # tokens revoked so far have no jti, their key is the hash of the whole token
+    op.execute(
+        "UPDATE expired_tokens "
+        "SET token_value = encode(sha256(convert_to(token_value, 'UTF8')), 'hex')"
+    )
+    op.alter_column('expired_tokens', 'token_value',
+               existing_type=sa.VARCHAR(),
+               type_=sa.String(length=64),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # hashes cannot be turned back into tokens, revoked tokens stay hashed
+    op.alter_column('expired_tokens', 'token_value',
+               existing_type=sa.String(length=64),
+               type_=sa.VARCHAR(),
+               existing_nullable=False)
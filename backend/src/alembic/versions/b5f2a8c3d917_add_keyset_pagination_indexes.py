@@ -0,0 +1,48 @@
+"""Add keyset pagination indexes
+
+Revision ID: b5f2a8c3d917
+Revises: e2b8c5d1f604
+Create Date: 2026-10-18 13:05:41.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5f2a8c3d917'
+down_revision: Union[str, Sequence[str], None] = 'e2b8c5d1f604'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # decks, flashcards and users are paginated by their primary key.
+    op.create_index(
+        'ix_comments_deck_id_creation_date_id',
+        'comments',
+        ['deck_id', 'creation_date', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_comments_author_id_creation_date_id',
+        'comments',
+        ['author_id', 'creation_date', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_reports_creation_date_id',
+        'reports',
+        ['creation_date', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reports_creation_date_id', table_name='reports')
+    op.drop_index('ix_comments_author_id_creation_date_id', table_name='comments')
+    op.drop_index('ix_comments_deck_id_creation_date_id', table_name='comments')
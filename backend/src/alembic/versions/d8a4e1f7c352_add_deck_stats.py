@@ -0,0 +1,61 @@
+"""Add deck stats
+
+Revision ID: d8a4e1f7c352
+Revises: f3c9d2a6b801
+Create Date: 2026-10-18 14:31:27.804953
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a4e1f7c352'
+down_revision: Union[str, Sequence[str], None] = 'f3c9d2a6b801'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('deck_stats',
+    sa.Column('deck_id', sa.Integer(), nullable=False),
+    sa.Column('flashcards_count', sa.Integer(), nullable=False),
+    sa.Column('media_flashcards_count', sa.Integer(), nullable=False),
+    sa.Column('saves_count', sa.Integer(), nullable=False),
+    sa.Column('comments_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['deck_id'], ['decks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('deck_id')
+    )
+    op.create_index('ix_deck_stats_saves_count_deck_id', 'deck_stats', ['saves_count', 'deck_id'], unique=False)
+
+    # Backfill from the link tables (same as app.tools.db.deck_stats.rebuild_deck_stats).
+    op.execute("""
+        INSERT INTO deck_stats (deck_id, flashcards_count, media_flashcards_count, saves_count, comments_count)
+        SELECT
+            d.id,
+            (SELECT count(*) FROM decks_flashcards df WHERE df.deck_id = d.id),
+            (SELECT count(*)
+               FROM decks_flashcards df
+               JOIN flashcards f ON f.id = df.flashcard_id
+              WHERE df.deck_id = d.id
+                AND EXISTS (SELECT 1 FROM flashcard_sides_media m
+                             WHERE m.flashcard_side_id IN (f.front_side_id, f.back_side_id))),
+            (SELECT count(*) FROM saved_decks s WHERE s.deck_id = d.id),
+            (SELECT count(*) FROM comments c WHERE c.deck_id = d.id AND NOT c.is_deleted)
+        FROM decks d
+    """)
+    # has_media was only computed when a deck was created
+    op.execute("""
+        UPDATE decks SET has_media = s.media_flashcards_count > 0
+        FROM deck_stats s
+        WHERE s.deck_id = decks.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_deck_stats_saves_count_deck_id', table_name='deck_stats')
+    op.drop_table('deck_stats')
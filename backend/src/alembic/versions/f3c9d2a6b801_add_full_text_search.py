@@ -0,0 +1,91 @@
+"""Add full text search
+
+Revision ID: f3c9d2a6b801
+Revises: b5f2a8c3d917
+Create Date: 2026-10-18 13:48:09.562310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9d2a6b801'
+down_revision: Union[str, Sequence[str], None] = 'b5f2a8c3d917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Adding a stored generated column rewrites the table; run outside peak hours.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column('decks', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.add_column('flashcards', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple'::regconfig, coalesce(name, ''))", persisted=True),
+        nullable=True,
+    ))
+    op.add_column('flashcard_sides', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple'::regconfig, coalesce(content, ''))", persisted=True),
+        nullable=True,
+    ))
+
+    op.create_index('ix_decks_search_vector', 'decks', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(
+        'ix_decks_name_trgm',
+        'decks',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+    op.create_index('ix_flashcards_search_vector', 'flashcards', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(
+        'ix_flashcards_name_trgm',
+        'flashcards',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+    # content matches are joined back to flashcards by side id
+    op.create_index('ix_flashcards_front_side_id', 'flashcards', ['front_side_id'], unique=False)
+    op.create_index('ix_flashcards_back_side_id', 'flashcards', ['back_side_id'], unique=False)
+    op.create_index(
+        'ix_flashcard_sides_search_vector',
+        'flashcard_sides',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_flashcard_sides_search_vector', table_name='flashcard_sides')
+    op.drop_index('ix_flashcards_back_side_id', table_name='flashcards')
+    op.drop_index('ix_flashcards_front_side_id', table_name='flashcards')
+    op.drop_index('ix_flashcards_name_trgm', table_name='flashcards')
+    op.drop_index('ix_flashcards_search_vector', table_name='flashcards')
+    op.drop_index('ix_decks_name_trgm', table_name='decks')
+    op.drop_index('ix_decks_search_vector', table_name='decks')
+    op.drop_column('flashcard_sides', 'search_vector')
+    op.drop_column('flashcards', 'search_vector')
+    op.drop_column('decks', 'search_vector')
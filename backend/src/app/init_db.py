@@ -2,6 +2,7 @@ from datetime import datetime
 from sqlmodel import Session
 from .tools.auth.hash import hash_password
 from .database import engine
+from .tools.db.deck_stats import rebuild_deck_stats
 
 from .models import (
     Media,
@@ -359,6 +360,11 @@ def init_data():
         ])
         session.commit()
 
+        # --------------------------
+        # Deck statistics (listings join decks with their stats row)
+        # --------------------------
+        rebuild_deck_stats(session)
+
         print("Database initialized with sample data!")
 
 
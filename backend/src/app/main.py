@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from typing import Union
 
 from fastapi import FastAPI, Depends
@@ -5,10 +6,32 @@ from fastapi.staticfiles import StaticFiles
 
 from app.routers import authentication, decks, flashcards, media, learn, comments, reports, users
 from app.tools.auth.authenticate import authenticate
+from app.tools.auth.keys import get_key_set
+from app.tools.auth.last_login import last_login_writer
+from app.tools.auth.refresh import refresh_token_purge_task
+from app.tools.auth.revocation import revocation_cache, token_purge_task
+from app.tools.learn.review_log import review_log_writer
 from fastapi.middleware.cors import CORSMiddleware
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # fail at startup, not on the first login, if signing keys are misconfigured
+    get_key_set()
+    review_log_writer.start()
+    last_login_writer.start()
+    revocation_cache.start()
+    token_purge_task.start()
+    refresh_token_purge_task.start()
+    yield
+    refresh_token_purge_task.stop()
+    token_purge_task.stop()
+    revocation_cache.stop()
+    last_login_writer.stop()
+    review_log_writer.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Routers
 app.include_router(authentication.router)
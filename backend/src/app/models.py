@@ -1,4 +1,6 @@
-from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint
+from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint, Index
+from sqlalchemy import Column, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped
 
 from typing import Optional, List
@@ -53,12 +55,20 @@ class DeckFlashcard(SQLModel, table=True):
     Attributes:
         deck_id (int): Foreign key referencing decks.id. Part of the composite primary key.
         flashcard_id (int): Foreign key referencing flashcards.id. Part of the composite primary key.
+
+    Notes:
+        - The primary key covers lookups by deck, ix_decks_flashcards_flashcard_id_deck_id
+          covers the reverse direction (decks containing a flashcard).
     """
     __tablename__ = "decks_flashcards"
 
     deck_id: int = Field(foreign_key="decks.id", primary_key=True)
     flashcard_id: int = Field(foreign_key="flashcards.id", primary_key=True)
 
+    __table_args__ = (
+        Index("ix_decks_flashcards_flashcard_id_deck_id", "flashcard_id", "deck_id"),
+    )
+
 
 class DeckTag(SQLModel, table=True):
     """
@@ -295,6 +305,10 @@ class FlashcardSide(SQLModel, table=True):
     Relationships:
         media (List[Media]): Media items attached to this flashcard side
             (many-to-many via FlashcardSideMedia).
+
+    Notes:
+        - search_vector is a generated tsvector of content with a GIN index, used by
+          app.tools.db.search. It is not mapped, so it is never loaded with the rows.
     """
     __tablename__ = "flashcard_sides"
 
@@ -306,6 +320,16 @@ class FlashcardSide(SQLModel, table=True):
         back_populates="flashcard_sides", link_model=FlashcardSideMedia
     )
 
+    __table_args__ = (
+        Column(
+            "search_vector",
+            TSVECTOR,
+            Computed("to_tsvector('simple'::regconfig, coalesce(content, ''))", persisted=True),
+        ),
+        Index("ix_flashcard_sides_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
 
 class Media(SQLModel, table=True):
     """
@@ -371,6 +395,8 @@ class Flashcard(SQLModel, table=True):
           should reference distinct FlashcardSide rows representing each side's content.
         - The explicit sa_relationship_kwargs foreign_keys strings are necessary to disambiguate
           relationships when multiple columns reference the same target table.
+        - search_vector is a generated tsvector of name with a GIN index; name also has a
+          trigram index for substring and fuzzy matches (see app.tools.db.search).
     """
     __tablename__ = "flashcards"
 
@@ -399,6 +425,24 @@ class Flashcard(SQLModel, table=True):
     )
     progress: Mapped[List["Progress"]] = Relationship(back_populates="flashcard")
 
+    __table_args__ = (
+        Column(
+            "search_vector",
+            TSVECTOR,
+            Computed("to_tsvector('simple'::regconfig, coalesce(name, ''))", persisted=True),
+        ),
+        Index("ix_flashcards_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_flashcards_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index("ix_flashcards_front_side_id", "front_side_id"),
+        Index("ix_flashcards_back_side_id", "back_side_id"),
+    )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
 
 class Tag(SQLModel, table=True):
     """
@@ -454,6 +498,11 @@ class Deck(SQLModel, table=True):
         tags (List[Tag]): Tags assigned to this deck (many-to-many via DeckTag).
         saved_by_users (List[User]): Users who saved this deck (via SavedDeck).
         comments (List[Comment]): Comments left on this deck.
+
+    Notes:
+        - search_vector is a generated tsvector of name (weight A) and description
+          (weight B) with a GIN index; name also has a trigram index for substring
+          and fuzzy matches (see app.tools.db.search).
     """
     __tablename__ = "decks"
 
@@ -477,6 +526,60 @@ class Deck(SQLModel, table=True):
     )
     comments: Mapped[List["Comment"]] = Relationship(back_populates="deck")
 
+    __table_args__ = (
+        Column(
+            "search_vector",
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        ),
+        Index("ix_decks_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_decks_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
+
+class DeckStats(SQLModel, table=True):
+    """
+    Counters of a Deck, maintained incrementally by the endpoints changing them.
+    Listings read these counters (and sort by popularity) instead of
+    aggregating the link tables per request.
+
+    Attributes:
+        deck_id (int): Primary key and foreign key referencing decks.id.
+        flashcards_count (int): Number of flashcards in the deck.
+        media_flashcards_count (int): Number of flashcards in the deck with media on any side.
+        saves_count (int): Number of users who saved the deck.
+        comments_count (int): Number of comments (including replies) that are not deleted.
+
+    Notes:
+        - Every deck has exactly one row, created together with the deck and
+          deleted with it (ON DELETE CASCADE).
+        - Deck.has_media mirrors media_flashcards_count > 0.
+        - Counters are changed with relative UPDATEs (see app.tools.db.deck_stats),
+          so concurrent requests do not overwrite each other; rebuild_deck_stats
+          recomputes them from the link tables.
+    """
+    __tablename__ = "deck_stats"
+
+    deck_id: int = Field(foreign_key="decks.id", primary_key=True, ondelete="CASCADE")
+    flashcards_count: int = Field(default=0)
+    media_flashcards_count: int = Field(default=0)
+    saves_count: int = Field(default=0)
+    comments_count: int = Field(default=0)
+
+    __table_args__ = (
+        Index("ix_deck_stats_saves_count_deck_id", "saves_count", "deck_id"),
+    )
+
 
 class Progress(SQLModel, table=True):
     """
@@ -493,6 +596,8 @@ class Progress(SQLModel, table=True):
         repetition (int): Number of consecutive successful repetitions.
         correct_answers (int): Total correct answers recorded for this card.
         incorrect_answers (int): Total incorrect answers recorded for this card.
+        stability (Optional[float]): FSRS memory stability in days (None until reviewed with FSRS).
+        difficulty (Optional[float]): FSRS difficulty, 1–10 (None until reviewed with FSRS).
         user_id (int): Foreign key referencing users.id (owner of this progress entry).
         flashcard_id (int): Foreign key referencing flashcards.id (the flashcard tracked).
 
@@ -504,6 +609,8 @@ class Progress(SQLModel, table=True):
         - interval is stored in minutes to keep resolution consistent across the app.
         - efactor should typically be >= 1; adjust according to your scheduling logic.
         - Use last_review_date/next_review_date (UTC) when computing due items.
+        - ix_progress_user_id_next_review_date serves the due-card queries: a
+          range scan over one user's rows in next_review_date order.
     """
     __tablename__ = "progress"
 
@@ -515,6 +622,8 @@ class Progress(SQLModel, table=True):
     repetition: int = Field(default=0)
     correct_answers: int = Field(default=0)
     incorrect_answers: int = Field(default=0)
+    stability: Optional[float] = None  # FSRS, in days
+    difficulty: Optional[float] = None  # FSRS
     user_id: int = Field(foreign_key="users.id")
     flashcard_id: int = Field(foreign_key="flashcards.id")
 
@@ -524,6 +633,55 @@ class Progress(SQLModel, table=True):
     
     __table_args__ = (
         UniqueConstraint('user_id', 'flashcard_id', name='uq_user_flashcard'),
+        Index(
+            "ix_progress_user_id_next_review_date",
+            "user_id",
+            "next_review_date",
+            postgresql_include=["flashcard_id"],
+        ),
+    )
+
+
+class ReviewLog(SQLModel, table=True):
+    """
+    Append-only history of flashcard reviews.
+    Every applied review adds one row; rows are never updated. The log feeds
+    analytics and tuning of the scheduling algorithm, while Progress only keeps
+    the current state.
+
+    Attributes:
+        id (Optional[int]): Primary key, auto-generated.
+        user_id (int): Id of the reviewing user (users.id).
+        flashcard_id (int): Id of the reviewed flashcard (flashcards.id).
+        quality (int): The quality of the review response (typically 0–5).
+        reviewed_at (datetime): UTC timestamp of the review.
+        previous_review_date (Optional[datetime]): UTC timestamp of the preceding review, if any.
+        interval (int): Interval in minutes scheduled by this review.
+        efactor (float): Ease factor after this review.
+        repetition (int): Consecutive successful repetitions after this review.
+
+    Notes:
+        - user_id/flashcard_id intentionally have no foreign keys, so old rows can be
+          archived by reviewed_at and deleting a flashcard keeps its history.
+        - Rows are written in batches (see app.tools.learn.review_log), not per request.
+        - reviewed_at has a BRIN index on PostgreSQL: rows arrive roughly in time order,
+          which keeps time-range scans cheap at a fraction of a B-tree's size.
+    """
+    __tablename__ = "review_log"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int
+    flashcard_id: int
+    quality: int
+    reviewed_at: datetime
+    previous_review_date: Optional[datetime] = None
+    interval: int  # in minutes
+    efactor: float
+    repetition: int
+
+    __table_args__ = (
+        Index("ix_review_log_reviewed_at", "reviewed_at", postgresql_using="brin"),
+        Index("ix_review_log_user_id_reviewed_at", "user_id", "reviewed_at"),
     )
 
 
@@ -570,6 +728,11 @@ class Comment(SQLModel, table=True):
     )
     children: Mapped[List["Comment"]] = Relationship(back_populates="parent")
 
+    __table_args__ = (
+        Index("ix_comments_deck_id_creation_date_id", "deck_id", "creation_date", "id"),
+        Index("ix_comments_author_id_creation_date_id", "author_id", "creation_date", "id"),
+    )
+
 
 class Report(SQLModel, table=True):
     """
@@ -631,6 +794,10 @@ class Report(SQLModel, table=True):
         sa_relationship_kwargs={"foreign_keys": "[Report.moderator_id]"},
     )
 
+    __table_args__ = (
+        Index("ix_reports_creation_date_id", "creation_date", "id"),
+    )
+
 
 ####################################################
 # ------------------ Other Tables ------------------#
@@ -641,14 +808,44 @@ class ExpireTokens(SQLModel, table=True):
     This model maps to the "expired_tokens" table and is intended to record tokens
     that should no longer be accepted (for example, revoked access or refresh tokens).
     Use this table to check whether a given token value has been marked as expired.
+    Rows past their expiration date are deleted by a background purge job.
 
     Attributes:
         id (Optional[int]): Primary key, auto-generated.
-        token_value (str): The token string/value to mark as expired.
+        token_value (str): Revocation key of the token: SHA-256 hex digest of its
+            `jti` claim (or of the whole token for tokens issued without `jti`).
         expiration_date (datetime): UTC timestamp when the token becomes/was invalid.
     """
     __tablename__ = "expired_tokens"
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    token_value: str = Field(index=True)
+    token_value: str = Field(index=True, max_length=64)
+    expiration_date: datetime
+
+
+class RefreshToken(SQLModel, table=True):
+    """
+    Represents a long-lived refresh token used to obtain new access tokens.
+    Refresh tokens are opaque random strings; only their SHA-256 hash is stored.
+    Every use rotates the token: the used row is marked as revoked and a new
+    token of the same family is issued. Presenting an already revoked token
+    means it was stolen or replayed, so the whole family is revoked.
+
+    Attributes:
+        id (Optional[int]): Primary key, auto-generated.
+        user_id (int): Foreign key to users.id.
+        token_hash (str): SHA-256 hex digest of the token.
+        family_id (str): Identifier shared by all tokens rotated from one login.
+        creation_date (datetime): UTC timestamp of issue.
+        expiration_date (datetime): UTC timestamp after which the token is rejected.
+        revoked (bool): True once the token was used, logged out or its family revoked.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id", index=True)
+    token_hash: str = Field(max_length=64, unique=True)
+    family_id: str = Field(max_length=32, index=True)
+    creation_date: datetime
     expiration_date: datetime
+    revoked: bool = False
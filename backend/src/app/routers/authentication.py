@@ -1,14 +1,30 @@
 from typing import Optional
 
 from datetime import datetime
-from fastapi import HTTPException, Depends, APIRouter
+from fastapi import HTTPException, Depends, APIRouter, Response
 from pydantic import BaseModel, EmailStr
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import joinedload
 from sqlmodel import Session, or_
 
 from ..models import User
 from app.database import get_session
-from app.tools.auth.hash import hash_password, verify_password
+from app.tools.auth.hash import hash_password, hashing_pool, needs_rehash, verify_password
 from app.tools.auth.jwt_handler import generate_token, invalidate_token
+from app.tools.auth.keys import get_key_set
+from app.tools.auth.last_login import last_login_writer
+from app.tools.auth.rate_limit import (
+    LOGIN_FAILURE_LIMIT,
+    LOGIN_IP_LIMIT,
+    REGISTER_IP_LIMIT,
+    rate_limit,
+    rate_limiter,
+)
+from app.tools.auth.refresh import (
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
 from app.tools.auth.validation import check_password
 from app.tools.auth.authenticate import authenticate
 
@@ -27,8 +43,16 @@ class UserLoginDTO(BaseModel):
     password: str
 
 
+class RefreshTokenDTO(BaseModel):
+    refresh_token: str
+
+
 @router.post("/register")
-def register(user: UserRegisterDTO, db: Session = Depends(get_session)):
+def register(
+    user: UserRegisterDTO,
+    db: Session = Depends(get_session),
+    _: None = Depends(rate_limit(REGISTER_IP_LIMIT)),
+):
     user_data = user.dict()
     user_data.update(
         {
@@ -45,41 +69,56 @@ def register(user: UserRegisterDTO, db: Session = Depends(get_session)):
         raise HTTPException(status_code=400, detail={"errors": password_errors})
 
     user_data["password"] = hash_password(user_data["password"])
-    user_entry = (
-        db.query(User)
-        .filter(
-            or_(
-                User.email == user_data["email"], User.username == user_data["username"]
-            )
-        )
-        .first()
-    )
 
-    if user_entry:
+    # the unique indexes on username and email detect duplicates, also under concurrent signups
+    new_user_id = db.execute(
+        insert(User)
+        .values(**user_data)
+        .on_conflict_do_nothing()
+        .returning(User.id)
+    ).scalar()
+
+    if new_user_id is None:
+        db.rollback()
         raise HTTPException(
             status_code=409, detail="User with this username or mail already exists."
         )
 
-    new_user = User(**user_data)
-    db.add(new_user)
+    refresh_token = issue_refresh_token(new_user_id, db)
     db.commit()
-    db.refresh(new_user)
 
-    return {"token": generate_token(f"{new_user.id}")}
+    return {"token": generate_token(f"{new_user_id}"), "refresh_token": refresh_token}
 
 
 @router.post("/login")
-def login(user: UserLoginDTO, db: Session = Depends(get_session)):
+def login(
+    user: UserLoginDTO,
+    db: Session = Depends(get_session),
+    _: None = Depends(rate_limit(LOGIN_IP_LIMIT)),
+):
+    identifier = user.login.lower()
+    rate_limiter.ensure_available(LOGIN_FAILURE_LIMIT, identifier)
+
     user_entry = (
         db.query(User)
+        .options(joinedload(User.roles))
         .filter(or_(User.username == user.login, User.email == user.login))
         .first()
     )
 
     if not user_entry:
+        rate_limiter.record(LOGIN_FAILURE_LIMIT, identifier)
         raise HTTPException(status_code=404, detail="User not found")
 
-    verify_password(user_entry.password, user.password)
+    try:
+        verify_password(user_entry.password, user.password)
+    except HTTPException as e:
+        if e.status_code == 401:
+            rate_limiter.record(LOGIN_FAILURE_LIMIT, identifier)
+        raise
+
+    if needs_rehash(user_entry.password):
+        user_entry.password = hash_password(user.password)
 
     is_mod = False
     for role in user_entry.roles:
@@ -87,14 +126,50 @@ def login(user: UserLoginDTO, db: Session = Depends(get_session)):
             is_mod = True
             break
 
-    return {"token": generate_token(f"{user_entry.id}"), "is_mod": is_mod}
+    user_id = user_entry.id
+    refresh_token = issue_refresh_token(user_id, db)
+    db.commit()
+    last_login_writer.add((user_id, datetime.utcnow()))
+
+    return {
+        "token": generate_token(f"{user_id}"),
+        "refresh_token": refresh_token,
+        "is_mod": is_mod,
+    }
+
+
+@router.post("/refresh")
+def refresh(body: RefreshTokenDTO, db: Session = Depends(get_session)):
+    user_id, refresh_token = rotate_refresh_token(body.refresh_token, db)
+
+    return {"token": generate_token(f"{user_id}"), "refresh_token": refresh_token}
 
 
 @router.post("/logout")
-def logout(token: str = Depends(invalidate_token)):
+def logout(
+    body: Optional[RefreshTokenDTO] = None,
+    token: str = Depends(invalidate_token),
+    db: Session = Depends(get_session),
+):
+    if body is not None:
+        revoke_refresh_token(body.refresh_token, db)
+        db.commit()
+
     return {"message": f"token {token} invalidated"}
 
 
 @router.get("/check_token")
 def check_token(user_id = Depends(authenticate())):
-    return {"message": f"Valid token for user: {user_id}"}
\ No newline at end of file
+    return {"message": f"Valid token for user: {user_id}"}
+
+
+@router.get("/hashing-stats")
+def get_hashing_stats(_: int = Depends(authenticate(["MODERATOR"]))):
+    return hashing_pool.stats()
+
+
+@router.get("/.well-known/jwks.json")
+def get_jwks(response: Response):
+    # empty when tokens are signed with HS256, the secret is never published
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return get_key_set().jwks
@@ -8,6 +8,9 @@ from sqlmodel import Session, and_
 
 from app.database import get_session
 from app.tools.auth.authenticate import authenticate
+from app.tools.db.counting import COUNT_PATTERN, count_total
+from app.tools.db.deck_stats import adjust_deck_stats
+from app.tools.db.pagination import Keyset, paginate
 from app.models import Comment, Deck
 
 
@@ -36,8 +39,10 @@ class CommentGetDTO(BaseModel):
 
 
 class CommentGetAllDTO(BaseModel):
-    total_number: int
+    total_number: Optional[int] = None
     comments: list[CommentGetDTO]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
     class Config:
         from_attributes = True
@@ -78,6 +83,7 @@ def create_comment(
     )
 
     db.add(new_comment)
+    adjust_deck_stats(db, [new_comment.deck_id], comments_count=1)
     db.commit()
     db.refresh(new_comment)
 
@@ -94,6 +100,8 @@ def get_comments(
     max_depth: int = Query(-1, description="How many replies in tree"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query("exact", pattern=COUNT_PATTERN, description="exact, cached, estimate or none"),
     sort: Optional[str] = Query("desc", pattern="^(asc|desc)$"),
     # db
     db: Session = Depends(get_session),
@@ -107,21 +115,21 @@ def get_comments(
         and_(Comment.deck_id == deck_id, Comment.parent_id == None)
     )
 
-    total_number = comments.count()
+    total_number = count_total(comments, count)
 
-    if sort == "desc":
-        comments = comments.order_by(Comment.creation_date.desc())
-    else:
-        comments = comments.order_by(Comment.creation_date.asc())
-
-    offset = (page - 1) * page_size
-    comments = comments.offset(offset).limit(page_size).all()
+    keyset = Keyset(Comment.creation_date, Comment.id, descending=sort == "desc")
+    comments, next_cursor = paginate(comments, keyset, page, page_size, cursor)
 
     comments_dtos = [
         create_comment_dto(c, only_root_comments, max_depth) for c in comments
     ]
 
-    return {"total_number": total_number, "comments": comments_dtos}
+    return {
+        "total_number": total_number,
+        "comments": comments_dtos,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
 
 
 @router.get("/mycomments", response_model=CommentGetAllDTO)
@@ -131,6 +139,8 @@ def get_my_comments(
     # query params
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query("exact", pattern=COUNT_PATTERN, description="exact, cached, estimate or none"),
     sort: Optional[str] = Query("desc", pattern="^(asc|desc)$"),
     only_root_comments: bool = Query(False, description="Return only root comments"),
     max_depth: int = Query(-1, description="How many replies in tree"),
@@ -141,21 +151,21 @@ def get_my_comments(
 
     comments = db.query(Comment).filter(Comment.author_id == user_id)
 
-    total_number = comments.count()
+    total_number = count_total(comments, count)
 
-    if sort == "desc":
-        comments = comments.order_by(Comment.creation_date.desc())
-    else:
-        comments = comments.order_by(Comment.creation_date.asc())
-
-    offset = (page - 1) * page_size
-    comments = comments.offset(offset).limit(page_size).all()
+    keyset = Keyset(Comment.creation_date, Comment.id, descending=sort == "desc")
+    comments, next_cursor = paginate(comments, keyset, page, page_size, cursor)
 
     comments_dtos = [
         create_comment_dto(c, only_root_comments, max_depth) for c in comments
     ]
 
-    return {"total_number": total_number, "comments": comments_dtos}
+    return {
+        "total_number": total_number,
+        "comments": comments_dtos,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
 
 
 @router.get("/{comment_id}", response_model=CommentGetDTO)
@@ -191,7 +201,9 @@ def delete_comment(
             status_code=403, detail="Not authorized to delete this comment"
         )
 
-    comment.is_deleted = True
+    if not comment.is_deleted:
+        comment.is_deleted = True
+        adjust_deck_stats(db, [comment.deck_id], comments_count=-1)
     db.commit()
     return {"message": "Comment deleted successfully"}
 
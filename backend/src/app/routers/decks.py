@@ -1,13 +1,19 @@
 from typing import Optional
 
 from datetime import datetime
+from types import SimpleNamespace
 from fastapi import HTTPException, Depends, APIRouter, Query
 from pydantic import BaseModel, field_serializer
+from sqlalchemy.orm import Query as SQLQuery, selectinload
 from sqlmodel import Session, func, or_
 
-from ..models import Deck, Flashcard, Tag, User
+from ..models import Deck, DeckStats, Flashcard, Tag, User
 from app.database import get_session
 from app.tools.auth.authenticate import authenticate
+from app.tools.db.counting import COUNT_PATTERN, count_total
+from app.tools.db.deck_stats import adjust_deck_stats, create_deck_stats, flashcards_delta
+from app.tools.db.pagination import Keyset, paginate
+from app.tools.db.search import SearchMatch, search_decks
 
 router = APIRouter(prefix="/decks", tags=["decks"])
 
@@ -53,9 +59,24 @@ class DeckGetDTO(BaseModel):
         from_attributes = True
 
 
+class DeckListItemDTO(BaseModel):
+    id: int
+    name: str
+    description: str | None
+    public: bool
+    has_media: bool
+    owner_id: int
+    flashcards_count: int
+    saves_count: int
+    comments_count: int
+    tags: Optional[list[str]] = None
+
+
 class DeckGetAllDTO(BaseModel):
-    total_number: int
-    decks: list[DeckGetDTO]
+    total_number: Optional[int] = None
+    decks: list[DeckListItemDTO]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
     class Config:
         from_attributes = True
@@ -104,6 +125,9 @@ def create_deck(
 
         deck.tags.append(tag)
 
+    db.flush()
+    create_deck_stats(db, deck, flashcards)
+
     db.commit()
     db.refresh(deck)
     return create_deck_dto(deck)
@@ -120,7 +144,9 @@ def get_decks(
     flashcard_id: Optional[int] = Query(None, description="Flashcard contained in decks"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    sort: Optional[str] = Query("created_at"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query("exact", pattern=COUNT_PATTERN, description="exact, cached, estimate or none"),
+    sort: Optional[str] = Query("created_at", description='"popular" sorts by saves'),
     # db
     db: Session = Depends(get_session),
 ):
@@ -134,8 +160,9 @@ def get_decks(
     if flashcard_id:
         query = query.filter(Deck.flashcards.any(Flashcard.id == flashcard_id))
 
-    if q:
-        query = query.filter(Deck.name.ilike(f"%{q}%"))
+    match = search_decks(q) if q else None
+    if match:
+        query = query.filter(match.condition)
 
     if owner:
         query = query.join(Deck.owner).filter(User.username == owner)
@@ -149,18 +176,7 @@ def get_decks(
                 .distinct()
             )
 
-    total_number = query.count()
-
-    if sort == 1:
-        query = query.order_by(Deck.created_at.desc())
-
-    offset = (page - 1) * page_size
-    decks = query.offset(offset).limit(page_size).all()
-
-    return {
-        "total_number": total_number,
-        "decks": [create_deck_dto(deck) for deck in decks],
-    }
+    return get_deck_list_page(query, page, page_size, cursor, count, match, sort)
 
 
 @router.get("/mydecks", response_model=DeckGetAllDTO)
@@ -170,27 +186,19 @@ def get_my_decks(
     q: Optional[str] = Query(None, description="Search query"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=0, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query("exact", pattern=COUNT_PATTERN, description="exact, cached, estimate or none"),
 ):
     if not user_id:
         raise HTTPException(status_code=404, detail="User not found")
     user_id = int(user_id)
 
     query = db.query(Deck).filter(Deck.owner_id == user_id)
-    if q:
-        query = query.filter(Deck.name.ilike(f"%{q}%"))
-    
-    total_number = query.count()
-
-    if page_size > 0:
-        offset = (page - 1) * page_size
-        decks = query.offset(offset).limit(page_size).all()
-    else:
-        decks = query.all()
+    match = search_decks(q) if q else None
+    if match:
+        query = query.filter(match.condition)
 
-    return {
-        "total_number": total_number,
-        "decks": [create_deck_dto(deck) for deck in decks],
-    }
+    return get_deck_list_page(query, page, page_size, cursor, count, match)
 
 
 @router.get("/saved", response_model=DeckGetAllDTO)
@@ -199,21 +207,12 @@ def get_saved_deck(
     db: Session = Depends(get_session),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=0, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query("exact", pattern=COUNT_PATTERN, description="exact, cached, estimate or none"),
 ):
     query = db.query(Deck).join(User.saved_decks).filter(User.id == user_id)
 
-    total_number = query.count()
-
-    if page_size > 0:
-        offset = (page - 1) * page_size
-        decks = query.offset(offset).limit(page_size).all()
-    else:
-        decks = query.all()
-
-    return {
-        "total_number": total_number,
-        "decks": [create_deck_dto(deck) for deck in decks],
-    }
+    return get_deck_list_page(query, page, page_size, cursor, count)
 
 @router.get("/{deck_id}", response_model=DeckGetDTO)
 def get_deck(
@@ -296,11 +295,15 @@ def update_deck(
     flashcards_to_add = get_flashcards_by_ids(deck_data.flashcards_to_add, db)
     flashcards_to_remove = get_flashcards_by_ids(deck_data.flashcards_to_remove, db)
 
+    added = []
     for flashcard_to_add in flashcards_to_add:
         if flashcard_to_add not in deck.flashcards:
             deck.flashcards.append(flashcard_to_add)
+            added.append(flashcard_to_add)
 
+    removed = [fc for fc in deck.flashcards if fc in flashcards_to_remove]
     deck.flashcards = [fc for fc in deck.flashcards if fc not in flashcards_to_remove]
+    adjust_deck_stats(db, [deck.id], **flashcards_delta(added, removed))
 
     existing_tags_to_add = (
         db.query(Tag).filter(Tag.name.in_(deck_data.tags_to_add)).all()
@@ -365,6 +368,7 @@ def save_deck(
         return {"message": "Deck already saved"}
 
     user.saved_decks.append(deck)
+    adjust_deck_stats(db, [deck.id], saves_count=1)
 
     db.commit()
 
@@ -379,7 +383,10 @@ def remove_saved_deck(
 ):
     user = db.query(User).filter(User.id == user_id).first()
 
-    user.saved_decks = [deck for deck in user.saved_decks if deck.id != deck_id]
+    saved_decks = [deck for deck in user.saved_decks if deck.id != deck_id]
+    if len(saved_decks) != len(user.saved_decks):
+        user.saved_decks = saved_decks
+        adjust_deck_stats(db, [deck_id], saves_count=-1)
 
     db.commit()
 
@@ -404,3 +411,79 @@ def create_deck_dto(deck: Deck):
         ],
         tags=[tag.name for tag in deck.tags] if deck.tags is not None else [],
     )
+
+
+def get_deck_list_page(
+    query: SQLQuery,
+    page: int,
+    page_size: int,
+    cursor: Optional[str] = None,
+    count: str = "exact",
+    match: Optional[SearchMatch] = None,
+    sort: Optional[str] = None,
+):
+    """
+    Loads one page of a deck listing with a constant number of queries.
+
+    Runs the count, the page itself joined with the decks' DeckStats, and
+    one selectinload query for the tags of the whole page. Decks are ordered
+    by id (by relevance when searching, by saves_count with sort="popular"),
+    which allows keyset pagination with `cursor`.
+
+    Args:
+        query (SQLQuery): Filtered query of decks.
+        page (int): Page number, starting at 1 (ignored with a cursor).
+        page_size (int): Decks per page, 0 returns all decks.
+        cursor (Optional[str]): `next_cursor` of the previous page.
+        count (str): Counting strategy of "total_number" (see app.tools.db.counting).
+        match (Optional[SearchMatch]): Search the query is filtered by, orders the decks by rank.
+        sort (Optional[str]): "popular" orders the decks by saves_count.
+
+    Returns:
+        dict: "total_number", the "decks" of the page as DeckListItemDTO,
+            "next_cursor" and "has_more".
+    """
+    total_number = count_total(query, count)
+
+    # every deck has a stats row (create_deck, the deck_stats migration and
+    # init_db add them), an inner join lets sort="popular" use its index
+    query = (
+        query.join(DeckStats, DeckStats.deck_id == Deck.id)
+        .options(selectinload(Deck.tags))
+        .add_columns(DeckStats)
+    )
+
+    if sort == "popular":
+        keyset = Keyset(DeckStats.saves_count, Deck.id, descending=True)
+        entity = lambda row: SimpleNamespace(id=row[0].id, saves_count=row[1].saves_count)
+    elif match:
+        query = query.add_columns(match.rank)
+        keyset, entity = match.keyset(Deck.id), match.cursor_entity
+    else:
+        keyset, entity = Keyset(Deck.id), lambda row: row[0]
+
+    rows, next_cursor = paginate(query, keyset, page, page_size, cursor, entity=entity)
+
+    return {
+        "total_number": total_number,
+        "decks": [
+            create_deck_list_item_dto(row[0], row[1]) for row in rows
+        ],
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
+
+
+def create_deck_list_item_dto(deck: Deck, stats: DeckStats):
+    return DeckListItemDTO(
+        id=deck.id,
+        name=deck.name,
+        description=deck.description,
+        public=deck.public,
+        has_media=deck.has_media,
+        owner_id=deck.owner_id,
+        flashcards_count=stats.flashcards_count,
+        saves_count=stats.saves_count,
+        comments_count=stats.comments_count,
+        tags=[tag.name for tag in deck.tags],
+    )
@@ -3,11 +3,22 @@ from typing import Optional, List
 from datetime import datetime
 from fastapi import HTTPException, Depends, APIRouter, Query
 from pydantic import BaseModel, field_serializer
+from sqlalchemy.orm import Query as SQLQuery
 from sqlmodel import Session, func, or_
 
 from ..models import Flashcard, FlashcardSide, Tag, User, Media
 from app.database import get_session
 from app.tools.auth.authenticate import authenticate
+from app.tools.db.counting import COUNT_PATTERN, count_total
+from app.tools.db.deck_stats import (
+    adjust_deck_stats,
+    adjust_media_flashcards,
+    decks_of_flashcards,
+    flashcard_has_media,
+    flashcards_delta,
+)
+from app.tools.db.pagination import Keyset, paginate
+from app.tools.db.search import SearchMatch, search_flashcards
 
 router = APIRouter(prefix="/flashcards", tags=["flashcards"])
 
@@ -48,8 +59,10 @@ class FlashcardGetDTO(BaseModel):
 
 
 class FlashcardGetAllDTO(BaseModel):
-    total_number: int
+    total_number: Optional[int] = None
     flashcards: list[FlashcardGetDTO]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
     class Config:
         from_attributes = True
@@ -142,10 +155,13 @@ def add_media_to_flashcard_side(
             status_code=403, detail="You are not the owner of this media's flashcards"
         )
 
+    had_media = flashcard_has_media(flashcard)
     if flashcardAddMediaDTO.side == "front":
         media.flashcard_sides.append(flashcard.front_side)
     else:
         media.flashcard_sides.append(flashcard.back_side)
+    if not had_media:
+        adjust_media_flashcards(db, [flashcard.id], 1)
     db.commit()
     return "Media added successfully"
 
@@ -160,7 +176,8 @@ def get_flashcards(
     tags: Optional[str] = Query(None, description="Comma-separated tags"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    sort: Optional[str] = Query("created_at"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query("exact", pattern=COUNT_PATTERN, description="exact, cached, estimate or none"),
     # db
     db: Session = Depends(get_session),
 ):
@@ -172,8 +189,9 @@ def get_flashcards(
     # TODO? should it be
     # query = query.filter(or_(Flashcard in public deck, Flashcard.owner_id == user_id))
 
-    if q:
-        query = query.filter(Flashcard.name.ilike(f"%{q}%"))
+    match = search_flashcards(q) if q else None
+    if match:
+        query = query.filter(match.condition)
 
     if owner:
         query = query.join(Flashcard.owner).filter(User.username == owner)
@@ -187,17 +205,15 @@ def get_flashcards(
                 .distinct()
             )
 
-    total_number = query.count()
+    total_number = count_total(query, count)
 
-    if sort == 1:
-        query = query.order_by(Flashcard.created_at.desc())
-
-    offset = (page - 1) * page_size
-    flashcards = query.offset(offset).limit(page_size).all()
+    flashcards, next_cursor = get_flashcard_page(query, page, page_size, cursor, match)
 
     return {
         "total_number": total_number,
         "flashcards": [create_flashcard_dto(flashcard) for flashcard in flashcards],
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
     }
 
 
@@ -208,25 +224,26 @@ def get_my_flashcards(
     q: Optional[str] = Query(None, description="Search query"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=0, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query("exact", pattern=COUNT_PATTERN, description="exact, cached, estimate or none"),
 ):
     if not user_id:
         raise HTTPException(status_code=404, detail="User not found")
     user_id = int(user_id)
 
     query = db.query(Flashcard).filter(Flashcard.owner_id == user_id)
-    if q:
-        query = query.filter(Flashcard.name.ilike(f"%{q}%"))
-    total_number = query.count()
+    match = search_flashcards(q) if q else None
+    if match:
+        query = query.filter(match.condition)
+    total_number = count_total(query, count)
 
-    if page_size > 0:
-        offset = (page - 1) * page_size
-        flashcards = query.offset(offset).limit(page_size).all()
-    else:
-        flashcards = query.all()
+    flashcards, next_cursor = get_flashcard_page(query, page, page_size, cursor, match)
 
     return {
         "total_number": total_number,
         "flashcards": [create_flashcard_dto(flashcard) for flashcard in flashcards],
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
     }
 
 
@@ -319,6 +336,9 @@ def delete_flashcard(
             status_code=403, detail="You are not the owner of this flashcard"
         )
 
+    adjust_deck_stats(
+        db, decks_of_flashcards([flashcard.id]), **flashcards_delta(removed=[flashcard])
+    )
     db.delete(flashcard)
     db.commit()
     return "Flashcard deleted successfully"
@@ -350,3 +370,37 @@ def create_flashcard_dto(flashcard: Flashcard):
         ),
         tags=[tag.name for tag in flashcard.tags] if flashcard.tags is not None else [],
     )
+
+
+def get_flashcard_page(
+    query: SQLQuery,
+    page: int,
+    page_size: int,
+    cursor: Optional[str],
+    match: Optional[SearchMatch],
+):
+    """
+    Loads one page of a flashcard listing, ordered by id or by relevance when searching.
+
+    Args:
+        query (SQLQuery): Filtered query of flashcards.
+        page (int): Page number, starting at 1 (ignored with a cursor).
+        page_size (int): Flashcards per page, 0 returns all flashcards.
+        cursor (Optional[str]): `next_cursor` of the previous page.
+        match (Optional[SearchMatch]): Search the query is filtered by.
+
+    Returns:
+        tuple[list[Flashcard], Optional[str]]: The flashcards and the next page's cursor.
+    """
+    if not match:
+        return paginate(query, Keyset(Flashcard.id), page, page_size, cursor)
+
+    rows, next_cursor = paginate(
+        query.add_columns(match.rank),
+        match.keyset(Flashcard.id),
+        page,
+        page_size,
+        cursor,
+        entity=match.cursor_entity,
+    )
+    return [row[0] for row in rows], next_cursor
@@ -1,16 +1,39 @@
-from datetime import datetime, timedelta
+import json
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from sqlmodel import Session, and_, or_
 
 from app.tools.auth.authenticate import authenticate
 from app.database import get_session
-from app.models import Deck, DeckFlashcard, Flashcard, FlashcardSide, Progress
-from app.tools.learn.learn import update_progress_after_review
+from app.models import (
+    Deck,
+    DeckFlashcard,
+    Flashcard,
+    FlashcardSide,
+    Progress,
+    ReviewLog,
+    SavedDeck,
+    User,
+)
+from app.tools.learn.review_log import (
+    add_review_logs,
+    review_log_entry,
+    review_log_writer,
+)
+from app.tools.learn import fsrs
+from app.tools.learn.scheduler import (
+    SCHEDULERS,
+    get_scheduler,
+    load_settings,
+    valid_desired_retention,
+)
 
 router = APIRouter(prefix="/learn", tags=["learn"])
 
@@ -24,10 +47,138 @@ class FlashcardLearnDTO(BaseModel):
     back_side: FlashcardSide
 
 
+class FlashcardSideLearnDTO(BaseModel):
+    id: int
+    content: Optional[str] = None
+    media: list[int] = []
+
+
+class FlashcardSessionDTO(BaseModel):
+    id: int
+    last_review_date: Optional[datetime] = None
+    next_review_date: Optional[datetime] = None
+    efactor: float
+    front_side: FlashcardSideLearnDTO
+    back_side: FlashcardSideLearnDTO
+
+
+class LearnSessionDTO(BaseModel):
+    cards: list[FlashcardSessionDTO]
+
+
+class DeckLearnSummaryDTO(BaseModel):
+    next_review_date: Optional[datetime] = None
+    due_now: int
+    due_within_hour: int
+    due_within_day: int
+    new_cards: int
+    total: int
+
+
+class DeckDashboardDTO(DeckLearnSummaryDTO):
+    deck_id: int
+    name: str
+
+
+class DashboardDTO(BaseModel):
+    decks: list[DeckDashboardDTO]
+
+
+class SchedulerSettingsDTO(BaseModel):
+    scheduler: str = Field(pattern="^(" + "|".join(SCHEDULERS) + ")$")
+    desired_retention: float = Field(
+        fsrs.DEFAULT_RETENTION,
+        ge=fsrs.RETENTION_BOUNDS[0],
+        le=fsrs.RETENTION_BOUNDS[1],
+    )
+
+
 class ReviewDTO(BaseModel):
     quality: int
 
 
+class ReviewBatchItemDTO(BaseModel):
+    flashcard_id: int
+    quality: int
+    # required: (flashcard_id, reviewed_at) identifies a review on retried syncs
+    reviewed_at: datetime
+
+
+class ReviewBatchDTO(BaseModel):
+    reviews: list[ReviewBatchItemDTO] = Field(max_length=1000)
+
+
+class ReviewBatchResultDTO(BaseModel):
+    flashcard_id: int
+    next_review_date: Optional[datetime] = None
+    applied: bool
+
+
+@router.get("/dashboard", response_model=DashboardDTO)
+def get_learning_dashboard(
+    user_id=Depends(authenticate()), db: Session = Depends(get_session)
+):
+    now = datetime.utcnow()
+
+    if not user_id:
+        raise HTTPException(status_code=404, detail="User not found")
+    user_id = int(user_id)
+
+    is_saved = (
+        select(SavedDeck.id)
+        .where(SavedDeck.deck_id == Deck.id, SavedDeck.user_id == user_id)
+        .exists()
+    )
+
+    # One grouped query over the user's progress instead of a
+    # /next-date call per deck. `total` counts initialized cards only.
+    stmt = (
+        select(
+            Deck.id.label("deck_id"),
+            Deck.name,
+            *due_summary_columns(now),
+            func.count(Progress.id).label("total"),
+        )
+        .select_from(Progress)
+        .join(DeckFlashcard, DeckFlashcard.flashcard_id == Progress.flashcard_id)
+        .join(Deck, Deck.id == DeckFlashcard.deck_id)
+        .where(Progress.user_id == user_id, or_(Deck.owner_id == user_id, is_saved))
+        .group_by(Deck.id, Deck.name)
+        .order_by(func.min(Progress.next_review_date).asc())
+    )
+
+    return {"decks": [row._asdict() for row in db.exec(stmt).all()]}
+
+
+@router.get("/scheduler", response_model=SchedulerSettingsDTO)
+def get_scheduler_settings(
+    user_id=Depends(authenticate()), db: Session = Depends(get_session)
+):
+    settings = load_settings(get_user_settings(user_id, db))
+    return SchedulerSettingsDTO(
+        scheduler=settings.get("scheduler", "sm2"),
+        desired_retention=valid_desired_retention(settings.get("desired_retention")),
+    )
+
+
+@router.put("/scheduler", response_model=SchedulerSettingsDTO)
+def update_scheduler_settings(
+    scheduler_settings: SchedulerSettingsDTO,
+    user_id=Depends(authenticate()),
+    db: Session = Depends(get_session),
+):
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    settings = load_settings(user.settings)
+    settings.update(scheduler_settings.model_dump())
+    user.settings = json.dumps(settings)
+    db.commit()
+
+    return scheduler_settings
+
+
 @router.get("/{deck_id}/next")
 def get_next_learning_card(
     deck_id: int, user_id=Depends(authenticate()), db: Session = Depends(get_session)
@@ -38,18 +189,7 @@ def get_next_learning_card(
     if not user_id:
         raise HTTPException(status_code=404, detail="User not found")
 
-    stmt = (
-        select(Flashcard, Progress)
-        .join(DeckFlashcard)
-        .join(Progress)
-        .where(
-            DeckFlashcard.deck_id == deck_id,
-            Progress.user_id == user_id,
-            Progress.next_review_date <= now,
-        )
-        .order_by(Progress.next_review_date.asc())
-        .limit(1)
-    )
+    stmt = due_cards_stmt(deck_id, user_id, now).limit(1)
 
     row = db.exec(stmt).first()
 
@@ -68,6 +208,37 @@ def get_next_learning_card(
     )
 
 
+@router.get("/{deck_id}/session", response_model=LearnSessionDTO)
+def get_learning_session(
+    deck_id: int,
+    size: int = Query(20, ge=1, le=200),
+    user_id=Depends(authenticate()),
+    db: Session = Depends(get_session),
+):
+    now = datetime.utcnow()
+    now = now + timedelta(seconds=10)
+
+    if not user_id:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # Sides are joined into the main query, media ids are fetched with one
+    # extra IN query per side, so the cost doesn't grow with `size`.
+    stmt = (
+        due_cards_stmt(deck_id, user_id, now)
+        .options(
+            joinedload(Flashcard.front_side).selectinload(FlashcardSide.media),
+            joinedload(Flashcard.back_side).selectinload(FlashcardSide.media),
+        )
+        .limit(size)
+    )
+
+    rows = db.exec(stmt).all()
+
+    return LearnSessionDTO(
+        cards=[create_flashcard_session_dto(card, progress) for card, progress in rows]
+    )
+
+
 @router.get("/{deck_id}/next-date")
 def get_next_learning_date(
     deck_id: int, user_id=Depends(authenticate()), db: Session = Depends(get_session)
@@ -77,26 +248,41 @@ def get_next_learning_date(
     if not user_id:
         raise HTTPException(status_code=404, detail="User not found")
 
-    stmt = (
-        select(Flashcard, Progress)
-        .join(DeckFlashcard)
-        .join(Progress)
-        .where(
-            DeckFlashcard.deck_id == deck_id,
-            Progress.user_id == user_id,
-        )
-        .order_by(Progress.next_review_date.asc())
-        .limit(1)
+    # MIN() over ix_progress_user_id_next_review_date and the decks_flashcards
+    # primary key only (index-only scans), no rows are hydrated.
+    stmt = select(func.min(Progress.next_review_date)).where(
+        Progress.user_id == user_id, in_deck(deck_id)
     )
 
-    row = db.exec(stmt).first()
+    return db.exec(stmt).scalar()
 
-    if not row:
-        return None
 
-    _, progress = row
+@router.get("/{deck_id}/summary", response_model=DeckLearnSummaryDTO)
+def get_learning_summary(
+    deck_id: int, user_id=Depends(authenticate()), db: Session = Depends(get_session)
+):
+    now = datetime.utcnow()
 
-    return progress.next_review_date
+    if not user_id:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    stmt = (
+        select(
+            *due_summary_columns(now),
+            func.count(DeckFlashcard.flashcard_id).label("total"),
+        )
+        .select_from(DeckFlashcard)
+        .outerjoin(
+            Progress,
+            and_(
+                Progress.flashcard_id == DeckFlashcard.flashcard_id,
+                Progress.user_id == user_id,
+            ),
+        )
+        .where(DeckFlashcard.deck_id == deck_id)
+    )
+
+    return db.exec(stmt).one()._asdict()
 
 
 @router.post("/{deck_id}/init")
@@ -105,36 +291,32 @@ def post_init_learning(
 ):
     now = datetime.utcnow()
 
-    cards = db.query(Deck).filter(Deck.id == deck_id).first().flashcards
+    if not user_id:
+        raise HTTPException(status_code=404, detail="User not found")
+    user_id = int(user_id)
 
-    for card in cards:
-        exists = db.exec(
-            select(Progress).where(
-                Progress.user_id == user_id,
-                Progress.flashcard_id == card.id,
-            )
-        ).first()
-
-        if not exists:
-            savepoint = db.begin_nested()
-
-            try:
-                db.add(
-                    Progress(
-                        user_id=user_id,
-                        flashcard_id=card.id,
-                        next_review_date=now,
-                    )
-                )
-                db.flush()
-                savepoint.commit() 
-            except IntegrityError:
-                savepoint.rollback() 
-                continue
+    if not db.query(Deck.id).filter(Deck.id == deck_id).first():
+        raise HTTPException(status_code=404, detail="Deck not found")
 
+    # One INSERT ... SELECT for the whole deck; cards the user already has
+    # progress for are skipped by the uq_user_flashcard constraint.
+    stmt = (
+        insert(Progress)
+        .from_select(
+            ["user_id", "flashcard_id", "next_review_date"],
+            select(
+                literal(user_id),
+                DeckFlashcard.flashcard_id,
+                literal(now),
+            ).where(DeckFlashcard.deck_id == deck_id),
+        )
+        .on_conflict_do_nothing(constraint="uq_user_flashcard")
+    )
+
+    result = db.execute(stmt)
     db.commit()
 
-    return {"status": "ok"}
+    return {"status": "ok", "created": result.rowcount}
 
 
 @router.post("/{flashcard_id}/review")
@@ -166,8 +348,201 @@ def update_progress(
         db.add(progress)
         db.flush()
 
-    next_date = update_progress_after_review(progress, review.quality)
+    previous_review_date = progress.last_review_date
+    next_date = get_user_scheduler(user_id, db).review(progress, review.quality)
+    log_entry = review_log_entry(progress, review.quality, previous_review_date)
 
     db.commit()
+    review_log_writer.add(log_entry)
 
     return {"status": "ok", "next_review_date_utc_": next_date}
+
+
+@router.post("/reviews:batch")
+def update_progress_batch(
+    batch: ReviewBatchDTO,
+    user_id=Depends(authenticate()),
+    db: Session = Depends(get_session),
+):
+    if not user_id:
+        raise HTTPException(status_code=404, detail="User not found")
+    user_id = int(user_id)
+
+    now = datetime.utcnow()
+    scheduler = get_user_scheduler(user_id, db)
+    flashcard_ids = {review.flashcard_id for review in batch.reviews}
+
+    progresses = {
+        progress.flashcard_id: progress
+        for progress in db.query(Progress).filter(
+            Progress.user_id == user_id, Progress.flashcard_id.in_(flashcard_ids)
+        )
+    }
+
+    new_flashcard_ids = flashcard_ids - progresses.keys()
+    if new_flashcard_ids:
+        existing_ids = set(
+            db.scalars(select(Flashcard.id).where(Flashcard.id.in_(new_flashcard_ids)))
+        )
+        missing_ids = sorted(new_flashcard_ids - existing_ids)
+        if missing_ids:
+            raise HTTPException(
+                status_code=404, detail=f"Flashcards not found: {missing_ids}"
+            )
+
+    # Replay in review order, so several reviews of one card made offline
+    # are applied the same way as if they had been sent one by one.
+    reviews = sorted(
+        (
+            (min(to_naive_utc(review.reviewed_at), now), review)
+            for review in batch.reviews
+        ),
+        key=lambda item: item[0],
+    )
+
+    # Reviews already applied (e.g. by a retried sync) are the ones logged
+    # with the same flashcard and timestamp; this batch logs its reviews in
+    # the same transaction, so the log is up to date here.
+    applied_reviews = set(
+        db.execute(
+            select(ReviewLog.flashcard_id, ReviewLog.reviewed_at).where(
+                ReviewLog.user_id == user_id,
+                ReviewLog.flashcard_id.in_(flashcard_ids),
+                ReviewLog.reviewed_at.in_({reviewed_at for reviewed_at, _ in reviews}),
+            )
+        ).tuples()
+    )
+
+    results = []
+    log_entries = []
+    for reviewed_at, review in reviews:
+        progress = progresses.get(review.flashcard_id)
+
+        if not progress:
+            progress = Progress(
+                user_id=user_id,
+                flashcard_id=review.flashcard_id,
+                next_review_date=reviewed_at,
+            )
+            db.add(progress)
+            progresses[review.flashcard_id] = progress
+
+        if (review.flashcard_id, reviewed_at) in applied_reviews:
+            results.append(
+                ReviewBatchResultDTO(
+                    flashcard_id=review.flashcard_id,
+                    next_review_date=progress.next_review_date,
+                    applied=False,
+                )
+            )
+            continue
+
+        previous_review_date = progress.last_review_date
+        next_date = scheduler.review(progress, review.quality, reviewed_at)
+        log_entries.append(
+            review_log_entry(progress, review.quality, previous_review_date)
+        )
+        applied_reviews.add((review.flashcard_id, reviewed_at))
+        results.append(
+            ReviewBatchResultDTO(
+                flashcard_id=review.flashcard_id,
+                next_review_date=next_date,
+                applied=True,
+            )
+        )
+
+    try:
+        add_review_logs(db, log_entries)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=409, detail="Progress was modified concurrently, retry"
+        )
+
+    return {"status": "ok", "results": results}
+
+
+def in_deck(deck_id: int):
+    """
+    Condition matching Progress rows of flashcards that belong to the deck.
+
+    Written as a semi-join so the planner can walk the user's progress in
+    next_review_date order (ix_progress_user_id_next_review_date) and probe
+    the decks_flashcards primary key for each row, stopping at the LIMIT,
+    instead of sorting every progress row of the deck.
+    """
+    return (
+        select(DeckFlashcard.flashcard_id)
+        .where(
+            DeckFlashcard.deck_id == deck_id,
+            DeckFlashcard.flashcard_id == Progress.flashcard_id,
+        )
+        .exists()
+    )
+
+
+def due_summary_columns(now: datetime):
+    """
+    Aggregates describing how many of the selected Progress rows are due.
+
+    Due counts are cumulative (`due_within_day` includes `due_now`). Cards
+    without a Progress row (outer join) count as new.
+    """
+    return (
+        func.min(Progress.next_review_date).label("next_review_date"),
+        func.count().filter(Progress.next_review_date <= now).label("due_now"),
+        func.count()
+        .filter(Progress.next_review_date <= now + timedelta(hours=1))
+        .label("due_within_hour"),
+        func.count()
+        .filter(Progress.next_review_date <= now + timedelta(days=1))
+        .label("due_within_day"),
+        func.count().filter(Progress.last_review_date.is_(None)).label("new_cards"),
+    )
+
+
+def due_cards_stmt(deck_id: int, user_id: int, due_before: datetime):
+    return (
+        select(Flashcard, Progress)
+        .join(Progress, Progress.flashcard_id == Flashcard.id)
+        .where(
+            Progress.user_id == user_id,
+            Progress.next_review_date <= due_before,
+            in_deck(deck_id),
+        )
+        .order_by(Progress.next_review_date.asc())
+    )
+
+
+def get_user_settings(user_id: int, db: Session):
+    return db.exec(select(User.settings).where(User.id == user_id)).scalar()
+
+
+def get_user_scheduler(user_id: int, db: Session):
+    return get_scheduler(get_user_settings(user_id, db))
+
+
+def to_naive_utc(date: Optional[datetime]):
+    if date is None or date.tzinfo is None:
+        return date
+    return date.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def create_flashcard_session_dto(card: Flashcard, progress: Progress):
+    return FlashcardSessionDTO(
+        id=card.id,
+        efactor=progress.efactor,
+        last_review_date=progress.last_review_date,
+        next_review_date=progress.next_review_date,
+        front_side=create_flashcard_side_learn_dto(card.front_side),
+        back_side=create_flashcard_side_learn_dto(card.back_side),
+    )
+
+
+def create_flashcard_side_learn_dto(side: FlashcardSide):
+    return FlashcardSideLearnDTO(
+        id=side.id,
+        content=side.content,
+        media=[m.id for m in side.media] if side.media is not None else [],
+    )
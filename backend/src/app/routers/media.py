@@ -11,6 +11,7 @@ from sqlmodel import Session, or_
 from ..models import Media, FlashcardSide, Flashcard, User, FlashcardSideMedia
 from app.database import get_session
 from app.tools.auth.authenticate import authenticate
+from app.tools.db.deck_stats import adjust_media_flashcards, flashcard_has_media
 
 router = APIRouter(prefix="/media", tags=["media"])
 files_dir = "./files/"
@@ -38,8 +39,11 @@ def uploadMedia(side_id: int, file: UploadFile, user_id=Depends(authenticate()),
     f = file.file.read()
     with open(files_dir + filepath, "wb") as new_file:
         new_file.write(f)
+    had_media = flashcard_has_media(flashcard)
     media = Media(path=filepath, type=type, autoplay=False, flashcard_sides=[flashcard_side])
     db.add(media)
+    if not had_media:
+        adjust_media_flashcards(db, [flashcard.id], 1)
     db.commit()
     db.refresh(media)
     return media
@@ -105,6 +109,26 @@ def deleteMedia(id: int, user_id=Depends(authenticate()), db: Session = Depends(
         raise HTTPException(status_code=404, detail="Filepath " + media.path + " does not exist")
     else:
         os.remove(files_dir + media.path)
+    adjust_media_flashcards(db, get_flashcards_losing_media(media, db), -1)
     db.delete(media)
     db.commit()
-    return "Media deleted successfully"
\ No newline at end of file
+    return "Media deleted successfully"
+
+
+def get_flashcards_losing_media(media: Media, db: Session):
+    side_ids = [side.id for side in media.flashcard_sides]
+    flashcards = (
+        db.query(Flashcard)
+        .filter(
+            or_(
+                Flashcard.front_side_id.in_(side_ids),
+                Flashcard.back_side_id.in_(side_ids),
+            )
+        )
+        .all()
+    )
+    return [
+        flashcard.id
+        for flashcard in flashcards
+        if all(m.id == media.id for m in flashcard.front_side.media + flashcard.back_side.media)
+    ]
@@ -9,6 +9,8 @@ from sqlmodel import Session
 from app.database import get_session
 from app.models import Comment, Deck, Flashcard, Report, User
 from app.tools.auth.authenticate import authenticate
+from app.tools.db.counting import COUNT_PATTERN, count_total
+from app.tools.db.pagination import Keyset, paginate
 
 
 router = APIRouter(prefix="/reports", tags=["reports"])
@@ -37,8 +39,10 @@ class ReportGetDTO(BaseModel):
 
 
 class ReportGetAllDTO(BaseModel):
-    total_number: int
+    total_number: Optional[int] = None
     reports: list[ReportGetDTO]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
 
 class ReportUpdateDTO(BaseModel):
@@ -143,6 +147,8 @@ def get_reports(
     # query params
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query("exact", pattern=COUNT_PATTERN, description="exact, cached, estimate or none"),
     sort: Optional[str] = Query("desc", pattern="^(asc|desc)$"),
     verdict: Optional[str] = Query(None),
     # db
@@ -155,17 +161,17 @@ def get_reports(
     elif verdict and verdict != "all":
         reports = reports.filter(Report.verdict.ilike(verdict))
 
-    if sort == "desc":
-        reports = reports.order_by(Report.creation_date.desc())
-    else:
-        reports = reports.order_by(Report.creation_date.asc())
+    total_number = count_total(reports, count)
 
-    total_number = reports.count()
+    keyset = Keyset(Report.creation_date, Report.id, descending=sort == "desc")
+    reports, next_cursor = paginate(reports, keyset, page, page_size, cursor)
 
-    offset = (page - 1) * page_size
-    reports = reports.offset(offset).limit(page_size).all()
-
-    return {"total_number": total_number, "reports": reports}
+    return {
+        "total_number": total_number,
+        "reports": reports,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
 
 
 @router.get("/{report_id}", response_model=ReportGetDTO)
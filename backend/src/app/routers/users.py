@@ -13,6 +13,8 @@ from ..database import get_session
 from app.tools.auth.authenticate import authenticate
 from app.tools.auth.validation import check_password
 from app.tools.auth.hash import hash_password, verify_password
+from app.tools.db.counting import COUNT_PATTERN, count_total
+from app.tools.db.pagination import Keyset, paginate
 
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -33,8 +35,10 @@ class UserDTO(BaseModel):
     }
     
 class UserGetAllDTO(BaseModel):
-    total_number: int
+    total_number: Optional[int] = None
     users: list[UserDTO]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
     
 class UserUpdateDTO(BaseModel):
     username: Optional[str] = None
@@ -53,6 +57,8 @@ class PasswordChangeDTO(BaseModel):
 def get_all_users(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query("exact", pattern=COUNT_PATTERN, description="exact, cached, estimate or none"),
     username: Optional[str] = Query(None),
     status: Optional[str] = Query(None, regex="^(all|active|inactive)$"),
     role: Optional[str] = Query(None, regex="^(all|admin|moderator|user)$"),
@@ -71,12 +77,16 @@ def get_all_users(
     if role and role != "all":
         users = users.join(User.roles).filter(Role.name == role.upper())
         
-    total_number = users.count()
+    total_number = count_total(users, count)
 
-    offset = (page - 1) * page_size
-    users = users.offset(offset).limit(page_size).all()
+    users, next_cursor = paginate(users, Keyset(User.id), page, page_size, cursor)
 
-    return {"total_number": total_number, "users": users}
+    return {
+        "total_number": total_number,
+        "users": users,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
 
 @router.get("/me", response_model=UserDTO)
 def get_current_user(user_id: int = Depends(authenticate()), db: Session = Depends(get_session)) -> User:
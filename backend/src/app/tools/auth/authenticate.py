@@ -4,7 +4,9 @@ from typing import Optional, List
 
 from app.database import get_session
 from ...models import ExpireTokens, User
-from .jwt_handler import get_id_from_token, get_token_handler
+from .jwt_handler import get_token_handler, read_token
+from .revocation import revocation_cache
+from .roles import role_cache
 
 
 def authenticate(roles: Optional[List[str]] = None):
@@ -42,16 +44,25 @@ def authenticate(roles: Optional[List[str]] = None):
             int: The user ID extracted from the token if roles are not specified.
 
         Notes:
+            - Role names are cached per user for a short time (see `roles.RoleCache`).
+            - Revoked tokens are looked up in `revocation_cache`, the expired
+              tokens table is queried only until the cache is warmed up.
             - Role-based authorization is not implemented yet.
             - Future implementation should check user roles against required roles.
         """
-        token_entry = (
-            db.query(ExpireTokens).filter(ExpireTokens.token_value == token).first()
-        )
-        if token_entry:
-            raise HTTPException(status_code=401, detail="Invalid token")
+        user_id, revocation_key = read_token(token)
 
-        user_id = get_id_from_token(token=token)
+        if revocation_cache.ready:
+            revoked = revocation_cache.is_revoked(revocation_key)
+        else:
+            revoked = (
+                db.query(ExpireTokens)
+                .filter(ExpireTokens.token_value == revocation_key)
+                .first()
+                is not None
+            )
+        if revoked:
+            raise HTTPException(status_code=401, detail="Invalid token")
 
         if type(user_id) is str:
             user_id = int(user_id)
@@ -59,15 +70,19 @@ def authenticate(roles: Optional[List[str]] = None):
         if roles == None:
             return user_id
         else:
-            user = db.query(User).filter(User.id == user_id).first()
+            roles_str = role_cache.get(user_id)
 
-            if user is None:
-                raise HTTPException(status_code=401, detail="Unauthorized")
+            if roles_str is None:
+                user = db.query(User).filter(User.id == user_id).first()
 
-            if user.roles is None:
-                raise HTTPException(status_code=403, detail="Insufficient permissions")
+                if user is None:
+                    raise HTTPException(status_code=401, detail="Unauthorized")
+
+                roles_str = [role.name for role in user.roles or []]
+                role_cache.set(user_id, roles_str)
 
-            roles_str = [role.name for role in user.roles]
+            if not roles_str:
+                raise HTTPException(status_code=403, detail="Insufficient permissions")
 
             for role in roles:
                 if role not in roles_str:
@@ -1,26 +1,155 @@
+"""
+Password hashing with argon2.
+
+Hashing parameters are read from the environment (ARGON2_TIME_COST,
+ARGON2_MEMORY_COST in KiB, ARGON2_PARALLELISM); hashes made with other
+parameters are upgraded on the next successful login.
+
+Usage (find parameters that fit a latency budget on this machine):
+    python -m app.tools.auth.hash --target-ms 100
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import HTTPException
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
 
-ph = PasswordHasher()
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+ph = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
+)
+
+
+class HashingPool:
+    """
+    Runs argon2 calls in a dedicated, size-limited thread pool.
+
+    argon2 releases the GIL, so `workers` threads hash in parallel while the
+    rest of the application keeps its request threads. At most `queue_size`
+    calls wait for a worker; further calls are rejected with 503 instead of
+    piling up, so a login burst cannot starve other endpoints.
+
+    Args:
+        workers (int): Number of hashing threads (roughly the CPU cores given to hashing).
+        queue_size (int): Number of calls allowed to wait for a free worker.
+    """
+
+    def __init__(self, workers: int = HASH_WORKERS, queue_size: int = HASH_QUEUE_SIZE):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def run(self, func, *args):
+        """
+        Calls `func(*args)` in the pool and returns its result.
+
+        Raises:
+            HTTPException: (503) If all workers are busy and the queue is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many authentication requests, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(self._call, time.perf_counter(), func, args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _call(self, submitted, func, args):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            wait = started - submitted
+            self._wait_seconds += wait
+            self._max_wait_seconds = max(self._max_wait_seconds, wait)
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._run_seconds += time.perf_counter() - started
+
+    def stats(self) -> dict:
+        """
+        Returns backpressure metrics of the pool.
+        """
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "running": self._running,
+                "queued": self._in_flight - self._running,
+                "completed": completed,
+                "rejected": self._rejected,
+                "mean_wait_seconds": self._wait_seconds / completed if completed else 0.0,
+                "max_wait_seconds": self._max_wait_seconds,
+                "mean_hash_seconds": self._run_seconds / completed if completed else 0.0,
+            }
+
+
+hashing_pool = HashingPool()
+
 
 def hash_password(password):
     """
-    Hashes the given password using the SHA-512 algorithm.
+    Hashes the given password with argon2 in the hashing pool.
 
     Args:
         password (str): The password to be hashed.
 
     Returns:
         str: The hashed password.
+
+    Raises:
+        HTTPException: (503) If the hashing pool is saturated.
     """
-    hashedPassword = ph.hash(password)
+    hashedPassword = hashing_pool.run(ph.hash, password)
     return hashedPassword
 
 
+def _verify(password_request, password_orig):
+    try:
+        ph.verify(password_request, password_orig)  # stored_hash, plain_password
+    except VerifyMismatchError:
+        raise HTTPException(status_code=401, detail="Wrong password")
+
+
 def verify_password(password_request, password_orig):
     """
-    Verifies a password against a stored hashed password.
+    Verifies a password against a stored hashed password in the hashing pool.
 
     Args:
         password_request (str): The plaintext password provided by the user.
@@ -31,8 +160,128 @@ def verify_password(password_request, password_orig):
 
     Raises:
         HTTPException: If the provided password does not match the stored hash.
+        HTTPException: (503) If the hashing pool is saturated.
     """
-    try:
-        ph.verify(password_request, password_orig)  # stored_hash, plain_password
-    except VerifyMismatchError:
-        raise HTTPException(status_code=401, detail="Wrong password")
+    hashing_pool.run(_verify, password_request, password_orig)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """
+    Checks whether a stored hash was made with other parameters than the current ones.
+
+    Args:
+        password_hash (str): The stored argon2 hash.
+
+    Returns:
+        bool: True if the password should be hashed again.
+    """
+    return ph.check_needs_rehash(password_hash)
+
+
+def measure_hash_time(hasher: PasswordHasher, rounds: int = 5) -> float:
+    """
+    Returns the median time of one hash in seconds.
+    """
+    times = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.hash("calibration-password")
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def calibrate(
+    target_seconds: float,
+    memory_costs: list[int],
+    parallelism: int = ARGON2_PARALLELISM,
+    max_time_cost: int = 10,
+    rounds: int = 5,
+) -> list[dict]:
+    """
+    Measures argon2 parameter sets against a latency budget.
+
+    For every memory cost the time cost is increased until hashing takes
+    longer than `target_seconds`; the last set within the budget is kept.
+
+    Args:
+        target_seconds (float): Latency budget of one hash.
+        memory_costs (list[int]): Memory costs to try, in KiB.
+        parallelism (int): Number of lanes.
+        max_time_cost (int): Highest time cost to try.
+        rounds (int): Hashes measured per parameter set.
+
+    Returns:
+        list[dict]: Best parameter set and its median latency for every memory
+            cost that fits the budget, strongest (memory × time) first.
+    """
+    results = []
+    for memory_cost in memory_costs:
+        best = None
+        for time_cost in range(1, max_time_cost + 1):
+            hasher = PasswordHasher(
+                time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+            )
+            seconds = measure_hash_time(hasher, rounds)
+            if seconds > target_seconds:
+                break
+            best = {
+                "time_cost": time_cost,
+                "memory_cost": memory_cost,
+                "parallelism": parallelism,
+                "seconds": seconds,
+            }
+        if best is not None:
+            results.append(best)
+
+    return sorted(
+        results, key=lambda row: row["memory_cost"] * row["time_cost"], reverse=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate argon2 parameters")
+    parser.add_argument("--target-ms", type=float, default=100)
+    parser.add_argument(
+        "--memory-costs",
+        type=int,
+        nargs="+",
+        default=[19456, 47104, 65536, 131072],
+        help="Memory costs to try, in KiB",
+    )
+    parser.add_argument("--parallelism", type=int, default=ARGON2_PARALLELISM)
+    parser.add_argument("--max-time-cost", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    current = measure_hash_time(ph, args.rounds)
+    print(
+        f"Current: time_cost={ph.time_cost} memory_cost={ph.memory_cost} "
+        f"parallelism={ph.parallelism} -> {current * 1000:.1f} ms"
+    )
+
+    results = calibrate(
+        args.target_ms / 1000,
+        args.memory_costs,
+        args.parallelism,
+        args.max_time_cost,
+        args.rounds,
+    )
+    if not results:
+        print(f"No parameters fit in {args.target_ms} ms")
+        return
+
+    for row in results:
+        print(
+            f"time_cost={row['time_cost']} memory_cost={row['memory_cost']} "
+            f"parallelism={row['parallelism']} -> {row['seconds'] * 1000:.1f} ms"
+        )
+
+    best = results[0]
+    print("\nRecommended environment:")
+    print(f"ARGON2_TIME_COST={best['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={best['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={best['parallelism']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,22 @@
 import os
+import uuid
 import jwt
 
 from datetime import datetime, timedelta, timezone
+from functools import cache
 from fastapi import HTTPException, Depends, Header
 from sqlmodel import Session
 
 from app.database import get_session
 from ...models import ExpireTokens
+from .keys import get_key_set
+from .revocation import hash_token, revocation_cache
 
 
+ACCESS_TOKEN_MINUTES = int(os.getenv("ACCESS_TOKEN_MINUTES", "15"))
+
+
+@cache
 def get_secret_key():
     return os.getenv("AUTH_KEY")
 
@@ -36,7 +44,7 @@ def invalidate_token(
     token: str = Depends(get_token_handler), db: Session = Depends(get_session)
 ):
     """
-    Invalidates a JWT token by storing its value and expiration date in the database.
+    Invalidates a JWT token by storing its revocation key and expiration date in the database.
 
     Args:
         token (str): The JWT token to invalidate, provided by dependency injection.
@@ -46,34 +54,48 @@ def invalidate_token(
         str: The invalidated token.
 
     Side Effects:
-        Adds an ExpireTokens record to the database and commits the transaction.
+        Adds an ExpireTokens record to the database, commits the transaction
+        and adds the token to the revocation cache.
     """
-    expiration_timestamp = decode_token(token)["exp"]
-    expiration_date = datetime.fromtimestamp(expiration_timestamp, tz=timezone.utc)
-    expire_token = ExpireTokens(token_value=token, expiration_date=expiration_date)
+    payload = decode_token(token)
+    revocation_key = get_revocation_key(token, payload)
+    expiration_date = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+    expire_token = ExpireTokens(token_value=revocation_key, expiration_date=expiration_date)
     db.add(expire_token)
     db.commit()
+    revocation_cache.revoke(revocation_key, expiration_date)
 
     return token
 
 
 def generate_token(user_id: str):
     """
-    Generates a JWT token for the given user ID.
+    Generates a short-lived JWT access token for the given user ID.
+
+    Clients renew it with a refresh token (see `app.tools.auth.refresh`).
 
     Args:
         user_id (str): The ID of the user.
 
     Returns:
-        str: The generated JWT token.
+        str: The generated JWT token, valid for ACCESS_TOKEN_MINUTES.
     """
     payload = {
-        "exp": datetime.utcnow() + timedelta(days=1),
+        "exp": datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_MINUTES),
         "iat": datetime.utcnow(),
         "sub": user_id,
+        "jti": uuid.uuid4().hex,
     }
-    print(user_id)
-    token = jwt.encode(payload, get_secret_key(), algorithm="HS256")
+    key_set = get_key_set()
+    if key_set.symmetric:
+        return jwt.encode(payload, get_secret_key(), algorithm=key_set.algorithm)
+
+    token = jwt.encode(
+        payload,
+        key_set.signing_key,
+        algorithm=key_set.algorithm,
+        headers={"kid": key_set.signing_kid},
+    )
     return token
 
 
@@ -81,6 +103,9 @@ def decode_token(token):
     """
     Retrieves the payload from the given JWT token.
 
+    Asymmetrically signed tokens are verified with the public key named by
+    their `kid` header.
+
     Args:
         token (str): The JWT token to decode.
 
@@ -91,8 +116,17 @@ def decode_token(token):
         HTTPException: (401) If the token has expired, returns 'Signature expired. Please log in again.'
         HTTPException: (401) If the token is invalid, returns 'Invalid token. Please log in again.'
     """
+    key_set = get_key_set()
     try:
-        payload = jwt.decode(token, get_secret_key(), algorithms=["HS256"])
+        if key_set.symmetric:
+            key = get_secret_key()
+        else:
+            kid = jwt.get_unverified_header(token).get("kid")
+            key = key_set.verification_keys.get(kid)
+            if key is None:
+                raise jwt.InvalidTokenError(f"Unknown key id: {kid}")
+
+        payload = jwt.decode(token, key, algorithms=[key_set.algorithm])
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Login expired")
@@ -111,3 +145,36 @@ def get_id_from_token(token: str):
         HTTPException: (401) If the token is invalid or the expired claim is missing.
     """
     return decode_token(token)["sub"]
+
+
+def get_revocation_key(token: str, payload: dict) -> str:
+    """
+    Returns the key under which a token is stored when revoked.
+
+    Args:
+        token (str): The JWT token.
+        payload (dict): Its decoded payload.
+
+    Returns:
+        str: SHA-256 hex digest of the 'jti' claim, or of the whole token for
+            tokens issued before 'jti' was added.
+    """
+    jti = payload.get("jti")
+    return hash_token(jti if jti is not None else token)
+
+
+def read_token(token: str):
+    """
+    Decodes a JWT token once and returns what authentication needs.
+
+    Args:
+        token (str): The JWT token string.
+
+    Returns:
+        tuple[Any, str]: The 'sub' claim and the revocation key of the token.
+
+    Raises:
+        HTTPException: (401) If the token is invalid or expired.
+    """
+    payload = decode_token(token)
+    return payload["sub"], get_revocation_key(token, payload)
@@ -0,0 +1,176 @@
+"""
+Signing keys of JWT access tokens.
+
+By default tokens are signed with HS256 and the AUTH_KEY secret. Setting
+JWT_ALGORITHM to RS256 or EdDSA switches to asymmetric signing (requires the
+`cryptography` package, installed with `PyJWT[crypto]`):
+
+    JWT_ALGORITHM=EdDSA
+    JWT_KEYS_DIR=/run/secrets/jwt     # <kid>.pem files
+    JWT_ACTIVE_KID=2026-10            # key used to sign new tokens
+
+Every `<kid>.pem` in JWT_KEYS_DIR is a private key (or a public key of a
+retired signing key). All of them verify tokens and are published by the
+JWKS endpoint, so keys can be rotated by adding a new file, switching
+JWT_ACTIVE_KID and deleting the old file once its tokens have expired.
+
+Usage (create a key):
+    python -m app.tools.auth.keys --algorithm EdDSA --dir keys --kid 2026-10
+"""
+import argparse
+import os
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+from typing import Any, Optional
+
+import jwt
+
+SYMMETRIC_ALGORITHM = "HS256"
+ASYMMETRIC_ALGORITHMS = ("RS256", "EdDSA")
+
+
+@dataclass
+class KeySet:
+    """
+    Keys used to sign and verify access tokens.
+
+    Attributes:
+        algorithm (str): JWT algorithm (HS256, RS256 or EdDSA).
+        signing_kid (Optional[str]): Key id written into the token header (asymmetric only).
+        signing_key (Any): Private key of `signing_kid` (asymmetric only).
+        verification_keys (dict[str, Any]): Public keys by key id (asymmetric only).
+        jwks (dict): JSON Web Key Set of the public keys.
+    """
+    algorithm: str = SYMMETRIC_ALGORITHM
+    signing_kid: Optional[str] = None
+    signing_key: Any = None
+    verification_keys: dict[str, Any] = field(default_factory=dict)
+    jwks: dict = field(default_factory=lambda: {"keys": []})
+
+    @property
+    def symmetric(self) -> bool:
+        return self.algorithm == SYMMETRIC_ALGORITHM
+
+
+def public_jwk(kid: str, public_key, algorithm: str) -> dict:
+    """
+    Converts a public key to its JWK representation.
+    """
+    jwk = jwt.get_algorithm_by_name(algorithm).to_jwk(public_key, as_dict=True)
+    jwk.update({"kid": kid, "alg": algorithm, "use": "sig"})
+    return jwk
+
+
+def load_key_set(
+    algorithm: str, keys_dir: Optional[str], active_kid: Optional[str]
+) -> KeySet:
+    """
+    Loads the keys of the configured algorithm.
+
+    Args:
+        algorithm (str): JWT algorithm.
+        keys_dir (Optional[str]): Directory with `<kid>.pem` files (asymmetric only).
+        active_kid (Optional[str]): Key id of the signing key (asymmetric only).
+
+    Returns:
+        KeySet: The loaded keys.
+
+    Raises:
+        ValueError: If the algorithm is unknown or the keys are missing.
+    """
+    if algorithm == SYMMETRIC_ALGORITHM:
+        return KeySet()
+
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise ValueError(f"Unsupported JWT algorithm: {algorithm}")
+    if not keys_dir or not active_kid:
+        raise ValueError(f"{algorithm} requires JWT_KEYS_DIR and JWT_ACTIVE_KID")
+
+    from cryptography.hazmat.primitives.serialization import (
+        load_pem_private_key,
+        load_pem_public_key,
+    )
+
+    signing_key = None
+    verification_keys = {}
+    for path in sorted(Path(keys_dir).glob("*.pem")):
+        pem = path.read_bytes()
+        if b"PRIVATE KEY" in pem:
+            private_key = load_pem_private_key(pem, password=None)
+            public_key = private_key.public_key()
+            if path.stem == active_kid:
+                signing_key = private_key
+        else:
+            public_key = load_pem_public_key(pem)
+        verification_keys[path.stem] = public_key
+
+    if signing_key is None:
+        raise ValueError(f"No private key {active_kid}.pem in {keys_dir}")
+
+    return KeySet(
+        algorithm=algorithm,
+        signing_kid=active_kid,
+        signing_key=signing_key,
+        verification_keys=verification_keys,
+        jwks={
+            "keys": [
+                public_jwk(kid, key, algorithm)
+                for kid, key in verification_keys.items()
+            ]
+        },
+    )
+
+
+@cache
+def get_key_set() -> KeySet:
+    """
+    Returns the configured keys, loaded from disk on the first call only.
+    """
+    return load_key_set(
+        os.getenv("JWT_ALGORITHM", SYMMETRIC_ALGORITHM),
+        os.getenv("JWT_KEYS_DIR"),
+        os.getenv("JWT_ACTIVE_KID"),
+    )
+
+
+def generate_private_key(algorithm: str) -> bytes:
+    """
+    Creates a new private key for `algorithm` in PEM format.
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if algorithm == "RS256":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise ValueError(f"Unsupported JWT algorithm: {algorithm}")
+
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create a JWT signing key")
+    parser.add_argument("--algorithm", choices=ASYMMETRIC_ALGORITHMS, default="EdDSA")
+    parser.add_argument("--dir", required=True)
+    parser.add_argument("--kid", required=True)
+    args = parser.parse_args()
+
+    path = Path(args.dir) / f"{args.kid}.pem"
+    if path.exists():
+        parser.error(f"{path} already exists")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(generate_private_key(args.algorithm))
+    path.chmod(0o600)
+    print(f"Created {path}")
+
+
+if __name__ == "__main__":
+    main()
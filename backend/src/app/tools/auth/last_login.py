@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from sqlmodel import Session, update
+
+from app.database import engine
+from app.models import User
+from app.tools.db.buffered_writer import BufferedWriter
+
+
+def update_last_login_dates(rows: list[tuple[int, datetime]]):
+    """
+    Writes a batch of logins as one executemany UPDATE by primary key.
+
+    Only the latest login of every user in the batch is written.
+
+    Args:
+        rows (list[tuple[int, datetime]]): (user id, UTC login time) pairs.
+    """
+    latest = {}
+    for user_id, login_date in rows:
+        if user_id not in latest or latest[user_id] < login_date:
+            latest[user_id] = login_date
+
+    with Session(engine) as session:
+        session.execute(
+            update(User),
+            [
+                {"id": user_id, "last_login_date": login_date}
+                for user_id, login_date in latest.items()
+            ],
+        )
+        session.commit()
+
+
+last_login_writer = BufferedWriter(
+    update_last_login_dates, max_size=500, flush_interval=5.0, name="last-login-writer"
+)
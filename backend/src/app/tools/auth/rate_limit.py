@@ -0,0 +1,198 @@
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    Token bucket settings: `capacity` requests, refilled evenly over `per_seconds`.
+
+    Attributes:
+        name (str): Prefix of the bucket keys (one bucket per limit and key).
+        capacity (int): Burst size.
+        per_seconds (float): Time to refill an empty bucket.
+    """
+    name: str
+    capacity: int
+    per_seconds: float
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.per_seconds
+
+    @classmethod
+    def from_env(cls, name: str, variable: str, default: str) -> "RateLimit":
+        """
+        Reads a limit written as "<capacity>/<seconds>", e.g. RATE_LIMIT_LOGIN_IP=20/60.
+        """
+        capacity, per_seconds = os.getenv(variable, default).split("/")
+        return cls(name, int(capacity), float(per_seconds))
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage of token buckets used by RateLimiter.
+
+    The in-memory backend limits every worker separately; a shared backend
+    (e.g. Redis with an atomic script) enforces one limit across workers.
+    """
+
+    @abstractmethod
+    def consume(self, key: str, limit: RateLimit, cost: int = 1) -> float:
+        """
+        Takes `cost` tokens from the bucket if it holds enough.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise seconds until they are available.
+        """
+
+    @abstractmethod
+    def available(self, key: str, limit: RateLimit) -> float:
+        """
+        Returns the number of tokens in the bucket without taking any.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process token buckets.
+
+    Args:
+        max_keys (int): When exceeded, buckets that have refilled completely
+            (equivalent to absent ones) are dropped, bounding memory under
+            traffic from many addresses.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: dict[str, tuple[float, float, RateLimit]] = {}
+        self._lock = threading.Lock()
+
+    def _tokens(self, key: str, limit: RateLimit, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return limit.capacity
+        tokens, updated, _ = bucket
+        return min(limit.capacity, tokens + (now - updated) * limit.refill_rate)
+
+    def consume(self, key, limit, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._tokens(key, limit, now)
+            if tokens < cost:
+                return (cost - tokens) / limit.refill_rate
+
+            self._buckets[key] = (tokens - cost, now, limit)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return 0.0
+
+    def available(self, key, limit):
+        with self._lock:
+            return self._tokens(key, limit, time.monotonic())
+
+    def _prune(self, now: float):
+        full = [
+            key
+            for key, (_, _, limit) in self._buckets.items()
+            if self._tokens(key, limit, now) >= limit.capacity
+        ]
+        for key in full:
+            del self._buckets[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._buckets)
+
+
+class RateLimiter:
+    """
+    Rejects requests exceeding a RateLimit with 429 and a Retry-After header.
+
+    Args:
+        backend (Optional[RateLimitBackend]): Bucket storage, in-memory if None.
+    """
+
+    def __init__(self, backend: Optional[RateLimitBackend] = None):
+        self.backend = backend or InMemoryRateLimitBackend()
+
+    def hit(self, limit: RateLimit, key: str):
+        """
+        Counts one request against the bucket of `key`.
+
+        Raises:
+            HTTPException: (429) If the bucket is empty.
+        """
+        retry_after = self.backend.consume(f"{limit.name}:{key}", limit)
+        if retry_after > 0:
+            raise too_many_requests(retry_after)
+
+    def ensure_available(self, limit: RateLimit, key: str):
+        """
+        Checks that the bucket of `key` is not empty, without counting a request.
+
+        Used for lockouts: failures are recorded with `record`, and once they
+        emptied the bucket further attempts are rejected until it refills.
+
+        Raises:
+            HTTPException: (429) If the bucket is empty.
+        """
+        tokens = self.backend.available(f"{limit.name}:{key}", limit)
+        if tokens < 1:
+            raise too_many_requests((1 - tokens) / limit.refill_rate)
+
+    def record(self, limit: RateLimit, key: str):
+        """
+        Takes one token from the bucket of `key` if any is left.
+        """
+        self.backend.consume(f"{limit.name}:{key}", limit)
+
+
+def too_many_requests(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many requests, try again later",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def client_ip(request: Request) -> str:
+    """
+    Address of the client. Behind a reverse proxy run uvicorn with
+    --proxy-headers so that it reflects X-Forwarded-For.
+    """
+    return request.client.host if request.client else "unknown"
+
+
+rate_limiter = RateLimiter()
+
+LOGIN_IP_LIMIT = RateLimit.from_env("login-ip", "RATE_LIMIT_LOGIN_IP", "20/60")
+REGISTER_IP_LIMIT = RateLimit.from_env("register-ip", "RATE_LIMIT_REGISTER_IP", "5/3600")
+# failed logins per login identifier before it is locked out until the bucket refills
+LOGIN_FAILURE_LIMIT = RateLimit.from_env(
+    "login-failures", "RATE_LIMIT_LOGIN_FAILURES", "5/900"
+)
+
+
+def rate_limit(limit: RateLimit):
+    """
+    Creates a FastAPI dependency limiting requests per client IP.
+
+    Args:
+        limit (RateLimit): The limit applied to every client address.
+
+    Returns:
+        Callable: A dependency raising 429 when the client exceeded the limit.
+    """
+
+    def dependency(request: Request):
+        rate_limiter.hit(limit, client_ip(request))
+
+    return dependency
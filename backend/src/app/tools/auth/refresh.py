@@ -0,0 +1,135 @@
+import logging
+import os
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlmodel import Session, delete, select, update
+
+from ...models import RefreshToken
+from .revocation import hash_token
+from app.tools.db.periodic_task import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+REFRESH_TOKEN_DAYS = int(os.getenv("REFRESH_TOKEN_DAYS", "30"))
+PURGE_INTERVAL = float(os.getenv("REFRESH_TOKEN_PURGE_SECONDS", "3600"))
+
+
+def issue_refresh_token(
+    user_id: int, db: Session, family_id: Optional[str] = None
+) -> str:
+    """
+    Creates a refresh token for a user and adds its hash to the session.
+
+    The caller is responsible for committing the session.
+
+    Args:
+        user_id (int): The ID of the user.
+        db (Session): The database session.
+        family_id (Optional[str]): Family of a rotated token, a new family if None.
+
+    Returns:
+        str: The refresh token (only returned once, the database keeps its hash).
+    """
+    token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    db.add(
+        RefreshToken(
+            user_id=user_id,
+            token_hash=hash_token(token),
+            family_id=family_id or uuid.uuid4().hex,
+            creation_date=now,
+            expiration_date=now + timedelta(days=REFRESH_TOKEN_DAYS),
+        )
+    )
+    return token
+
+
+def rotate_refresh_token(token: str, db: Session):
+    """
+    Exchanges a refresh token for a new one of the same family.
+
+    Args:
+        token (str): The presented refresh token.
+        db (Session): The database session.
+
+    Returns:
+        tuple[int, str]: The user ID and the new refresh token.
+
+    Raises:
+        HTTPException: (401) If the token is unknown, expired or was already
+            used; in the last case every token of its family is revoked.
+    """
+    entry = db.exec(
+        select(RefreshToken)
+        .where(RefreshToken.token_hash == hash_token(token))
+        .with_for_update()
+    ).first()
+
+    if entry is None or entry.expiration_date <= datetime.utcnow():
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    if entry.revoked:
+        logger.warning("Refresh token reuse detected for user %s", entry.user_id)
+        revoke_refresh_token_family(entry.family_id, db)
+        db.commit()
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    entry.revoked = True
+    new_token = issue_refresh_token(entry.user_id, db, entry.family_id)
+    db.commit()
+
+    return entry.user_id, new_token
+
+
+def revoke_refresh_token(token: str, db: Session):
+    """
+    Revokes the family of a refresh token (logout). Unknown tokens are ignored.
+
+    The caller is responsible for committing the session.
+    """
+    family_id = db.exec(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_token(token))
+    ).first()
+
+    if family_id is not None:
+        revoke_refresh_token_family(family_id, db)
+
+
+def revoke_refresh_token_family(family_id: str, db: Session):
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked.is_(False))
+        .values(revoked=True)
+    )
+
+
+def purge_expired_refresh_tokens(db: Session) -> int:
+    """
+    Deletes refresh tokens past their expiration date.
+
+    Returns:
+        int: Number of deleted rows.
+    """
+    result = db.execute(
+        delete(RefreshToken).where(RefreshToken.expiration_date <= datetime.utcnow())
+    )
+    db.commit()
+    return result.rowcount
+
+
+def _purge_from_engine():
+    from app.database import engine
+
+    with Session(engine) as db:
+        deleted = purge_expired_refresh_tokens(db)
+    if deleted:
+        logger.info("Purged %d expired refresh tokens", deleted)
+
+
+refresh_token_purge_task = PeriodicTask(
+    _purge_from_engine, PURGE_INTERVAL, "refresh-tokens-purge"
+)
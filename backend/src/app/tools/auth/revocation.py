@@ -0,0 +1,220 @@
+import hashlib
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlmodel import Session, delete, select
+
+from ...models import ExpireTokens
+from app.tools.db.periodic_task import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+PURGE_INTERVAL = float(os.getenv("REVOCATION_PURGE_SECONDS", "3600"))
+
+
+def hash_token(value: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a token (or of its `jti` claim).
+    """
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def to_naive_utc(date: datetime) -> datetime:
+    if date.tzinfo is None:
+        return date
+    return date.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class RevocationBackend(ABC):
+    """
+    Storage of revocation keys (see `jwt_handler.get_revocation_key`) used by RevocationCache.
+
+    Attributes:
+        shared (bool): True if all workers see the same data (e.g. a Redis
+            backend). Shared backends are not re-synchronized from the database,
+            revocations made by one worker are visible to the others at once.
+    """
+    shared: bool = False
+
+    @abstractmethod
+    def add(self, revocation_key: str, expiration_date: datetime):
+        """
+        Marks a key as revoked until its expiration date (naive UTC).
+        """
+
+    def add_many(self, entries: Iterable[tuple[str, datetime]]):
+        for revocation_key, expiration_date in entries:
+            self.add(revocation_key, expiration_date)
+
+    @abstractmethod
+    def contains(self, revocation_key: str) -> bool:
+        """
+        Returns True if the key has been revoked.
+        """
+
+
+class InMemoryRevocationBackend(RevocationBackend):
+    """
+    Per-process TTL set of revocation keys.
+
+    Entries are dropped once their token has expired (an expired token is
+    rejected by signature verification anyway), so memory is bounded by the
+    number of revoked tokens that are still alive.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def add(self, revocation_key, expiration_date):
+        with self._lock:
+            self._entries[revocation_key] = expiration_date
+
+    def contains(self, revocation_key):
+        with self._lock:
+            return revocation_key in self._entries
+
+    def purge(self, now: Optional[datetime] = None) -> int:
+        """
+        Removes expired entries.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        now = now or datetime.utcnow()
+        with self._lock:
+            expired = [key for key, date in self._entries.items() if date <= now]
+            for revocation_key in expired:
+                del self._entries[revocation_key]
+        return len(expired)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class RevocationCache:
+    """
+    Answers "is this token revoked?" without a database round trip.
+
+    The cache is warmed from the expired_tokens table at startup and is then
+    kept up to date by `revoke` (tokens invalidated by this worker) and by a
+    periodic sync that re-reads every unexpired row, so rows committed by
+    other workers are picked up whatever their id (ids are allocated before
+    commit, so a row with a lower id may become visible after a higher one).
+    The table only holds live revoked tokens (see `purge_expired_tokens`),
+    which keeps the re-read small. With a non-shared backend a token
+    revoked in another worker is therefore accepted for at most the sync
+    interval; use a shared backend to remove that window.
+
+    Until the first successful warm-up `ready` is False and callers must fall
+    back to querying the database.
+
+    Args:
+        backend (Optional[RevocationBackend]): Storage, in-memory if None.
+        sync_interval (float): Seconds between two synchronizations.
+    """
+
+    def __init__(
+        self, backend: Optional[RevocationBackend] = None, sync_interval: float = SYNC_INTERVAL
+    ):
+        self.backend = backend or InMemoryRevocationBackend()
+        self.ready = False
+        self._sync_lock = threading.Lock()
+        self._task = PeriodicTask(self._periodic_sync, sync_interval, "revocation-sync")
+
+    def is_revoked(self, revocation_key: str) -> bool:
+        return self.backend.contains(revocation_key)
+
+    def revoke(self, revocation_key: str, expiration_date: datetime):
+        self.backend.add(revocation_key, to_naive_utc(expiration_date))
+
+    def sync(self, db: Session) -> int:
+        """
+        Loads all unexpired revocations from the database.
+
+        Returns:
+            int: Number of loaded rows.
+        """
+        with self._sync_lock:
+            rows = db.exec(
+                select(ExpireTokens.token_value, ExpireTokens.expiration_date).where(
+                    ExpireTokens.expiration_date > datetime.utcnow()
+                )
+            ).all()
+
+            self.backend.add_many(
+                (token_value, to_naive_utc(expiration_date))
+                for token_value, expiration_date in rows
+            )
+            self.ready = True
+
+            if isinstance(self.backend, InMemoryRevocationBackend):
+                self.backend.purge()
+
+            return len(rows)
+
+    def start(self):
+        """
+        Warms the cache and starts the periodic sync.
+        """
+        try:
+            self._sync_from_engine()
+        except Exception:
+            logger.exception("Revocation cache warm-up failed, using the database")
+
+        if not self.backend.shared:
+            self._task.start()
+
+    def stop(self):
+        self._task.stop()
+
+    def _periodic_sync(self):
+        try:
+            self._sync_from_engine()
+        except Exception:
+            # a stale cache could accept tokens revoked by other workers
+            self.ready = False
+            raise
+
+    def _sync_from_engine(self):
+        from app.database import engine
+
+        with Session(engine) as db:
+            self.sync(db)
+
+
+def purge_expired_tokens(db: Session) -> int:
+    """
+    Deletes expired_tokens rows past their expiration date.
+
+    Expired tokens are rejected by signature verification, so their rows are
+    no longer needed and the table stays bounded by the number of live
+    revoked tokens.
+
+    Returns:
+        int: Number of deleted rows.
+    """
+    result = db.execute(
+        delete(ExpireTokens).where(ExpireTokens.expiration_date <= datetime.utcnow())
+    )
+    db.commit()
+    return result.rowcount
+
+
+def _purge_from_engine():
+    from app.database import engine
+
+    with Session(engine) as db:
+        deleted = purge_expired_tokens(db)
+    if deleted:
+        logger.info("Purged %d expired tokens", deleted)
+
+
+revocation_cache = RevocationCache()
+token_purge_task = PeriodicTask(_purge_from_engine, PURGE_INTERVAL, "expired-tokens-purge")
@@ -0,0 +1,63 @@
+import os
+import threading
+import time
+from typing import Iterable, Optional
+
+ROLE_CACHE_SECONDS = float(os.getenv("ROLE_CACHE_SECONDS", "60"))
+
+
+class RoleCache:
+    """
+    Per-process cache of users' role names with a short time to live.
+
+    Lets `authenticate(roles=[...])` skip loading the user and its roles on
+    every request. Role changes made in this process should call
+    `invalidate_user_roles`; other workers see them after at most `ttl`
+    seconds.
+
+    Args:
+        ttl (float): Seconds an entry stays valid.
+    """
+
+    def __init__(self, ttl: float = ROLE_CACHE_SECONDS):
+        self.ttl = ttl
+        self._entries: dict[int, tuple[float, frozenset[str]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[frozenset[str]]:
+        """
+        Returns the cached role names of a user, None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, roles = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            return roles
+
+    def set(self, user_id: int, roles: Iterable[str]):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, frozenset(roles))
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """
+        Drops the entry of one user, or all entries if `user_id` is None.
+        """
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+role_cache = RoleCache()
+
+
+def invalidate_user_roles(user_id: Optional[int] = None):
+    """
+    Must be called after the roles of a user are changed (all users if None).
+    """
+    role_cache.invalidate(user_id)
@@ -0,0 +1,130 @@
+import logging
+import threading
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedWriter:
+    """
+    Collects rows in memory and writes them in batches from a background thread.
+
+    Request handlers only append to an in-memory buffer, the actual write
+    (`flush_rows`) runs every `flush_interval` seconds or as soon as
+    `max_size` rows are waiting, so a request never pays for a synchronous
+    INSERT/UPDATE of data that can be persisted a moment later.
+
+    Args:
+        flush_rows (Callable[[List[Any]], None]): Writes one batch of rows.
+        max_size (int): Number of buffered rows that triggers a flush.
+        flush_interval (float): Maximum time in seconds a row waits in the buffer.
+        name (str): Name of the background thread (used in logs).
+
+    Notes:
+        - Rows are lost if the process dies before they are flushed; only use it
+          for data that can tolerate that (logs, activity timestamps).
+        - When the background thread is not running (tests, scripts) a full
+          buffer is flushed synchronously by `add`.
+        - A failing batch is logged and dropped so the buffer stays bounded.
+    """
+
+    def __init__(
+        self,
+        flush_rows: Callable[[List[Any]], None],
+        max_size: int = 500,
+        flush_interval: float = 1.0,
+        name: str = "buffered-writer",
+    ):
+        self.flush_rows = flush_rows
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.name = name
+
+        self._rows: List[Any] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, row: Any):
+        """
+        Buffers a single row.
+        """
+        self.extend([row])
+
+    def extend(self, rows: List[Any]):
+        """
+        Buffers several rows, waking the flusher when the buffer is full.
+        """
+        if not rows:
+            return
+
+        with self._lock:
+            self._rows.extend(rows)
+            full = len(self._rows) >= self.max_size
+
+        if full:
+            if self.running:
+                self._wakeup.set()
+            else:
+                self.flush()
+
+    def flush(self) -> int:
+        """
+        Writes all buffered rows.
+
+        Returns:
+            int: Number of rows handed to `flush_rows`.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+
+            if not rows:
+                return 0
+
+            try:
+                self.flush_rows(rows)
+            except Exception:
+                logger.exception("%s: dropping batch of %d rows", self.name, len(rows))
+
+            return len(rows)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Starts the background flushing thread.
+        """
+        if self.running:
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background thread and flushes what is left in the buffer.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self.flush()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
@@ -0,0 +1,153 @@
+"""
+Total counts of paginated listings.
+
+`query.count()` runs the whole filtered query (joins, DISTINCT) once more
+just to number the pages, which on big tables costs as much as the page
+itself. List endpoints take a `count` parameter choosing the strategy:
+
+    exact     SELECT count(*), the default
+    cached    exact count, reused for COUNT_CACHE_SECONDS per normalized query
+    estimate  row estimate of the PostgreSQL planner (EXPLAIN), exact when
+              the estimate is below COUNT_ESTIMATE_EXACT_BELOW
+    none      no count; clients page with `has_more`/`next_cursor`
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Query
+
+COUNT_STRATEGIES = ("exact", "cached", "estimate", "none")
+COUNT_PATTERN = "^(exact|cached|estimate|none)$"
+
+COUNT_CACHE_SECONDS = float(os.getenv("COUNT_CACHE_SECONDS", "30"))
+COUNT_CACHE_SIZE = int(os.getenv("COUNT_CACHE_SIZE", "10000"))
+# planner estimates of small results are often far off and exact counts are cheap there
+COUNT_ESTIMATE_EXACT_BELOW = int(os.getenv("COUNT_ESTIMATE_EXACT_BELOW", "1000"))
+
+
+class CountCache:
+    """
+    Time-limited cache of listing counts.
+
+    Args:
+        ttl (float): Seconds a count is reused.
+        max_entries (int): When exceeded, expired entries are dropped, then the oldest ones.
+    """
+
+    def __init__(self, ttl: float = COUNT_CACHE_SECONDS, max_entries: int = COUNT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            count, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            return count
+
+    def set(self, key: str, count: int):
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (count, now + self.ttl)
+            if len(self._entries) > self.max_entries:
+                self._prune(now)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _prune(self, now: float):
+        for key in [key for key, (_, expires) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        # dicts keep insertion order, so the first keys are the oldest
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+count_cache = CountCache()
+
+
+def compile_query(query: Query):
+    # render_postcompile expands IN lists into plain placeholders
+    return query.statement.compile(
+        dialect=query.session.get_bind().dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+
+
+def query_key(query: Query) -> str:
+    """
+    Normalized form of a query: its SQL and bound parameters, hashed.
+
+    Two requests with the same filters (including the requesting user where
+    the query depends on it) get the same key whatever the page.
+    """
+    compiled = compile_query(query)
+    params = sorted((name, repr(value)) for name, value in compiled.params.items())
+    return hashlib.sha256(f"{compiled}|{params}".encode()).hexdigest()
+
+
+def estimate_count(query: Query) -> Optional[int]:
+    """
+    Returns the number of rows the PostgreSQL planner expects from `query`.
+
+    Returns:
+        Optional[int]: The estimate, None on other databases.
+    """
+    bind = query.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+
+    compiled = compile_query(query)
+    plan = (
+        query.session.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar()
+    )
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_total(query: Query, strategy: str = "exact") -> Optional[int]:
+    """
+    Counts the rows of a listing with the given strategy.
+
+    Args:
+        query (Query): Filtered query, without ORDER BY/OFFSET/LIMIT.
+        strategy (str): One of COUNT_STRATEGIES.
+
+    Returns:
+        Optional[int]: The (possibly cached or estimated) count, None for "none".
+    """
+    if strategy == "none":
+        return None
+
+    if strategy == "cached":
+        key = query_key(query)
+        count = count_cache.get(key)
+        if count is None:
+            count = query.count()
+            count_cache.set(key, count)
+        return count
+
+    if strategy == "estimate":
+        estimate = estimate_count(query)
+        if estimate is not None and estimate >= COUNT_ESTIMATE_EXACT_BELOW:
+            return estimate
+
+    return query.count()
@@ -0,0 +1,167 @@
+"""
+Maintenance of the deck_stats counters.
+
+Endpoints changing flashcards of a deck, media of a flashcard, saves or
+comments call `adjust_deck_stats` with the change (e.g. saves_count=1) in
+the same transaction. Counters are updated with relative UPDATEs, so
+concurrent requests add up instead of overwriting each other.
+
+Usage (recompute every deck, e.g. after manual data fixes):
+    python -m app.tools.db.deck_stats
+"""
+from typing import Iterable, Optional, Union
+
+from sqlalchemy import Select, and_, exists, func, or_, select, update
+from sqlmodel import Session
+
+from ...models import (
+    Comment,
+    Deck,
+    DeckFlashcard,
+    DeckStats,
+    Flashcard,
+    FlashcardSideMedia,
+    SavedDeck,
+)
+
+DeckIds = Union[Iterable[int], Select]
+
+
+def flashcard_has_media(flashcard: Flashcard) -> bool:
+    return bool(flashcard.front_side.media or flashcard.back_side.media)
+
+
+def decks_of_flashcards(flashcard_ids: Iterable[int]) -> Select:
+    """
+    Returns a SELECT of the ids of the decks containing any of the flashcards.
+    """
+    return select(DeckFlashcard.deck_id).where(
+        DeckFlashcard.flashcard_id.in_(list(flashcard_ids))
+    )
+
+
+def flashcards_delta(
+    added: Iterable[Flashcard] = (), removed: Iterable[Flashcard] = ()
+) -> dict:
+    """
+    Counter changes of adding and removing flashcards of a deck.
+    """
+    added, removed = list(added), list(removed)
+    return {
+        "flashcards_count": len(added) - len(removed),
+        "media_flashcards_count": sum(map(flashcard_has_media, added))
+        - sum(map(flashcard_has_media, removed)),
+    }
+
+
+def create_deck_stats(db: Session, deck: Deck, flashcards: Iterable[Flashcard]):
+    """
+    Adds the stats row of a new deck. The deck must have been flushed.
+    """
+    db.add(DeckStats(deck_id=deck.id, **flashcards_delta(added=flashcards)))
+
+
+def adjust_deck_stats(db: Session, deck_ids: DeckIds, **deltas: int):
+    """
+    Adds the given changes to the counters of some decks.
+
+    Args:
+        db (Session): The database session; the caller commits.
+        deck_ids (DeckIds): Deck ids, or a SELECT of deck ids.
+        **deltas (int): Change of each counter, e.g. saves_count=1.
+    """
+    values = {
+        name: getattr(DeckStats, name) + delta for name, delta in deltas.items() if delta
+    }
+    if not values:
+        return
+    if not isinstance(deck_ids, Select):
+        deck_ids = list(deck_ids)
+
+    db.execute(
+        update(DeckStats)
+        .where(DeckStats.deck_id.in_(deck_ids))
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+    if "media_flashcards_count" in values:
+        sync_has_media(db, deck_ids)
+
+
+def adjust_media_flashcards(db: Session, flashcard_ids: Iterable[int], delta: int):
+    """
+    Counts flashcards that gained (delta=1) or lost (delta=-1) their last
+    media in every deck containing them.
+    """
+    # one UPDATE per flashcard: a deck containing several of them changes by each
+    for flashcard_id in flashcard_ids:
+        adjust_deck_stats(
+            db, decks_of_flashcards([flashcard_id]), media_flashcards_count=delta
+        )
+
+
+def sync_has_media(db: Session, deck_ids: Optional[DeckIds] = None):
+    """
+    Sets Deck.has_media from media_flashcards_count, for all decks if deck_ids is None.
+    """
+    has_media = (
+        select(DeckStats.media_flashcards_count > 0)
+        .where(DeckStats.deck_id == Deck.id)
+        .scalar_subquery()
+    )
+    statement = update(Deck).values(has_media=func.coalesce(has_media, False))
+    if deck_ids is not None:
+        statement = statement.where(Deck.id.in_(deck_ids))
+    db.execute(statement.execution_options(synchronize_session=False))
+
+
+def rebuild_deck_stats(db: Session):
+    """
+    Recomputes the counters of every deck from the link tables and commits.
+    """
+    db.execute(
+        DeckStats.__table__.insert().from_select(
+            ["deck_id"],
+            select(Deck.id).where(~exists().where(DeckStats.deck_id == Deck.id)),
+        )
+    )
+
+    in_deck = DeckFlashcard.deck_id == DeckStats.deck_id
+    side_has_media = exists().where(
+        or_(
+            FlashcardSideMedia.flashcard_side_id == Flashcard.front_side_id,
+            FlashcardSideMedia.flashcard_side_id == Flashcard.back_side_id,
+        )
+    )
+    db.execute(
+        update(DeckStats)
+        .values(
+            flashcards_count=select(func.count()).where(in_deck).scalar_subquery(),
+            media_flashcards_count=select(func.count())
+            .select_from(DeckFlashcard)
+            .join(Flashcard, Flashcard.id == DeckFlashcard.flashcard_id)
+            .where(in_deck, side_has_media)
+            .scalar_subquery(),
+            saves_count=select(func.count())
+            .where(SavedDeck.deck_id == DeckStats.deck_id)
+            .scalar_subquery(),
+            comments_count=select(func.count())
+            .where(and_(Comment.deck_id == DeckStats.deck_id, Comment.is_deleted.is_(False)))
+            .scalar_subquery(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    sync_has_media(db)
+    db.commit()
+
+
+def main():
+    from app.database import engine
+
+    with Session(engine) as db:
+        rebuild_deck_stats(db)
+    print("Deck statistics rebuilt")
+
+
+if __name__ == "__main__":
+    main()
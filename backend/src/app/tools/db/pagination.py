@@ -0,0 +1,141 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+def _decode_value(column, value):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    # JSON writes whole floats such as ranks of 0 as integers
+    if python_type is float and type(value) is int:
+        return float(value)
+    # bool is a subclass of int, but never a valid value of an int column
+    if not isinstance(value, python_type) or (
+        isinstance(value, bool) and python_type is not bool
+    ):
+        raise ValueError
+    return value
+
+
+class Keyset:
+    """
+    Sort key of a keyset (cursor) paginated listing.
+
+    The columns must identify a row uniquely (end with the primary key) and
+    should be covered by an index, so fetching the page after a cursor is an
+    index range scan whatever the page depth.
+
+    Args:
+        *columns: Model attributes of the sort key, e.g. (Comment.creation_date, Comment.id).
+        descending (bool): Sort direction, applied to all columns.
+    """
+
+    def __init__(self, *columns, descending: bool = False):
+        self.columns = columns
+        self.descending = descending
+
+    @property
+    def names(self) -> list[str]:
+        """
+        Names of the sort key columns, identifying the keyset a cursor was made for.
+        """
+        return [column.key for column in self.columns]
+
+    def order(self, query: Query) -> Query:
+        return query.order_by(
+            *(column.desc() if self.descending else column.asc() for column in self.columns)
+        )
+
+    def after(self, query: Query, cursor: str) -> Query:
+        """
+        Filters `query` to rows following the row the cursor was made from.
+        """
+        values = self.decode(cursor)
+        key = tuple_(*self.columns)
+        return query.filter(key < tuple_(*values) if self.descending else key > tuple_(*values))
+
+    def encode(self, entity: Any) -> str:
+        """
+        Creates the opaque cursor pointing after `entity`.
+        """
+        values = [getattr(entity, column.key) for column in self.columns]
+        payload = {
+            "k": [value.isoformat() if isinstance(value, datetime) else value for value in values],
+            "c": self.names,
+            "d": self.descending,
+        }
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> list:
+        """
+        Parses a cursor made by `encode`.
+
+        Raises:
+            HTTPException: (400) If the cursor is malformed, was made for another
+                sort key or direction, or holds values not matching the column types.
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            values = payload["k"]
+            if (
+                payload["c"] != self.names
+                or payload["d"] != self.descending
+                or len(values) != len(self.columns)
+            ):
+                raise ValueError
+            return [_decode_value(column, value) for column, value in zip(self.columns, values)]
+        except (ValueError, TypeError, KeyError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(
+    query: Query,
+    keyset: Keyset,
+    page: int,
+    page_size: int,
+    cursor: Optional[str] = None,
+    entity: Callable[[Any], Any] = lambda row: row,
+):
+    """
+    Loads one page of `query` ordered by `keyset`.
+
+    With a cursor the page starts right after the cursor's row (keyset
+    pagination, constant cost per page). Without one, `page` is used with
+    OFFSET for backwards compatibility. One extra row is fetched to know
+    whether another page exists.
+
+    Args:
+        query (Query): Filtered query, without ORDER BY/OFFSET/LIMIT.
+        keyset (Keyset): Sort key.
+        page (int): Page number, starting at 1 (ignored with a cursor).
+        page_size (int): Rows per page, 0 returns all rows.
+        cursor (Optional[str]): `next_cursor` of the previous page.
+        entity (Callable[[Any], Any]): Extracts the model instance from a row
+            (for queries returning tuples).
+
+    Returns:
+        tuple[list, Optional[str]]: Rows of the page and the cursor of the next
+            page (None on the last page).
+    """
+    query = keyset.order(query)
+
+    if cursor:
+        query = keyset.after(query, cursor)
+    elif page_size > 0:
+        query = query.offset((page - 1) * page_size)
+
+    if page_size <= 0:
+        return query.all(), None
+
+    rows = query.limit(page_size + 1).all()
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    return rows, keyset.encode(entity(rows[-1]))
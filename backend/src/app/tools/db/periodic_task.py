@@ -0,0 +1,51 @@
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs a function every `interval` seconds in a daemon thread.
+
+    Exceptions raised by the function are logged and the task keeps running.
+
+    Args:
+        func (Callable[[], None]): The function to run.
+        interval (float): Seconds between two runs.
+        name (str): Name of the thread (used in logs).
+    """
+
+    def __init__(self, func: Callable[[], None], interval: float, name: str):
+        self.func = func
+        self.interval = interval
+        self.name = name
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.func()
+            except Exception:
+                logger.exception("%s failed", self.name)
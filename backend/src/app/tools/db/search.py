@@ -0,0 +1,143 @@
+"""
+Full-text search over decks and flashcards (PostgreSQL).
+
+decks, flashcards and flashcard_sides have a generated `search_vector`
+column (tsvector of name/description/content) with a GIN index. A search
+matches rows whose vector contains every word of the query as a prefix
+("bio cell" finds "Biology: the cell"), or whose name matches the query as
+a substring or a near miss through pg_trgm indexes, so partial words and
+typos still find something.
+
+Each way of matching is a separate SELECT of ids served by its own index;
+the filter is `id IN (<their UNION>)`. An OR of the same conditions, or of
+IN subqueries over other tables, would make PostgreSQL scan the whole table.
+
+Results are ranked by ts_rank plus the trigram similarity of the name.
+"""
+import re
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Optional
+
+from sqlalchemy import Double, cast, func, literal, literal_column, select, union
+from sqlalchemy.sql.elements import ColumnElement
+
+from ...models import Deck, Flashcard, FlashcardSide
+from .pagination import Keyset
+
+# must match the configuration of the generated columns (see models.py)
+TEXT_SEARCH_CONFIG = "simple"
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def to_tsquery(q: str) -> Optional[ColumnElement]:
+    """
+    Converts user input into a prefix tsquery matching all of its words.
+
+    Returns:
+        Optional[ColumnElement]: The tsquery, None if the input has no words.
+    """
+    words = WORD_PATTERN.findall(q.lower())
+    if not words:
+        return None
+    return func.to_tsquery(
+        literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig"),
+        " & ".join(f"{word}:*" for word in words),
+    )
+
+
+@dataclass
+class SearchMatch:
+    """
+    Filter and relevance of a search.
+
+    Attributes:
+        condition (ColumnElement): WHERE clause of the matching rows.
+        rank (ColumnElement): Relevance of a row, higher first.
+    """
+    condition: ColumnElement
+    rank: ColumnElement
+
+    def keyset(self, id_column) -> Keyset:
+        """
+        Sort key of ranked results, ties broken by id.
+        """
+        return Keyset(self.rank, id_column, descending=True)
+
+    @staticmethod
+    def cursor_entity(row) -> SimpleNamespace:
+        """
+        Sort key values of a `(entity, ..., rank)` row, for `paginate(entity=...)`.
+        """
+        return SimpleNamespace(id=row[0].id, rank=row.rank)
+
+
+def _search(
+    id_column: ColumnElement,
+    vector: ColumnElement,
+    name_column: ColumnElement,
+    q: str,
+    tsquery: Optional[ColumnElement],
+    other_ids: tuple = (),
+) -> SearchMatch:
+    conditions = [name_column.ilike(f"%{q}%"), name_column.op("%")(q)]
+    text_rank = literal(0)
+    if tsquery is not None:
+        conditions.append(vector.op("@@")(tsquery))
+        text_rank = func.ts_rank(vector, tsquery)
+
+    matching_ids = union(
+        *(select(id_column).where(condition) for condition in conditions), *other_ids
+    )
+    # double precision survives the round trip through a cursor unchanged
+    rank = cast(text_rank + func.similarity(name_column, q), Double).label("rank")
+    return SearchMatch(id_column.in_(matching_ids), rank)
+
+
+def search_decks(q: str) -> SearchMatch:
+    """
+    Searches decks by name and description.
+
+    Args:
+        q (str): The user's search query.
+
+    Returns:
+        SearchMatch: Filter and rank over the Deck entity.
+    """
+    return _search(Deck.id, Deck.__table__.c.search_vector, Deck.name, q, to_tsquery(q))
+
+
+def search_flashcards(q: str) -> SearchMatch:
+    """
+    Searches flashcards by name and the content of both sides.
+
+    Content matches are found through the GIN index of flashcard_sides and
+    joined back by the indexed front/back side ids, one SELECT per side; only
+    the name contributes to the rank.
+
+    Args:
+        q (str): The user's search query.
+
+    Returns:
+        SearchMatch: Filter and rank over the Flashcard entity.
+    """
+    tsquery = to_tsquery(q)
+    content_ids = ()
+    if tsquery is not None:
+        side_matches = FlashcardSide.__table__.c.search_vector.op("@@")(tsquery)
+        content_ids = tuple(
+            select(Flashcard.id)
+            .join(FlashcardSide, FlashcardSide.id == side_id)
+            .where(side_matches)
+            for side_id in (Flashcard.front_side_id, Flashcard.back_side_id)
+        )
+
+    return _search(
+        Flashcard.id,
+        Flashcard.__table__.c.search_vector,
+        Flashcard.name,
+        q,
+        tsquery,
+        content_ids,
+    )
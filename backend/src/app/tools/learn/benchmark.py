@@ -0,0 +1,93 @@
+"""
+Throughput benchmark of the SM-2 scheduler: scalar vs array API.
+
+Usage:
+    python -m app.tools.learn.benchmark --size 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.models import Progress
+from app.tools.learn.learn import schedule_reviews, update_progress_after_review
+
+
+def random_states(size: int, seed: int = 0):
+    """
+    Generates random learning states and review qualities.
+
+    Args:
+        size (int): Number of states.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        tuple: efactor, repetition, interval and quality columns.
+    """
+    rng = np.random.default_rng(seed)
+    efactor = rng.uniform(1.3, 3.0, size)
+    repetition = rng.integers(0, 10, size)
+    interval = rng.integers(10, 60 * 24 * 90, size).astype(np.float64)
+    quality = rng.integers(0, 6, size)
+    return efactor, repetition, interval, quality
+
+
+def benchmark_scalar(size: int, seed: int = 0) -> float:
+    """
+    Measures `update_progress_after_review` applied to Progress objects one by one.
+
+    Returns:
+        float: Reviews scheduled per second.
+    """
+    efactor, repetition, interval, quality = random_states(size, seed)
+    progresses = [
+        Progress(efactor=float(e), repetition=int(r), interval=int(i))
+        for e, r, i in zip(efactor, repetition, interval)
+    ]
+    qualities = quality.tolist()
+
+    start = time.perf_counter()
+    for progress, q in zip(progresses, qualities):
+        update_progress_after_review(progress, q)
+    elapsed = time.perf_counter() - start
+
+    return size / elapsed
+
+
+def benchmark_vectorized(size: int, seed: int = 0) -> float:
+    """
+    Measures `schedule_reviews` applied to whole columns.
+
+    Returns:
+        float: Reviews scheduled per second.
+    """
+    efactor, repetition, interval, quality = random_states(size, seed)
+
+    start = time.perf_counter()
+    schedule_reviews(efactor, repetition, interval, quality)
+    elapsed = time.perf_counter() - start
+
+    return size / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument(
+        "--scalar-size",
+        type=int,
+        default=100_000,
+        help="Number of Progress objects for the (much slower) scalar path",
+    )
+    args = parser.parse_args()
+
+    scalar = benchmark_scalar(args.scalar_size)
+    vectorized = benchmark_vectorized(args.size)
+
+    print(f"scalar:     {scalar:>14,.0f} reviews/s ({args.scalar_size:,} states)")
+    print(f"vectorized: {vectorized:>14,.0f} reviews/s ({args.size:,} states)")
+    print(f"speedup:    {vectorized / scalar:>14,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
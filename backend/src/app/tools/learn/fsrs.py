@@ -0,0 +1,312 @@
+"""
+FSRS (Free Spaced Repetition Scheduler, version 4.5) formulas and parameter optimizer.
+
+The formulas accept scalars as well as NumPy arrays. Grades follow FSRS:
+1 = again, 2 = hard, 3 = good, 4 = easy (see `grade_from_quality`).
+Stability and elapsed time are expressed in days.
+
+Usage (nightly optimization of users' weights from review_log):
+    python -m app.tools.learn.fsrs --min-reviews 400 --workers 4
+"""
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+
+DECAY = -0.5
+FACTOR = 19 / 81
+
+DEFAULT_WEIGHTS = [
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+    0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755,
+]
+
+WEIGHT_BOUNDS = [
+    (0.1, 100), (0.1, 100), (0.1, 100), (0.1, 100), (1, 10), (0.1, 5),
+    (0.1, 5), (0, 0.5), (0, 3), (0.1, 0.8), (0.01, 2.5), (0.5, 5),
+    (0.01, 0.2), (0.01, 0.9), (0.01, 2), (0, 1), (1, 4),
+]
+
+# Reviews a user needs before personal weights are fitted.
+MIN_REVIEWS = 400
+
+DEFAULT_RETENTION = 0.9
+RETENTION_BOUNDS = (0.7, 0.97)
+
+
+def grade_from_quality(quality):
+    """
+    Maps SM-2 review quality (0–5) to an FSRS grade (1–4).
+    """
+    return np.clip(np.asarray(quality) - 1, 1, 4)
+
+
+def retrievability(elapsed_days, stability):
+    """
+    Probability of recall after `elapsed_days` for a memory of given stability.
+    """
+    return (1 + FACTOR * np.asarray(elapsed_days) / stability) ** DECAY
+
+
+def next_interval_days(stability, desired_retention: float):
+    """
+    Days until retrievability drops to `desired_retention` (at least one day).
+    """
+    interval = stability / FACTOR * (desired_retention ** (1 / DECAY) - 1)
+    return np.maximum(1, np.round(interval))
+
+
+def initial_stability(w, grade):
+    return np.asarray(w)[np.asarray(grade) - 1]
+
+
+def initial_difficulty(w, grade):
+    return np.clip(w[4] - (np.asarray(grade) - 3) * w[5], 1, 10)
+
+
+def next_difficulty(w, difficulty, grade):
+    difficulty = difficulty - w[6] * (np.asarray(grade) - 3)
+    # mean reversion towards the initial difficulty of a "good" answer
+    return np.clip(w[7] * w[4] + (1 - w[7]) * difficulty, 1, 10)
+
+
+def next_stability(w, difficulty, stability, r, grade):
+    """
+    Stability after a review made at retrievability `r`.
+    """
+    grade = np.asarray(grade)
+    hard_penalty = np.where(grade == 2, w[15], 1)
+    easy_bonus = np.where(grade == 4, w[16], 1)
+    recall = stability * (
+        1
+        + np.exp(w[8])
+        * (11 - difficulty)
+        * stability ** -w[9]
+        * (np.exp(w[10] * (1 - r)) - 1)
+        * hard_penalty
+        * easy_bonus
+    )
+    forget = (
+        w[11]
+        * difficulty ** -w[12]
+        * ((stability + 1) ** w[13] - 1)
+        * np.exp(w[14] * (1 - r))
+    )
+    return np.where(grade == 1, np.minimum(forget, stability), recall)
+
+
+def prepare_history(reviews: Iterable[tuple[int, int, datetime]]):
+    """
+    Turns a review stream into arrays grouped by review position.
+
+    Args:
+        reviews (Iterable[tuple[int, int, datetime]]): (card key, quality,
+            reviewed_at) tuples, the same stream `simulator.replay` accepts.
+
+    Returns:
+        list[tuple[np.ndarray, np.ndarray, np.ndarray]]: For every wave k (the
+            k-th review of each card): card indexes, grades and days elapsed
+            since the card's previous review.
+    """
+    rows = sorted(reviews, key=lambda row: (row[0], row[2]))
+    if not rows:
+        return []
+
+    keys = np.array([row[0] for row in rows], dtype=np.int64)
+    grades = grade_from_quality([row[1] for row in rows])
+    epoch = rows[0][2]
+    days = np.array(
+        [(row[2] - epoch).total_seconds() / 86400 for row in rows], dtype=np.float64
+    )
+
+    cards, card_index = np.unique(keys, return_inverse=True)
+    starts = np.searchsorted(keys, cards)
+    position = np.arange(len(keys)) - starts[card_index]
+    elapsed = np.zeros(len(keys))
+    elapsed[1:] = np.where(position[1:] > 0, days[1:] - days[:-1], 0)
+
+    waves = []
+    for k in range(int(position.max()) + 1):
+        in_wave = np.flatnonzero(position == k)
+        waves.append((card_index[in_wave], grades[in_wave], elapsed[in_wave]))
+    return waves
+
+
+def log_loss(w, waves) -> float:
+    """
+    Mean binary cross-entropy of predicted recall against actual answers.
+
+    Only reviews with at least one day since the previous review are scored,
+    same-day repeats carry almost no information about long-term memory.
+    """
+    w = np.asarray(w, dtype=np.float64)
+    if not waves:
+        return 0.0
+
+    cards = max(int(indexes.max()) for indexes, _, _ in waves) + 1
+    stability = np.zeros(cards)
+    difficulty = np.zeros(cards)
+    loss, count = 0.0, 0
+
+    first_indexes, first_grades, _ = waves[0]
+    stability[first_indexes] = initial_stability(w, first_grades)
+    difficulty[first_indexes] = initial_difficulty(w, first_grades)
+
+    for indexes, grades, elapsed in waves[1:]:
+        s, d = stability[indexes], difficulty[indexes]
+        r = np.clip(retrievability(elapsed, s), 1e-6, 1 - 1e-6)
+
+        scored = elapsed >= 1
+        recalled = grades > 1
+        loss -= np.sum(
+            np.where(recalled, np.log(r), np.log(1 - r))[scored]
+        )
+        count += int(scored.sum())
+
+        stability[indexes] = np.clip(next_stability(w, d, s, r, grades), 0.01, 36500)
+        difficulty[indexes] = next_difficulty(w, d, grades)
+
+    return loss / count if count else 0.0
+
+
+def optimize_weights(
+    reviews: list[tuple[int, int, datetime]],
+    initial: Optional[list[float]] = None,
+    iterations: int = 20,
+    min_reviews: int = MIN_REVIEWS,
+) -> list[float]:
+    """
+    Fits FSRS weights to one user's review history.
+
+    Uses coordinate search within WEIGHT_BOUNDS: every weight is scaled up and
+    down by a step that shrinks when no move improves `log_loss`. Histories
+    shorter than `min_reviews` keep the initial weights.
+
+    Args:
+        reviews (list[tuple[int, int, datetime]]): (card key, quality, reviewed_at).
+        initial (Optional[list[float]]): Starting weights, DEFAULT_WEIGHTS if None.
+        iterations (int): Number of passes over all weights.
+        min_reviews (int): Reviews needed before the weights are fitted.
+
+    Returns:
+        list[float]: The fitted weights.
+    """
+    w = np.array(initial or DEFAULT_WEIGHTS, dtype=np.float64)
+    if len(reviews) < min_reviews:
+        return w.tolist()
+
+    waves = prepare_history(reviews)
+    best = log_loss(w, waves)
+    step = 0.2
+
+    for _ in range(iterations):
+        improved = False
+        for i, (low, high) in enumerate(WEIGHT_BOUNDS):
+            for factor in (1 + step, 1 - step):
+                candidate = w.copy()
+                candidate[i] = np.clip(candidate[i] * factor, low, high)
+                loss = log_loss(candidate, waves)
+                if loss < best:
+                    w, best, improved = candidate, loss, True
+                    break
+        if not improved:
+            step /= 2
+            if step < 0.01:
+                break
+
+    return w.round(4).tolist()
+
+
+def _optimize_item(item):
+    user_id, reviews, initial, min_reviews = item
+    return user_id, optimize_weights(reviews, initial, min_reviews=min_reviews)
+
+
+def optimize_weights_batch(
+    histories: dict[int, list[tuple[int, int, datetime]]],
+    initial: Optional[dict[int, list[float]]] = None,
+    max_workers: Optional[int] = None,
+    min_reviews: int = MIN_REVIEWS,
+) -> dict[int, list[float]]:
+    """
+    Fits the weights of many users in parallel, one user per task in a process pool.
+
+    Args:
+        histories (dict[int, list]): Review stream of every user, keyed by user id.
+        initial (Optional[dict[int, list[float]]]): Current weights per user
+            (optimization continues from them).
+        max_workers (Optional[int]): Size of the process pool, CPU count if None.
+        min_reviews (int): Reviews a user needs before the weights are fitted.
+
+    Returns:
+        dict[int, list[float]]: Fitted weights per user id.
+    """
+    initial = initial or {}
+    items = [
+        (user_id, reviews, initial.get(user_id), min_reviews)
+        for user_id, reviews in histories.items()
+    ]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return dict(pool.map(_optimize_item, items, chunksize=1))
+
+
+def main():
+    from sqlmodel import Session, func, select
+
+    from app.database import engine
+    from app.models import ReviewLog, User
+    from app.tools.learn.scheduler import load_settings, valid_fsrs_weights
+
+    parser = argparse.ArgumentParser(description="Fit FSRS weights from review_log")
+    parser.add_argument("--min-reviews", type=int, default=MIN_REVIEWS)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        users = session.exec(
+            select(User)
+            .join(ReviewLog, ReviewLog.user_id == User.id)
+            .group_by(User.id)
+            .having(func.count(ReviewLog.id) >= args.min_reviews)
+        ).all()
+        users = {
+            user.id: user
+            for user in users
+            if load_settings(user.settings).get("scheduler") == "fsrs"
+        }
+
+        histories = {user_id: [] for user_id in users}
+        rows = session.exec(
+            select(
+                ReviewLog.user_id,
+                ReviewLog.flashcard_id,
+                ReviewLog.quality,
+                ReviewLog.reviewed_at,
+            ).where(ReviewLog.user_id.in_(users))
+        )
+        for user_id, flashcard_id, quality, reviewed_at in rows:
+            histories[user_id].append((flashcard_id, quality, reviewed_at))
+
+        initial = {
+            user_id: valid_fsrs_weights(load_settings(user.settings).get("fsrs_weights"))
+            for user_id, user in users.items()
+        }
+        weights = optimize_weights_batch(
+            histories, initial, args.workers, min_reviews=args.min_reviews
+        )
+
+        for user_id, user_weights in weights.items():
+            settings = load_settings(users[user_id].settings)
+            settings["fsrs_weights"] = user_weights
+            users[user_id].settings = json.dumps(settings)
+        session.commit()
+
+    print(f"Optimized FSRS weights of {len(weights)} users")
+
+
+if __name__ == "__main__":
+    main()
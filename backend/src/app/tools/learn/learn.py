@@ -1,4 +1,7 @@
 from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
 
 from app.models import Progress
 
@@ -39,23 +42,28 @@ def next_interval(repetition: int, interval: int, ef: float) -> int:
     return int(interval * ef)
 
 
-def update_progress_after_review(progress: Progress, quality: int):
+def update_progress_after_review(
+    progress: Progress, quality: int, reviewed_at: Optional[datetime] = None
+):
     """
     Updates the learning progress of an item after a review session.
 
     This function adjusts repetition count, review interval, E-Factor,
-    and review timestamps based on the provided review quality.
+    answer counters and review timestamps based on the provided review quality.
 
     Args:
         progress (Progress): The progress object representing the learning state.
         quality (int): The quality of the review response (typically 0–5).
+        reviewed_at (Optional[datetime]): UTC time of the review. Defaults to now,
+            set it when replaying reviews recorded earlier (e.g. offline clients).
 
     Returns:
         datetime: The scheduled date and time of the next review.
     """
-    now = datetime.utcnow()
+    now = reviewed_at or datetime.utcnow()
 
     if quality >= 3:
+        progress.correct_answers += 1
         progress.repetition += 1
         progress.interval = next_interval(
             progress.repetition,
@@ -63,6 +71,7 @@ def update_progress_after_review(progress: Progress, quality: int):
             progress.efactor,
         )
     else:
+        progress.incorrect_answers += 1
         progress.repetition = 0
         progress.interval = 10
 
@@ -72,3 +81,83 @@ def update_progress_after_review(progress: Progress, quality: int):
     progress.next_review_date = next_review_date
 
     return next_review_date
+
+
+def update_efactors(ef: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of `update_efactor`.
+
+    Args:
+        ef (np.ndarray): Current E-Factors.
+        q (np.ndarray): Review qualities (typically 0–5), same shape as `ef`.
+
+    Returns:
+        np.ndarray: The updated E-Factors, with a minimum value of 1.3.
+    """
+    ef = np.asarray(ef, dtype=np.float64)
+    q = np.asarray(q)
+    ef = ef + (0.1 - (5 - q) * (0.08 + (5 - q) * 0.02))
+    return np.maximum(1.3, ef)
+
+
+def next_intervals(
+    repetition: np.ndarray, interval: np.ndarray, ef: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized version of `next_interval`.
+
+    Args:
+        repetition (np.ndarray): Numbers of successful repetitions.
+        interval (np.ndarray): Previous review intervals in minutes. NaN is
+            treated like a missing interval (0).
+        ef (np.ndarray): Current E-Factors.
+
+    Returns:
+        np.ndarray: The next review intervals in minutes (int64).
+    """
+    repetition = np.asarray(repetition)
+    interval = np.nan_to_num(np.asarray(interval, dtype=np.float64))
+    ef = np.asarray(ef, dtype=np.float64)
+
+    scaled = np.trunc(interval * ef).astype(np.int64)
+    return np.select(
+        [repetition == 1, repetition == 2], [10, MINUTES_IN_DAY], default=scaled
+    )
+
+
+def schedule_reviews(
+    efactor: np.ndarray,
+    repetition: np.ndarray,
+    interval: np.ndarray,
+    quality: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Applies one review to many learning states at once.
+
+    This is the array counterpart of `update_progress_after_review`: every
+    position i of the input columns describes one Progress row and gets the
+    same result the scalar function would produce. Dates are left to the
+    caller, the next review is `reviewed_at + interval` minutes.
+
+    Args:
+        efactor (np.ndarray): Current E-Factors.
+        repetition (np.ndarray): Numbers of consecutive successful repetitions.
+        interval (np.ndarray): Current intervals in minutes (NaN when not set).
+        quality (np.ndarray): Review qualities (typically 0–5).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: New efactor, repetition and
+            interval columns.
+    """
+    efactor = np.asarray(efactor, dtype=np.float64)
+    repetition = np.asarray(repetition, dtype=np.int64)
+    quality = np.asarray(quality)
+
+    passed = quality >= 3
+    new_repetition = np.where(passed, repetition + 1, 0)
+    new_interval = np.where(
+        passed, next_intervals(new_repetition, interval, efactor), 10
+    )
+    new_efactor = update_efactors(efactor, quality)
+
+    return new_efactor, new_repetition, new_interval
@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from app.database import engine
+from app.models import Progress, ReviewLog
+from app.tools.db.buffered_writer import BufferedWriter
+
+
+def add_review_logs(db: Session, rows: list[dict]):
+    """
+    Inserts review log rows in the caller's transaction (one executemany INSERT).
+
+    Args:
+        db (Session): The database session; the caller commits.
+        rows (list[dict]): ReviewLog column values.
+    """
+    if rows:
+        db.execute(insert(ReviewLog), rows)
+
+
+def insert_review_logs(rows: list[dict]):
+    """
+    Inserts a batch of review log rows with a single executemany INSERT.
+
+    Args:
+        rows (list[dict]): ReviewLog column values.
+    """
+    with Session(engine) as session:
+        add_review_logs(session, rows)
+        session.commit()
+
+
+review_log_writer = BufferedWriter(
+    insert_review_logs, max_size=1000, flush_interval=2.0, name="review-log-writer"
+)
+
+
+def review_log_entry(
+    progress: Progress, quality: int, previous_review_date: Optional[datetime]
+) -> dict:
+    """
+    Builds the review log row of a review that has just been applied.
+
+    Build the entries before committing (committing expires `progress`, and
+    reading it afterwards would reload each row) and pass them to
+    `review_log_writer` once the commit succeeded, so only persisted reviews
+    are logged.
+
+    Args:
+        progress (Progress): Progress state after `update_progress_after_review`.
+        quality (int): The quality of the review response (typically 0–5).
+        previous_review_date (Optional[datetime]): `progress.last_review_date`
+            before the review was applied.
+
+    Returns:
+        dict: ReviewLog column values.
+    """
+    return {
+        "user_id": progress.user_id,
+        "flashcard_id": progress.flashcard_id,
+        "quality": quality,
+        "reviewed_at": progress.last_review_date,
+        "previous_review_date": previous_review_date,
+        "interval": progress.interval,
+        "efactor": progress.efactor,
+        "repetition": progress.repetition,
+    }
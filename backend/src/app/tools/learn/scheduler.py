@@ -0,0 +1,183 @@
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.models import Progress
+from app.tools.learn import fsrs
+from app.tools.learn.learn import update_progress_after_review
+
+# Interval in minutes after a failed review (same as SM-2).
+RELEARN_INTERVAL = 10
+DEFAULT_SCHEDULER = "sm2"
+
+
+class Scheduler(ABC):
+    """
+    Base class of spaced repetition scheduling engines.
+
+    A scheduler applies one review to a Progress row: it updates the
+    engine-specific memory state and sets `interval`, `last_review_date` and
+    `next_review_date`.
+    """
+    name: str = ""
+
+    @abstractmethod
+    def review(
+        self, progress: Progress, quality: int, reviewed_at: Optional[datetime] = None
+    ) -> datetime:
+        """
+        Applies a review to `progress`.
+
+        Args:
+            progress (Progress): The progress object representing the learning state.
+            quality (int): The quality of the review response (0–5).
+            reviewed_at (Optional[datetime]): UTC time of the review, defaults to now.
+
+        Returns:
+            datetime: The scheduled date and time of the next review.
+        """
+
+
+class SM2Scheduler(Scheduler):
+    """
+    The SM-2 algorithm implemented by `update_progress_after_review`.
+    """
+    name = "sm2"
+
+    def review(self, progress, quality, reviewed_at=None):
+        return update_progress_after_review(progress, quality, reviewed_at)
+
+
+class FSRSScheduler(Scheduler):
+    """
+    FSRS-4.5 scheduling (see `app.tools.learn.fsrs`).
+
+    Keeps `Progress.stability`/`Progress.difficulty` up to date and schedules
+    the next review when the predicted recall probability drops to
+    `desired_retention`. The SM-2 `efactor` is left untouched, so a user can
+    switch back without losing it.
+
+    Args:
+        weights (Optional[list[float]]): The 17 FSRS weights, defaults if None.
+        desired_retention (float): Target probability of recall (0.7–0.97).
+    """
+    name = "fsrs"
+
+    def __init__(
+        self,
+        weights: Optional[list[float]] = None,
+        desired_retention: float = fsrs.DEFAULT_RETENTION,
+    ):
+        self.weights = weights or fsrs.DEFAULT_WEIGHTS
+        self.desired_retention = desired_retention
+
+    def review(self, progress, quality, reviewed_at=None):
+        now = reviewed_at or datetime.utcnow()
+        grade = int(fsrs.grade_from_quality(quality))
+        w = self.weights
+
+        if progress.stability is None or progress.difficulty is None:
+            stability = float(fsrs.initial_stability(w, grade))
+            difficulty = float(fsrs.initial_difficulty(w, grade))
+        else:
+            elapsed = 0.0
+            if progress.last_review_date is not None:
+                elapsed = max(
+                    (now - progress.last_review_date).total_seconds() / 86400, 0
+                )
+            r = fsrs.retrievability(elapsed, progress.stability)
+            stability = float(
+                fsrs.next_stability(
+                    w, progress.difficulty, progress.stability, r, grade
+                )
+            )
+            difficulty = float(fsrs.next_difficulty(w, progress.difficulty, grade))
+
+        if grade > 1:
+            progress.correct_answers += 1
+            progress.repetition += 1
+            progress.interval = int(
+                fsrs.next_interval_days(stability, self.desired_retention) * 1440
+            )
+        else:
+            progress.incorrect_answers += 1
+            progress.repetition = 0
+            progress.interval = RELEARN_INTERVAL
+
+        progress.stability = stability
+        progress.difficulty = difficulty
+        progress.last_review_date = now
+        next_review_date = now + timedelta(minutes=progress.interval)
+        progress.next_review_date = next_review_date
+
+        return next_review_date
+
+
+SCHEDULERS = {
+    SM2Scheduler.name: SM2Scheduler,
+    FSRSScheduler.name: FSRSScheduler,
+}
+
+
+def load_settings(settings: Optional[str]) -> dict:
+    """
+    Parses `User.settings` (a JSON object), returns an empty dict if unset or invalid.
+    """
+    if not settings:
+        return {}
+    try:
+        parsed = json.loads(settings)
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def valid_fsrs_weights(weights) -> Optional[list[float]]:
+    """
+    Returns `weights` if it is a list of 17 numbers within fsrs.WEIGHT_BOUNDS, else None.
+    """
+    if not isinstance(weights, list) or len(weights) != len(fsrs.WEIGHT_BOUNDS):
+        return None
+    for weight, (low, high) in zip(weights, fsrs.WEIGHT_BOUNDS):
+        if not _is_number(weight) or not low <= weight <= high:
+            return None
+    return weights
+
+
+def valid_desired_retention(value) -> float:
+    """
+    Returns `value` if it is within fsrs.RETENTION_BOUNDS, else the default retention.
+    """
+    low, high = fsrs.RETENTION_BOUNDS
+    if _is_number(value) and low <= value <= high:
+        return value
+    return fsrs.DEFAULT_RETENTION
+
+
+def get_scheduler(settings: Optional[str]) -> Scheduler:
+    """
+    Creates the scheduler selected in the user's settings.
+
+    Recognized keys: "scheduler" ("sm2" or "fsrs"), "fsrs_weights" and
+    "desired_retention". Invalid weights or retention fall back to the defaults.
+
+    Args:
+        settings (Optional[str]): `User.settings` JSON string.
+
+    Returns:
+        Scheduler: SM2Scheduler unless the user selected another engine.
+    """
+    settings = load_settings(settings)
+    name = settings.get("scheduler", DEFAULT_SCHEDULER)
+
+    if name == FSRSScheduler.name:
+        return FSRSScheduler(
+            weights=valid_fsrs_weights(settings.get("fsrs_weights")),
+            desired_retention=valid_desired_retention(settings.get("desired_retention")),
+        )
+    return SM2Scheduler()
@@ -0,0 +1,358 @@
+"""
+Offline SM-2 scheduling simulator.
+
+Replays synthetic or recorded review streams through the array scheduler
+(`schedule_reviews`) and reports the resulting daily workload, which is
+what the learn endpoints have to serve.
+
+Usage:
+    python -m app.tools.learn.simulator --users 100 --cards 1000 --days 365
+    python -m app.tools.learn.simulator --from-review-log --days 30
+"""
+import argparse
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.tools.learn.learn import MINUTES_IN_DAY, schedule_reviews
+
+# Probability of recalling a card reviewed exactly when it was scheduled.
+TARGET_RETENTION = 0.9
+# Probability of recalling a card seen for the first time.
+NEW_CARD_RECALL = 0.6
+# Upper bound of review rounds in one simulated day (failed cards come back
+# after 10 minutes, so a day can contain several rounds).
+MAX_ROUNDS_PER_DAY = 100
+
+
+@dataclass
+class Workload:
+    """
+    Daily workload produced by a simulation or replay.
+
+    Attributes:
+        reviews (np.ndarray): Reviews per day.
+        new_cards (np.ndarray): Cards reviewed for the first time per day.
+        lapses (np.ndarray): Failed reviews (quality < 3) per day.
+        scheduled (int): Total number of scheduler updates.
+        scheduler_seconds (float): Time spent inside the scheduler.
+        wall_seconds (float): Total run time.
+    """
+    reviews: np.ndarray
+    new_cards: np.ndarray
+    lapses: np.ndarray
+    scheduled: int = 0
+    scheduler_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """
+        Scheduler updates per second of scheduler time.
+        """
+        if self.scheduler_seconds == 0:
+            return 0.0
+        return self.scheduled / self.scheduler_seconds
+
+    def summary(self) -> dict:
+        days = len(self.reviews)
+        return {
+            "days": days,
+            "total_reviews": int(self.reviews.sum()),
+            "mean_reviews_per_day": float(self.reviews.mean()) if days else 0.0,
+            "p95_reviews_per_day": (
+                float(np.percentile(self.reviews, 95)) if days else 0.0
+            ),
+            "peak_reviews_per_day": int(self.reviews.max()) if days else 0,
+            "peak_day": int(self.reviews.argmax()) if days else 0,
+            "total_lapses": int(self.lapses.sum()),
+            "scheduler_updates_per_second": self.throughput,
+            "wall_seconds": self.wall_seconds,
+            **self.extra,
+        }
+
+
+def sample_qualities(
+    rng: np.random.Generator, recalled: np.ndarray
+) -> np.ndarray:
+    """
+    Draws review qualities: 3–5 for recalled cards, 0–2 for forgotten ones.
+    """
+    passed = rng.choice([3, 4, 5], size=recalled.shape, p=[0.2, 0.6, 0.2])
+    failed = rng.choice([0, 1, 2], size=recalled.shape, p=[0.2, 0.3, 0.5])
+    return np.where(recalled, passed, failed)
+
+
+def recall_probability(elapsed: np.ndarray, interval: np.ndarray) -> np.ndarray:
+    """
+    Exponential forgetting curve, calibrated so that a card reviewed exactly
+    after its scheduled interval is recalled with TARGET_RETENTION.
+
+    Args:
+        elapsed (np.ndarray): Minutes since the previous review.
+        interval (np.ndarray): Scheduled interval in minutes (NaN for new cards).
+    """
+    new = np.isnan(interval)
+    safe_interval = np.where(new, 1, np.maximum(interval, 1))
+    probability = TARGET_RETENTION ** (elapsed / safe_interval)
+    return np.where(new, NEW_CARD_RECALL, probability)
+
+
+def simulate(
+    cards: int,
+    days: int,
+    new_cards_per_day: int,
+    max_reviews_per_day: Optional[int] = None,
+    seed: int = 0,
+) -> Workload:
+    """
+    Simulates a population of cards learned from day 0.
+
+    Every day up to `new_cards_per_day` unseen cards are introduced, then all
+    due cards are reviewed (in rounds, failed cards return after 10 minutes)
+    until nothing is due before the end of the day. Recall follows
+    `recall_probability`, qualities follow `sample_qualities`.
+
+    Args:
+        cards (int): Number of cards in the population (e.g. users × cards per user).
+        days (int): Number of simulated days.
+        new_cards_per_day (int): Cards introduced per day in the whole population.
+        max_reviews_per_day (Optional[int]): Review cap per day; the rest is postponed.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        Workload: Daily reviews, new cards and lapses.
+    """
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+
+    efactor = np.full(cards, 2.5)
+    repetition = np.zeros(cards, dtype=np.int64)
+    interval = np.full(cards, np.nan)
+    last_review = np.zeros(cards, dtype=np.float64)
+    due = np.full(cards, np.inf)
+    introduced = 0
+
+    reviews = np.zeros(days, dtype=np.int64)
+    new_cards = np.zeros(days, dtype=np.int64)
+    lapses = np.zeros(days, dtype=np.int64)
+    scheduled = 0
+    scheduler_seconds = 0.0
+
+    for day in range(days):
+        day_start = day * MINUTES_IN_DAY
+        day_end = day_start + MINUTES_IN_DAY
+
+        to_introduce = min(new_cards_per_day, cards - introduced)
+        due[introduced:introduced + to_introduce] = day_start
+        introduced += to_introduce
+
+        budget = max_reviews_per_day
+        for _ in range(MAX_ROUNDS_PER_DAY):
+            idx = np.flatnonzero(due < day_end)
+            if budget is not None:
+                idx = idx[:budget]
+            if idx.size == 0:
+                break
+
+            now = np.maximum(due[idx], day_start)
+            first = np.isnan(interval[idx])
+            elapsed = now - last_review[idx]
+            recalled = rng.random(idx.size) < recall_probability(
+                elapsed, interval[idx]
+            )
+            quality = sample_qualities(rng, recalled)
+
+            tick = time.perf_counter()
+            new_efactor, new_repetition, new_interval = schedule_reviews(
+                efactor[idx], repetition[idx], interval[idx], quality
+            )
+            scheduler_seconds += time.perf_counter() - tick
+            scheduled += idx.size
+
+            efactor[idx] = new_efactor
+            repetition[idx] = new_repetition
+            interval[idx] = new_interval
+            last_review[idx] = now
+            due[idx] = now + new_interval
+
+            reviews[day] += idx.size
+            new_cards[day] += int(first.sum())
+            lapses[day] += int((quality < 3).sum())
+
+            if budget is not None:
+                budget -= idx.size
+                if budget <= 0:
+                    break
+
+    return Workload(
+        reviews=reviews,
+        new_cards=new_cards,
+        lapses=lapses,
+        scheduled=scheduled,
+        scheduler_seconds=scheduler_seconds,
+        wall_seconds=time.perf_counter() - started,
+        extra={"cards": cards, "card_days": cards * days},
+    )
+
+
+def replay(
+    reviews: Iterable[tuple[int, int, datetime]],
+    forecast_days: int = 30,
+    now: Optional[datetime] = None,
+) -> Workload:
+    """
+    Replays a recorded review stream and forecasts the resulting workload.
+
+    Reviews are grouped into waves (the k-th review of every card), each wave
+    is scheduled with one `schedule_reviews` call. The final states are then
+    turned into the number of cards falling due on each of the next
+    `forecast_days` days, counting overdue cards on day 0.
+
+    Args:
+        reviews (Iterable[tuple[int, int, datetime]]): (card key, quality,
+            reviewed_at) tuples, e.g. review_log rows. The card key must be
+            unique per user and flashcard.
+        forecast_days (int): Length of the forecast.
+        now (Optional[datetime]): Start of the forecast, defaults to utcnow.
+
+    Returns:
+        Workload: Forecast of reviews per day (new_cards and lapses are zero).
+    """
+    started = time.perf_counter()
+    now = now or datetime.utcnow()
+
+    rows = sorted(reviews, key=lambda row: (row[0], row[2]))
+    keys = np.array([row[0] for row in rows], dtype=np.int64)
+    qualities = np.array([row[1] for row in rows], dtype=np.int64)
+    reviewed_at = np.array(
+        [(row[2] - now).total_seconds() / 60 for row in rows], dtype=np.float64
+    )
+
+    cards, card_index = np.unique(keys, return_inverse=True)
+    # Position of every review in its card's history (0 = first review).
+    starts = np.searchsorted(keys, cards)
+    wave = np.arange(len(keys)) - starts[card_index]
+
+    efactor = np.full(len(cards), 2.5)
+    repetition = np.zeros(len(cards), dtype=np.int64)
+    interval = np.full(len(cards), np.nan)
+    due = np.zeros(len(cards), dtype=np.float64)
+    scheduler_seconds = 0.0
+
+    for k in range(int(wave.max()) + 1 if len(wave) else 0):
+        in_wave = np.flatnonzero(wave == k)
+        idx = card_index[in_wave]
+
+        tick = time.perf_counter()
+        new_efactor, new_repetition, new_interval = schedule_reviews(
+            efactor[idx], repetition[idx], interval[idx], qualities[in_wave]
+        )
+        scheduler_seconds += time.perf_counter() - tick
+
+        efactor[idx] = new_efactor
+        repetition[idx] = new_repetition
+        interval[idx] = new_interval
+        due[idx] = reviewed_at[in_wave] + new_interval
+
+    due_day = np.clip(due // MINUTES_IN_DAY, 0, None).astype(np.int64)
+    forecast = np.bincount(
+        due_day[due_day < forecast_days], minlength=forecast_days
+    )
+
+    return Workload(
+        reviews=forecast,
+        new_cards=np.zeros(forecast_days, dtype=np.int64),
+        lapses=np.zeros(forecast_days, dtype=np.int64),
+        scheduled=len(keys),
+        scheduler_seconds=scheduler_seconds,
+        wall_seconds=time.perf_counter() - started,
+        extra={"cards": len(cards), "replayed_reviews": len(keys)},
+    )
+
+
+def load_review_log(since: Optional[datetime] = None):
+    """
+    Reads recorded reviews from the review_log table.
+
+    Args:
+        since (Optional[datetime]): Only reviews made after this date.
+
+    Returns:
+        list[tuple[int, int, datetime]]: Stream accepted by `replay`.
+    """
+    from sqlmodel import Session, select
+
+    from app.database import engine
+    from app.models import ReviewLog
+
+    stmt = select(
+        ReviewLog.user_id, ReviewLog.flashcard_id, ReviewLog.quality, ReviewLog.reviewed_at
+    )
+    if since is not None:
+        stmt = stmt.where(ReviewLog.reviewed_at >= since)
+
+    with Session(engine) as session:
+        return [
+            ((user_id << 32) | flashcard_id, quality, reviewed_at)
+            for user_id, flashcard_id, quality, reviewed_at in session.exec(stmt)
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--cards", type=int, default=1000, help="Cards per user")
+    parser.add_argument("--new-per-day", type=int, default=20, help="Per user")
+    parser.add_argument("--max-reviews-per-day", type=int, default=None, help="Per user")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--from-review-log",
+        action="store_true",
+        help="Replay the review_log table and forecast the next --days days",
+    )
+    parser.add_argument(
+        "--since-days", type=int, default=None, help="Replay only recent reviews"
+    )
+    parser.add_argument("--csv", type=str, default=None, help="Write daily workload")
+    args = parser.parse_args()
+
+    if args.from_review_log:
+        since = (
+            datetime.utcnow() - timedelta(days=args.since_days)
+            if args.since_days
+            else None
+        )
+        workload = replay(load_review_log(since), forecast_days=args.days)
+    else:
+        workload = simulate(
+            cards=args.users * args.cards,
+            days=args.days,
+            new_cards_per_day=args.users * args.new_per_day,
+            max_reviews_per_day=(
+                args.users * args.max_reviews_per_day
+                if args.max_reviews_per_day
+                else None
+            ),
+            seed=args.seed,
+        )
+
+    for key, value in workload.summary().items():
+        print(f"{key:>30}: {value:,.2f}" if isinstance(value, float) else f"{key:>30}: {value:,}")
+
+    if args.csv:
+        with open(args.csv, "w") as file:
+            file.write("day,reviews,new_cards,lapses\n")
+            for day, (reviews, new, lapses) in enumerate(
+                zip(workload.reviews, workload.new_cards, workload.lapses)
+            ):
+                file.write(f"{day},{reviews},{new},{lapses}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+import json
+import threading
+
 import pytest
 import jwt
 from datetime import datetime, timedelta, timezone
@@ -10,10 +13,28 @@ from app.tools.auth.jwt_handler import (
     generate_token,
     decode_token,
     get_id_from_token,
+    get_revocation_key,
 )
 from app.tools.auth.validation import check_password
-from app.tools.auth.hash import hash_password, verify_password
-from app.models import ExpireTokens, User
+from app.tools.auth.hash import (
+    HashingPool,
+    calibrate,
+    hash_password,
+    needs_rehash,
+    verify_password,
+)
+from app.tools.auth.revocation import (
+    InMemoryRevocationBackend,
+    RevocationCache,
+    hash_token,
+    purge_expired_tokens,
+)
+from app.tools.auth.roles import RoleCache, invalidate_user_roles
+from app.tools.auth.keys import generate_private_key, load_key_set
+from app.tools.auth.last_login import update_last_login_dates
+from app.tools.auth.rate_limit import InMemoryRateLimitBackend, RateLimit, RateLimiter
+from app.tools.auth.refresh import issue_refresh_token, rotate_refresh_token
+from app.models import ExpireTokens, RefreshToken, User
 
 from argon2 import PasswordHasher
 
@@ -30,6 +51,14 @@ def mock_db(mocker):
     return db
 
 
+@pytest.fixture(autouse=True)
+def clear_role_cache():
+    """Role names cached by one test must not leak into the next one"""
+    invalidate_user_roles()
+    yield
+    invalidate_user_roles()
+
+
 @pytest.fixture(autouse=True)
 def mock_secret_key(mocker):
     mocker.patch(
@@ -172,6 +201,79 @@ def test_verify_password_failure():
     assert exc_info.value.detail == "Wrong password"
 
 
+def test_needs_rehash_detects_changed_parameters():
+    # Arrange
+    current_hash = hash_password("MySecurePassword123")
+    old_hash = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1).hash(
+        "MySecurePassword123"
+    )
+
+    # Act & Assert
+    assert not needs_rehash(current_hash)
+    assert needs_rehash(old_hash)
+
+
+def test_calibrate_keeps_strongest_parameters_within_budget(mocker):
+    # Arrange
+    # pretend a hash costs 10 ms per (time_cost × 16 MiB)
+    mocker.patch(
+        "app.tools.auth.hash.measure_hash_time",
+        side_effect=lambda hasher, rounds: hasher.time_cost * hasher.memory_cost / 16384 * 0.01,
+    )
+
+    # Act
+    results = calibrate(0.05, [16384, 65536], parallelism=1, max_time_cost=10)
+
+    # Assert
+    assert [(row["memory_cost"], row["time_cost"]) for row in results] == [
+        (16384, 5),
+        (65536, 1),
+    ]
+
+
+def test_hashing_pool_rejects_when_saturated():
+    # Arrange
+    pool = HashingPool(workers=1, queue_size=0)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash():
+        started.set()
+        release.wait()
+        return "hash"
+
+    worker = threading.Thread(target=pool.run, args=(slow_hash,))
+    worker.start()
+    started.wait()
+
+    # Act
+    with pytest.raises(HTTPException) as exc:
+        pool.run(lambda: "hash")
+    release.set()
+    worker.join()
+
+    # Assert
+    assert exc.value.status_code == 503
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 1
+    assert stats["queued"] == 0
+
+
+def test_hashing_pool_propagates_exceptions():
+    # Arrange
+    pool = HashingPool(workers=1, queue_size=1)
+
+    def failing_hash():
+        raise HTTPException(status_code=401, detail="Wrong password")
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        pool.run(failing_hash)
+
+    assert exc.value.status_code == 401
+    assert pool.stats()["completed"] == 1
+
+
 # ---------- Tests for authenticate----------
 
 
@@ -279,6 +381,158 @@ def test_authenticate_with_roles_insufficient(mocker):
     assert "Insufficient permissions" in exc.value.detail
 
 
+def test_authenticate_with_roles_uses_cache(mocker):
+    # Arrange
+    dependency = authenticate(roles=["MODERATOR"])
+    mocker.patch("app.tools.auth.jwt_handler.decode_token", return_value={"sub": "1"})
+
+    mock_role = mocker.MagicMock()
+    mock_role.name = "MODERATOR"
+    mock_user = mocker.MagicMock()
+    mock_user.roles = [mock_role]
+    mock_db = mocker.MagicMock()
+    mock_db.query().filter().first.side_effect = [None, mock_user, None, None]
+
+    # Act
+    first = dependency(token="valid_token", db=mock_db)
+    second = dependency(token="valid_token", db=mock_db)
+
+    # Assert
+    assert first == second == 1
+    # one revocation lookup per request, the user is loaded only once
+    assert mock_db.query().filter().first.call_count == 3
+
+
+def test_role_cache_invalidate_drops_entry():
+    # Arrange
+    cache = RoleCache()
+    cache.set(1, ["ADMIN"])
+
+    # Act
+    cache.invalidate(1)
+
+    # Assert
+    assert cache.get(1) is None
+
+
+def test_role_cache_entries_expire(mocker):
+    # Arrange
+    cache = RoleCache(ttl=10)
+    monotonic = mocker.patch("app.tools.auth.roles.time.monotonic", return_value=100.0)
+    cache.set(1, ["ADMIN"])
+
+    # Act
+    fresh = cache.get(1)
+    monotonic.return_value = 111.0
+    expired = cache.get(1)
+
+    # Assert
+    assert fresh == {"ADMIN"}
+    assert expired is None
+
+
+# ---------- Tests for refresh tokens----------
+
+
+def test_issue_refresh_token_stores_hash(mocker):
+    # Arrange
+    db = mocker.MagicMock()
+
+    # Act
+    token = issue_refresh_token(1, db)
+
+    # Assert
+    entry = db.add.call_args[0][0]
+    assert isinstance(entry, RefreshToken)
+    assert entry.token_hash == hash_token(token)
+    assert entry.expiration_date > datetime.utcnow()
+    db.commit.assert_not_called()
+
+
+def test_rotate_refresh_token_revokes_used_token(mocker):
+    # Arrange
+    entry = RefreshToken(
+        user_id=1,
+        token_hash=hash_token("refresh"),
+        family_id="family",
+        creation_date=datetime.utcnow(),
+        expiration_date=datetime.utcnow() + timedelta(days=1),
+    )
+    db = mocker.MagicMock()
+    db.exec().first.return_value = entry
+
+    # Act
+    user_id, new_token = rotate_refresh_token("refresh", db)
+
+    # Assert
+    assert user_id == 1
+    assert entry.revoked
+    assert new_token != "refresh"
+    assert db.add.call_args[0][0].family_id == "family"
+    db.commit.assert_called_once()
+
+
+def test_rotate_refresh_token_reuse_revokes_family(mocker):
+    # Arrange
+    entry = RefreshToken(
+        user_id=1,
+        token_hash=hash_token("refresh"),
+        family_id="family",
+        creation_date=datetime.utcnow(),
+        expiration_date=datetime.utcnow() + timedelta(days=1),
+        revoked=True,
+    )
+    db = mocker.MagicMock()
+    db.exec().first.return_value = entry
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        rotate_refresh_token("refresh", db)
+
+    assert exc.value.status_code == 401
+    db.execute.assert_called_once()
+    db.add.assert_not_called()
+
+
+def test_rotate_refresh_token_expired(mocker):
+    # Arrange
+    db = mocker.MagicMock()
+    db.exec().first.return_value = RefreshToken(
+        user_id=1,
+        token_hash=hash_token("refresh"),
+        family_id="family",
+        creation_date=datetime.utcnow() - timedelta(days=2),
+        expiration_date=datetime.utcnow() - timedelta(days=1),
+    )
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        rotate_refresh_token("refresh", db)
+
+    assert exc.value.status_code == 401
+    db.add.assert_not_called()
+
+
+# ---------- Tests for last login----------
+
+
+def test_update_last_login_dates_writes_latest_login_per_user(mocker):
+    # Arrange
+    session = mocker.patch("app.tools.auth.last_login.Session").return_value.__enter__.return_value
+    first, second = datetime(2025, 1, 1), datetime(2025, 1, 2)
+
+    # Act
+    update_last_login_dates([(1, second), (2, first), (1, first)])
+
+    # Assert
+    _, rows = session.execute.call_args[0]
+    assert sorted(rows, key=lambda row: row["id"]) == [
+        {"id": 1, "last_login_date": second},
+        {"id": 2, "last_login_date": first},
+    ]
+    session.commit.assert_called_once()
+
+
 # ---------- Tests for validation----------
 
 password_data = [
@@ -304,3 +558,287 @@ def test_check_password(password_str, num_of_errors):
 
     # Assert
     assert len(result) == num_of_errors
+
+
+# ---------- Tests for revocation cache----------
+
+
+@pytest.fixture
+def revocation(mocker):
+    """Fresh, warmed-up revocation cache used by authenticate()"""
+    cache = RevocationCache()
+    cache.ready = True
+    mocker.patch("app.tools.auth.authenticate.revocation_cache", cache)
+    mocker.patch("app.tools.auth.jwt_handler.revocation_cache", cache)
+    return cache
+
+
+def test_authenticate_uses_revocation_cache(mocker, revocation):
+    # Arrange
+    dependency = authenticate()
+    mock_db = mocker.MagicMock()
+    mocker.patch("app.tools.auth.jwt_handler.decode_token", return_value={"sub": "1"})
+
+    # Act
+    user_id = dependency(token="valid_token", db=mock_db)
+
+    # Assert
+    assert user_id == 1
+    mock_db.query.assert_not_called()
+
+
+def test_invalidated_token_is_rejected_from_cache(mocker, mock_db, revocation, sample_token):
+    # Arrange
+    dependency = authenticate()
+    invalidate_token(sample_token, mock_db)
+    db = mocker.MagicMock()
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        dependency(token=sample_token, db=db)
+
+    assert exc.value.status_code == 401
+    db.query.assert_not_called()
+
+
+def test_revocation_cache_sync_loads_new_rows(mocker):
+    # Arrange
+    cache = RevocationCache()
+    expiration_date = datetime.utcnow() + timedelta(hours=1)
+    db = mocker.MagicMock()
+    db.exec().all.return_value = [("revoked_token", expiration_date)]
+
+    # Act
+    loaded = cache.sync(db)
+
+    # Assert
+    assert loaded == 1
+    assert cache.ready
+    assert cache.is_revoked("revoked_token")
+    assert not cache.is_revoked("other_token")
+
+
+def test_revocation_cache_sync_loads_rows_committed_out_of_order(mocker):
+    # Arrange
+    cache = RevocationCache()
+    expiration_date = datetime.utcnow() + timedelta(hours=1)
+    db = mocker.MagicMock()
+    db.exec().all.return_value = [("later_token", expiration_date)]
+    cache.sync(db)
+    # a row with a lower id committed after the first sync
+    db.exec().all.return_value = [
+        ("earlier_token", expiration_date),
+        ("later_token", expiration_date),
+    ]
+
+    # Act
+    cache.sync(db)
+
+    # Assert
+    assert cache.is_revoked("earlier_token")
+    assert cache.is_revoked("later_token")
+
+
+def test_in_memory_backend_purges_expired_entries():
+    # Arrange
+    backend = InMemoryRevocationBackend()
+    now = datetime.utcnow()
+    backend.add(hash_token("expired"), now - timedelta(seconds=1))
+    backend.add(hash_token("alive"), now + timedelta(hours=1))
+
+    # Act
+    removed = backend.purge(now)
+
+    # Assert
+    assert removed == 1
+    assert not backend.contains(hash_token("expired"))
+    assert backend.contains(hash_token("alive"))
+
+
+def test_generate_token_has_unique_jti(sample_user_id):
+    # Act
+    first = decode_token(generate_token(sample_user_id))
+    second = decode_token(generate_token(sample_user_id))
+
+    # Assert
+    assert first["jti"] != second["jti"]
+
+
+def test_invalidate_token_stores_jti_hash(mocker, mock_db, sample_token):
+    # Act
+    invalidate_token(sample_token, mock_db)
+
+    # Assert
+    expire_token = mock_db.add.call_args[0][0]
+    assert expire_token.token_value == hash_token(decode_token(sample_token)["jti"])
+    assert len(expire_token.token_value) == 64
+
+
+def test_revocation_key_of_token_without_jti():
+    # Arrange
+    token = "legacy.jwt.token"
+
+    # Act
+    key = get_revocation_key(token, {"sub": "1"})
+
+    # Assert
+    assert key == hash_token(token)
+
+
+def test_purge_expired_tokens_returns_deleted_rows(mocker):
+    # Arrange
+    db = mocker.MagicMock()
+    db.execute.return_value.rowcount = 3
+
+    # Act
+    deleted = purge_expired_tokens(db)
+
+    # Assert
+    assert deleted == 3
+    db.commit.assert_called_once()
+
+
+# ---------- Tests for asymmetric signing----------
+
+
+@pytest.fixture(params=["RS256", "EdDSA"])
+def asymmetric_keys(request, mocker, tmp_path):
+    """Signs tokens with a freshly generated key pair"""
+    pytest.importorskip("cryptography")
+    (tmp_path / "old.pem").write_bytes(generate_private_key(request.param))
+    (tmp_path / "new.pem").write_bytes(generate_private_key(request.param))
+    key_set = load_key_set(request.param, str(tmp_path), "new")
+    mocker.patch("app.tools.auth.jwt_handler.get_key_set", return_value=key_set)
+    return key_set
+
+
+def test_asymmetric_token_has_kid_and_decodes(asymmetric_keys, sample_user_id):
+    # Act
+    token = generate_token(sample_user_id)
+
+    # Assert
+    assert jwt.get_unverified_header(token)["kid"] == "new"
+    assert decode_token(token)["sub"] == sample_user_id
+
+
+def test_asymmetric_token_signed_with_rotated_key_is_accepted(
+    asymmetric_keys, tmp_path, sample_user_id
+):
+    # Arrange
+    old_key_set = load_key_set(asymmetric_keys.algorithm, str(tmp_path), "old")
+    token = jwt.encode(
+        {"sub": sample_user_id, "exp": datetime.utcnow() + timedelta(minutes=1)},
+        old_key_set.signing_key,
+        algorithm=old_key_set.algorithm,
+        headers={"kid": "old"},
+    )
+
+    # Act
+    payload = decode_token(token)
+
+    # Assert
+    assert payload["sub"] == sample_user_id
+    assert {key["kid"] for key in asymmetric_keys.jwks["keys"]} == {"old", "new"}
+
+
+def test_asymmetric_token_with_unknown_kid_is_rejected(asymmetric_keys, sample_user_id):
+    # Arrange
+    token = generate_token(sample_user_id)
+    header, payload, signature = token.split(".")
+    forged_header = jwt.utils.base64url_encode(
+        json.dumps({"alg": asymmetric_keys.algorithm, "kid": "unknown"}).encode()
+    ).decode()
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        decode_token(f"{forged_header}.{payload}.{signature}")
+
+    assert exc.value.status_code == 401
+
+
+def test_symmetric_key_set_publishes_no_keys():
+    # Act
+    key_set = load_key_set("HS256", None, None)
+
+    # Assert
+    assert key_set.symmetric
+    assert key_set.jwks == {"keys": []}
+
+
+# ---------- Tests for rate limiting----------
+
+
+def test_rate_limiter_rejects_when_bucket_is_empty(mocker):
+    # Arrange
+    mocker.patch("app.tools.auth.rate_limit.time.monotonic", return_value=100.0)
+    limiter = RateLimiter()
+    limit = RateLimit("test", capacity=2, per_seconds=60)
+    limiter.hit(limit, "1.2.3.4")
+    limiter.hit(limit, "1.2.3.4")
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        limiter.hit(limit, "1.2.3.4")
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "30"
+    limiter.hit(limit, "5.6.7.8")
+
+
+def test_rate_limiter_bucket_refills(mocker):
+    # Arrange
+    monotonic = mocker.patch("app.tools.auth.rate_limit.time.monotonic", return_value=100.0)
+    limiter = RateLimiter()
+    limit = RateLimit("test", capacity=1, per_seconds=10)
+    limiter.hit(limit, "key")
+
+    # Act
+    monotonic.return_value = 110.0
+
+    # Assert (should not raise)
+    limiter.hit(limit, "key")
+
+
+def test_login_lockout_after_recorded_failures(mocker):
+    # Arrange
+    mocker.patch("app.tools.auth.rate_limit.time.monotonic", return_value=100.0)
+    limiter = RateLimiter()
+    limit = RateLimit("failures", capacity=3, per_seconds=900)
+    limiter.ensure_available(limit, "user")
+
+    # Act
+    for _ in range(3):
+        limiter.record(limit, "user")
+
+    # Assert
+    with pytest.raises(HTTPException) as exc:
+        limiter.ensure_available(limit, "user")
+    assert exc.value.status_code == 429
+
+
+def test_in_memory_rate_limit_backend_prunes_full_buckets(mocker):
+    # Arrange
+    monotonic = mocker.patch("app.tools.auth.rate_limit.time.monotonic", return_value=100.0)
+    backend = InMemoryRateLimitBackend(max_keys=2)
+    limit = RateLimit("test", capacity=1, per_seconds=10)
+    backend.consume("a", limit)
+    backend.consume("b", limit)
+
+    # Act
+    monotonic.return_value = 200.0
+    backend.consume("c", limit)
+
+    # Assert
+    assert len(backend) == 1
+
+
+def test_rate_limit_from_env(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("RATE_LIMIT_TEST", "10/60")
+
+    # Act
+    limit = RateLimit.from_env("test", "RATE_LIMIT_TEST", "1/1")
+
+    # Assert
+    assert limit.capacity == 10
+    assert limit.per_seconds == 60
@@ -0,0 +1,457 @@
+import base64
+import json
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.models import Comment, Deck, DeckStats
+from app.tools.db import counting
+from app.tools.db.buffered_writer import BufferedWriter
+from app.tools.db.counting import CountCache, count_total
+from app.tools.db.deck_stats import (
+    adjust_deck_stats,
+    adjust_media_flashcards,
+    flashcards_delta,
+)
+from app.tools.db.pagination import Keyset, paginate
+from app.tools.db.search import search_decks, search_flashcards, to_tsquery
+
+
+# ---------- Tests for BufferedWriter ----------
+
+
+def test_buffered_writer_flush_writes_all_rows(mocker):
+    # Arrange
+    flush_rows = mocker.MagicMock()
+    writer = BufferedWriter(flush_rows, max_size=10)
+    writer.add(1)
+    writer.extend([2, 3])
+
+    # Act
+    flushed = writer.flush()
+
+    # Assert
+    assert flushed == 3
+    flush_rows.assert_called_once_with([1, 2, 3])
+    assert len(writer) == 0
+
+
+def test_buffered_writer_empty_flush_does_not_write(mocker):
+    # Arrange
+    flush_rows = mocker.MagicMock()
+    writer = BufferedWriter(flush_rows)
+
+    # Act
+    flushed = writer.flush()
+
+    # Assert
+    assert flushed == 0
+    flush_rows.assert_not_called()
+
+
+def test_buffered_writer_flushes_when_full_without_thread(mocker):
+    # Arrange
+    flush_rows = mocker.MagicMock()
+    writer = BufferedWriter(flush_rows, max_size=3)
+
+    # Act
+    writer.extend([1, 2])
+    writer.add(3)
+
+    # Assert
+    flush_rows.assert_called_once_with([1, 2, 3])
+
+
+def test_buffered_writer_background_thread_flushes_when_full():
+    # Arrange
+    flushed = threading.Event()
+    batches = []
+
+    def flush_rows(rows):
+        batches.append(rows)
+        flushed.set()
+
+    writer = BufferedWriter(flush_rows, max_size=2, flush_interval=60)
+    writer.start()
+
+    # Act
+    writer.extend([1, 2])
+
+    # Assert
+    assert flushed.wait(5)
+    writer.stop()
+    assert batches == [[1, 2]]
+    assert not writer.running
+
+
+def test_buffered_writer_stop_flushes_remaining_rows(mocker):
+    # Arrange
+    flush_rows = mocker.MagicMock()
+    writer = BufferedWriter(flush_rows, max_size=100, flush_interval=60)
+    writer.start()
+    writer.add(1)
+
+    # Act
+    writer.stop()
+
+    # Assert
+    flush_rows.assert_called_once_with([1])
+
+
+def test_buffered_writer_drops_failed_batch(mocker):
+    # Arrange
+    flush_rows = mocker.MagicMock(side_effect=Exception("db down"))
+    writer = BufferedWriter(flush_rows)
+    writer.add(1)
+
+    # Act
+    writer.flush()
+    writer.flush()
+
+    # Assert
+    flush_rows.assert_called_once_with([1])
+    assert len(writer) == 0
+
+
+# ---------- Tests for keyset pagination ----------
+
+
+def make_query(mocker, rows):
+    query = mocker.MagicMock()
+    query.order_by.return_value = query
+    query.filter.return_value = query
+    query.offset.return_value = query
+    query.limit.return_value = query
+    query.all.return_value = rows
+    return query
+
+
+def test_keyset_cursor_round_trip():
+    # Arrange
+    keyset = Keyset(Comment.creation_date, Comment.id, descending=True)
+    comment = SimpleNamespace(creation_date=datetime(2026, 1, 2, 3, 4, 5, 678), id=42)
+
+    # Act
+    cursor = keyset.encode(comment)
+
+    # Assert
+    assert "=" not in cursor
+    assert keyset.decode(cursor) == [datetime(2026, 1, 2, 3, 4, 5, 678), 42]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", ""])
+def test_keyset_rejects_malformed_cursor(cursor):
+    # Arrange
+    keyset = Keyset(Comment.creation_date, Comment.id)
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        keyset.decode(cursor)
+    assert exc.value.status_code == 400
+
+
+wrong_type_values = [
+    ["2026-01-01T00:00:00", "1"],
+    ["2026-01-01T00:00:00", 1.5],
+    ["2026-01-01T00:00:00", True],
+    ["2026-01-01T00:00:00", None],
+    [["2026-01-01T00:00:00"], 1],
+    [1, 1],
+]
+
+
+@pytest.mark.parametrize("values", wrong_type_values)
+def test_keyset_rejects_cursor_values_of_wrong_type(values):
+    # Arrange
+    keyset = Keyset(Comment.creation_date, Comment.id)
+    payload = json.dumps({"k": values, "c": ["creation_date", "id"], "d": False}).encode()
+    cursor = base64.urlsafe_b64encode(payload).decode()
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        keyset.decode(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_keyset_rejects_cursor_of_other_sort_key():
+    # Arrange
+    popular = Keyset(DeckStats.saves_count, Deck.id, descending=True)
+    cursor = popular.encode(SimpleNamespace(saves_count=3, id=7))
+    ranked = search_decks("cell").keyset(Deck.id)
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        ranked.decode(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_keyset_rejects_cursor_of_other_direction():
+    # Arrange
+    comment = SimpleNamespace(creation_date=datetime(2026, 1, 1), id=1)
+    cursor = Keyset(Comment.creation_date, Comment.id, descending=True).encode(comment)
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        Keyset(Comment.creation_date, Comment.id).decode(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_paginate_returns_next_cursor_when_more_rows(mocker):
+    # Arrange
+    rows = [SimpleNamespace(id=i) for i in range(1, 5)]
+    query = make_query(mocker, rows)
+    keyset = Keyset(Comment.id)
+
+    # Act
+    page, next_cursor = paginate(query, keyset, page=2, page_size=3)
+
+    # Assert
+    assert page == rows[:3]
+    assert keyset.decode(next_cursor) == [3]
+    query.offset.assert_called_once_with(3)
+    query.limit.assert_called_once_with(4)
+
+
+def test_paginate_with_cursor_skips_offset(mocker):
+    # Arrange
+    rows = [SimpleNamespace(id=4)]
+    query = make_query(mocker, rows)
+    keyset = Keyset(Comment.id)
+    cursor = keyset.encode(SimpleNamespace(id=3))
+
+    # Act
+    page, next_cursor = paginate(query, keyset, page=5, page_size=3, cursor=cursor)
+
+    # Assert
+    assert page == rows
+    assert next_cursor is None
+    query.filter.assert_called_once()
+    query.offset.assert_not_called()
+
+
+def test_paginate_page_size_zero_returns_all_rows(mocker):
+    # Arrange
+    rows = [SimpleNamespace(id=i) for i in range(1, 4)]
+    query = make_query(mocker, rows)
+
+    # Act
+    page, next_cursor = paginate(query, Keyset(Comment.id), page=1, page_size=0)
+
+    # Assert
+    assert page == rows
+    assert next_cursor is None
+    query.limit.assert_not_called()
+
+
+# ---------- Tests for listing counts ----------
+
+
+def test_count_cache_expires_entries(mocker):
+    # Arrange
+    now = mocker.patch("app.tools.db.counting.time.monotonic", return_value=100.0)
+    cache = CountCache(ttl=30)
+    cache.set("key", 7)
+
+    # Act
+    fresh = cache.get("key")
+    now.return_value = 131.0
+    expired = cache.get("key")
+
+    # Assert
+    assert fresh == 7
+    assert expired is None
+    assert len(cache) == 0
+
+
+def test_count_cache_drops_oldest_entries_when_full():
+    # Arrange
+    cache = CountCache(ttl=30, max_entries=2)
+
+    # Act
+    for i in range(3):
+        cache.set(f"key-{i}", i)
+
+    # Assert
+    assert len(cache) == 2
+    assert cache.get("key-0") is None
+    assert cache.get("key-2") == 2
+
+
+def test_count_total_none_skips_query(mocker):
+    # Arrange
+    query = mocker.MagicMock()
+
+    # Act
+    total = count_total(query, "none")
+
+    # Assert
+    assert total is None
+    query.count.assert_not_called()
+
+
+def test_count_total_cached_counts_once(mocker):
+    # Arrange
+    mocker.patch.object(counting, "count_cache", CountCache(ttl=30))
+    mocker.patch("app.tools.db.counting.query_key", return_value="key")
+    query = mocker.MagicMock()
+    query.count.return_value = 12
+
+    # Act
+    totals = [count_total(query, "cached") for _ in range(3)]
+
+    # Assert
+    assert totals == [12, 12, 12]
+    query.count.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "estimate, expected, exact_calls",
+    [(250_000, 250_000, 0), (10, 3, 1), (None, 3, 1)],
+)
+def test_count_total_estimate_falls_back_to_exact(mocker, estimate, expected, exact_calls):
+    # Arrange
+    mocker.patch("app.tools.db.counting.estimate_count", return_value=estimate)
+    query = mocker.MagicMock()
+    query.count.return_value = 3
+
+    # Act
+    total = count_total(query, "estimate")
+
+    # Assert
+    assert total == expected
+    assert query.count.call_count == exact_calls
+
+
+# ---------- Tests for full-text search ----------
+
+
+def compile_pg(expression):
+    return expression.compile(dialect=postgresql.dialect())
+
+
+def test_to_tsquery_matches_all_words_as_prefixes():
+    # Act
+    compiled = compile_pg(to_tsquery("Bio: Cell & (membrane)"))
+
+    # Assert
+    assert "to_tsquery('simple'::regconfig" in str(compiled)
+    assert list(compiled.params.values()) == ["bio:* & cell:* & membrane:*"]
+
+
+def test_to_tsquery_without_words_returns_none():
+    # Act & Assert
+    assert to_tsquery(" !&|: ") is None
+
+
+def test_search_decks_without_words_uses_trigram_match_only():
+    # Act
+    match = search_decks("??")
+    condition = str(compile_pg(match.condition))
+
+    # Assert
+    assert "ILIKE" in condition
+    assert "search_vector" not in condition
+
+
+def test_search_flashcards_matches_side_content():
+    # Act
+    match = search_flashcards("cell")
+    condition = str(compile_pg(match.condition))
+
+    # Assert
+    assert condition.startswith("flashcards.id IN (SELECT flashcards.id")
+    assert "flashcards.search_vector @@" in condition
+    assert "JOIN flashcard_sides ON flashcard_sides.id = flashcards.front_side_id" in condition
+    assert "JOIN flashcard_sides ON flashcard_sides.id = flashcards.back_side_id" in condition
+    assert "flashcard_sides.search_vector @@" in condition
+    assert " OR " not in condition
+
+
+def test_search_keyset_cursor_round_trip():
+    # Arrange
+    match = search_decks("cell")
+    keyset = match.keyset(Deck.id)
+    row = SimpleNamespace(rank=0.1 + 0.2, id=7)
+
+    # Act
+    cursor = keyset.encode(row)
+
+    # Assert
+    assert keyset.decode(cursor) == [0.1 + 0.2, 7]
+
+
+# ---------- Tests for deck statistics ----------
+
+
+def make_flashcard(front_media=(), back_media=()):
+    return SimpleNamespace(
+        front_side=SimpleNamespace(media=list(front_media)),
+        back_side=SimpleNamespace(media=list(back_media)),
+    )
+
+
+def test_flashcards_delta_counts_media_flashcards():
+    # Arrange
+    added = [make_flashcard(), make_flashcard(front_media=[1]), make_flashcard(back_media=[2])]
+    removed = [make_flashcard(front_media=[3], back_media=[4])]
+
+    # Act
+    delta = flashcards_delta(added, removed)
+
+    # Assert
+    assert delta == {"flashcards_count": 2, "media_flashcards_count": 1}
+
+
+def test_adjust_deck_stats_without_changes_does_nothing(mocker):
+    # Arrange
+    db = mocker.MagicMock()
+
+    # Act
+    adjust_deck_stats(db, [1], flashcards_count=0, saves_count=0)
+
+    # Assert
+    db.execute.assert_not_called()
+
+
+def test_adjust_deck_stats_updates_relatively(mocker):
+    # Arrange
+    db = mocker.MagicMock()
+
+    # Act
+    adjust_deck_stats(db, [1, 2], saves_count=-1)
+
+    # Assert
+    db.execute.assert_called_once()
+    statement = str(compile_pg(db.execute.call_args.args[0]))
+    assert "saves_count=(deck_stats.saves_count +" in statement
+    assert "deck_stats.deck_id IN" in statement
+
+
+def test_adjust_deck_stats_media_change_syncs_has_media(mocker):
+    # Arrange
+    db = mocker.MagicMock()
+
+    # Act
+    adjust_deck_stats(db, [1], media_flashcards_count=1)
+
+    # Assert
+    statements = [str(compile_pg(call.args[0])) for call in db.execute.call_args_list]
+    assert len(statements) == 2
+    assert statements[1].startswith("UPDATE decks SET has_media")
+
+
+def test_adjust_media_flashcards_updates_decks_once_per_flashcard(mocker):
+    # Arrange
+    adjust = mocker.patch("app.tools.db.deck_stats.adjust_deck_stats")
+    db = mocker.MagicMock()
+
+    # Act
+    adjust_media_flashcards(db, [4, 5], -1)
+
+    # Assert
+    assert adjust.call_count == 2
+    assert all(call.kwargs == {"media_flashcards_count": -1} for call in adjust.call_args_list)
@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+import numpy as np
 import pytest
 
 from app.tools.learn.learn import (
@@ -6,7 +7,11 @@ from app.tools.learn.learn import (
     update_efactor,
     MINUTES_IN_DAY,
     update_progress_after_review,
+    update_efactors,
+    next_intervals,
+    schedule_reviews,
 )
+from app.tools.learn.simulator import replay, simulate
 from app.models import Progress
 
 update_efactor_data = [(0, 5, 1.3), (2, 1, 1.46), (2.5, 4, 2.5)]
@@ -57,6 +62,8 @@ def test_update_progress_after_review_low_quality():
     assert progress.efactor == update_efactor(efactor, quality)
     assert progress.repetition == 0
     assert progress.interval == 10
+    assert progress.incorrect_answers == 1
+    assert progress.correct_answers == 0
 
 
 def test_update_progress_after_review_high_quality():
@@ -75,3 +82,125 @@ def test_update_progress_after_review_high_quality():
     assert progress.efactor == update_efactor(efactor, quality)
     assert progress.repetition == repetition + 1
     assert progress.interval == next_interval(repetition, interval, efactor)
+    assert progress.correct_answers == 1
+    assert progress.incorrect_answers == 0
+
+
+def test_update_efactors_matches_scalar():
+    # Arrange
+    e = np.array([e for e, _, _ in update_efactor_data])
+    q = np.array([q for _, q, _ in update_efactor_data])
+
+    # Act
+    result = update_efactors(e, q)
+
+    # Assert
+    assert result.tolist() == [expected for _, _, expected in update_efactor_data]
+
+
+def test_next_intervals_matches_scalar():
+    # Arrange
+    repetition = np.array([r for r, _, _, _ in next_interval_data])
+    interval = np.array([i for _, i, _, _ in next_interval_data])
+    ef = np.array([ef for _, _, ef, _ in next_interval_data])
+
+    # Act
+    result = next_intervals(repetition, interval, ef)
+
+    # Assert
+    assert result.tolist() == [expected for _, _, _, expected in next_interval_data]
+
+
+def test_schedule_reviews_matches_update_progress_after_review():
+    # Arrange
+    rng = np.random.default_rng(42)
+    size = 1000
+    efactor = rng.uniform(1.3, 3.0, size)
+    repetition = rng.integers(0, 10, size)
+    interval = rng.integers(10, 100000, size)
+    quality = rng.integers(0, 6, size)
+    progresses = [
+        Progress(efactor=float(e), repetition=int(r), interval=int(i))
+        for e, r, i in zip(efactor, repetition, interval)
+    ]
+
+    # Act
+    new_efactor, new_repetition, new_interval = schedule_reviews(
+        efactor, repetition, interval, quality
+    )
+    for progress, q in zip(progresses, quality.tolist()):
+        update_progress_after_review(progress, q)
+
+    # Assert
+    assert new_efactor.tolist() == [p.efactor for p in progresses]
+    assert new_repetition.tolist() == [p.repetition for p in progresses]
+    assert new_interval.tolist() == [p.interval for p in progresses]
+
+
+def test_schedule_reviews_missing_interval():
+    # Arrange
+    efactor = np.array([2.5, 2.5])
+    repetition = np.array([0, 1])
+    interval = np.array([np.nan, 10])
+    quality = np.array([4, 4])
+
+    # Act
+    _, new_repetition, new_interval = schedule_reviews(
+        efactor, repetition, interval, quality
+    )
+
+    # Assert
+    assert new_repetition.tolist() == [1, 2]
+    assert new_interval.tolist() == [10, MINUTES_IN_DAY]
+
+
+def test_simulate_introduces_new_cards_daily():
+    # Arrange
+    cards, days, new_per_day = 100, 10, 20
+
+    # Act
+    workload = simulate(cards, days, new_per_day, seed=1)
+
+    # Assert
+    assert workload.new_cards.tolist() == [20, 20, 20, 20, 20, 0, 0, 0, 0, 0]
+    assert (workload.reviews >= workload.new_cards).all()
+    assert workload.scheduled == workload.reviews.sum()
+
+
+def test_simulate_is_deterministic_for_seed():
+    # Act
+    first = simulate(50, 30, 5, seed=7)
+    second = simulate(50, 30, 5, seed=7)
+
+    # Assert
+    assert first.reviews.tolist() == second.reviews.tolist()
+    assert first.lapses.tolist() == second.lapses.tolist()
+
+
+def test_simulate_respects_daily_review_cap():
+    # Act
+    workload = simulate(1000, 20, 100, max_reviews_per_day=50, seed=3)
+
+    # Assert
+    assert workload.reviews.max() <= 50
+
+
+def test_replay_forecasts_next_reviews():
+    # Arrange
+    now = datetime(2026, 1, 10)
+    reviews = [
+        (1, 4, now - timedelta(days=3)),
+        (1, 4, now - timedelta(days=2)),
+        (1, 5, now - timedelta(days=1)),
+        (2, 1, now - timedelta(hours=1)),
+    ]
+
+    # Act
+    workload = replay(reviews, forecast_days=5, now=now)
+
+    # Assert
+    # card 2 failed and is overdue (day 0), card 1 is at repetition 3:
+    # int(1440 * 2.5) minutes after its last review falls on day 1
+    assert workload.reviews.tolist() == [1, 1, 0, 0, 0]
+    assert workload.scheduled == 4
+
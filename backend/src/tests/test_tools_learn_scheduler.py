@@ -0,0 +1,254 @@
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.models import Progress
+from app.tools.learn import fsrs
+from app.tools.learn.scheduler import (
+    FSRSScheduler,
+    SM2Scheduler,
+    get_scheduler,
+    load_settings,
+    valid_desired_retention,
+    valid_fsrs_weights,
+)
+
+
+# ---------- Tests for scheduler selection ----------
+
+
+settings_data = [
+    (None, SM2Scheduler),
+    ("", SM2Scheduler),
+    ("not json", SM2Scheduler),
+    (json.dumps({"scheduler": "sm2"}), SM2Scheduler),
+    (json.dumps({"scheduler": "fsrs"}), FSRSScheduler),
+]
+
+
+@pytest.mark.parametrize("settings,expected", settings_data)
+def test_get_scheduler(settings, expected):
+    # Act
+    scheduler = get_scheduler(settings)
+
+    # Assert
+    assert isinstance(scheduler, expected)
+
+
+def test_get_scheduler_fsrs_settings():
+    # Arrange
+    weights = list(fsrs.DEFAULT_WEIGHTS)
+    weights[8] = 1.0
+    settings = json.dumps(
+        {"scheduler": "fsrs", "fsrs_weights": weights, "desired_retention": 0.8}
+    )
+
+    # Act
+    scheduler = get_scheduler(settings)
+
+    # Assert
+    assert scheduler.weights == weights
+    assert scheduler.desired_retention == 0.8
+
+
+def test_load_settings_ignores_non_object():
+    assert load_settings("[1, 2]") == {}
+
+
+invalid_weights_data = [
+    None,
+    "weights",
+    [1.0] * 16,
+    [1.0] * 17,
+    fsrs.DEFAULT_WEIGHTS[:-1] + ["2"],
+    fsrs.DEFAULT_WEIGHTS[:-1] + [True],
+]
+
+
+@pytest.mark.parametrize("weights", invalid_weights_data)
+def test_valid_fsrs_weights_rejects_invalid(weights):
+    assert valid_fsrs_weights(weights) is None
+
+
+@pytest.mark.parametrize("value", [None, "0.9", 0.5, 1.2, True])
+def test_valid_desired_retention_falls_back_to_default(value):
+    assert valid_desired_retention(value) == fsrs.DEFAULT_RETENTION
+
+
+def test_get_scheduler_invalid_fsrs_settings_uses_defaults():
+    # Arrange
+    settings = json.dumps(
+        {"scheduler": "fsrs", "fsrs_weights": [1.0] * 3, "desired_retention": 2}
+    )
+
+    # Act
+    scheduler = get_scheduler(settings)
+
+    # Assert
+    assert scheduler.weights == fsrs.DEFAULT_WEIGHTS
+    assert scheduler.desired_retention == fsrs.DEFAULT_RETENTION
+
+
+# ---------- Tests for FSRSScheduler ----------
+
+
+def test_fsrs_first_review_initializes_state():
+    # Arrange
+    progress = Progress()
+    now = datetime(2026, 1, 1)
+
+    # Act
+    next_date = FSRSScheduler().review(progress, 4, now)
+
+    # Assert
+    assert progress.stability == fsrs.DEFAULT_WEIGHTS[2]
+    assert progress.difficulty == fsrs.DEFAULT_WEIGHTS[4]
+    assert progress.repetition == 1
+    assert progress.correct_answers == 1
+    assert progress.last_review_date == now
+    assert next_date == now + timedelta(minutes=progress.interval)
+    assert progress.efactor == 2.5
+
+
+def test_fsrs_successful_review_grows_stability():
+    # Arrange
+    scheduler = FSRSScheduler()
+    progress = Progress()
+    now = datetime(2026, 1, 1)
+    next_date = scheduler.review(progress, 4, now)
+    stability = progress.stability
+
+    # Act
+    scheduler.review(progress, 4, next_date)
+
+    # Assert
+    assert progress.stability > stability
+    assert progress.interval > fsrs.DEFAULT_WEIGHTS[2] * 1440
+
+
+def test_fsrs_failed_review_relearns():
+    # Arrange
+    scheduler = FSRSScheduler()
+    progress = Progress()
+    now = datetime(2026, 1, 1)
+    next_date = scheduler.review(progress, 5, now)
+    stability = progress.stability
+
+    # Act
+    scheduler.review(progress, 1, next_date)
+
+    # Assert
+    assert progress.stability < stability
+    assert progress.repetition == 0
+    assert progress.incorrect_answers == 1
+    assert progress.interval == 10
+
+
+def test_fsrs_lower_retention_gives_longer_interval():
+    # Arrange
+    strict, relaxed = Progress(), Progress()
+    now = datetime(2026, 1, 1)
+
+    # Act
+    FSRSScheduler(desired_retention=0.95).review(strict, 4, now)
+    FSRSScheduler(desired_retention=0.8).review(relaxed, 4, now)
+
+    # Assert
+    assert relaxed.interval > strict.interval
+
+
+# ---------- Tests for fsrs formulas and optimizer ----------
+
+
+grade_data = [(0, 1), (2, 1), (3, 2), (4, 3), (5, 4)]
+
+
+@pytest.mark.parametrize("quality,grade", grade_data)
+def test_grade_from_quality(quality, grade):
+    assert fsrs.grade_from_quality(quality) == grade
+
+
+def test_retrievability_at_interval_equals_desired_retention():
+    # Arrange
+    stability = 10.0
+
+    # Act
+    interval = stability / fsrs.FACTOR * (0.9 ** (1 / fsrs.DECAY) - 1)
+
+    # Assert
+    assert fsrs.retrievability(interval, stability) == pytest.approx(0.9)
+    assert fsrs.retrievability(stability, stability) == pytest.approx(0.9)
+
+
+def synthetic_history(weights, cards=200, reviews_per_card=8, seed=0):
+    rng = np.random.default_rng(seed)
+    history = []
+    for card in range(cards):
+        date = datetime(2026, 1, 1)
+        stability = float(fsrs.initial_stability(weights, 3))
+        difficulty = float(fsrs.initial_difficulty(weights, 3))
+        history.append((card, 4, date))
+        for _ in range(reviews_per_card - 1):
+            elapsed = float(rng.uniform(1, 2 * max(stability, 1)))
+            date = date + timedelta(days=elapsed)
+            r = float(fsrs.retrievability(elapsed, stability))
+            grade = 3 if rng.random() < r else 1
+            stability = float(fsrs.next_stability(weights, difficulty, stability, r, grade))
+            difficulty = float(fsrs.next_difficulty(weights, difficulty, grade))
+            history.append((card, 4 if grade == 3 else 1, date))
+    return history
+
+
+def test_optimize_weights_short_history_keeps_initial():
+    # Arrange
+    history = synthetic_history(fsrs.DEFAULT_WEIGHTS, cards=2)
+
+    # Act
+    weights = fsrs.optimize_weights(history)
+
+    # Assert
+    assert weights == fsrs.DEFAULT_WEIGHTS
+
+
+def test_optimize_weights_reduces_loss():
+    # Arrange
+    true_weights = list(fsrs.DEFAULT_WEIGHTS)
+    true_weights[8] = 1.0
+    history = synthetic_history(true_weights)
+    waves = fsrs.prepare_history(history)
+
+    # Act
+    weights = fsrs.optimize_weights(history, iterations=5)
+
+    # Assert
+    assert fsrs.log_loss(weights, waves) < fsrs.log_loss(fsrs.DEFAULT_WEIGHTS, waves)
+    for weight, (low, high) in zip(weights, fsrs.WEIGHT_BOUNDS):
+        assert low <= weight <= high
+
+
+def test_optimize_weights_batch_returns_weights_per_user():
+    # Arrange
+    histories = {1: synthetic_history(fsrs.DEFAULT_WEIGHTS, cards=2), 2: []}
+
+    # Act
+    weights = fsrs.optimize_weights_batch(histories, max_workers=1)
+
+    # Assert
+    assert weights == {1: fsrs.DEFAULT_WEIGHTS, 2: fsrs.DEFAULT_WEIGHTS}
+
+
+def test_optimize_weights_batch_respects_min_reviews():
+    # Arrange
+    true_weights = list(fsrs.DEFAULT_WEIGHTS)
+    true_weights[8] = 1.0
+    history = synthetic_history(true_weights)
+
+    # Act
+    weights = fsrs.optimize_weights_batch(
+        {1: history}, max_workers=1, min_reviews=len(history) + 1
+    )
+
+    # Assert
+    assert weights == {1: fsrs.DEFAULT_WEIGHTS}
@@ -1,6 +1,6 @@
 import { RawCrudList } from "@/app/components/crudlist";
 import Pagination from "@/app/components/Pagination";
-import { Deck } from "@/app/lib/types";
+import { DeckListItem } from "@/app/lib/types";
 import { Box, Stack } from "@mui/material";
 import { useRouter } from 'next/navigation';
 import { useEffect, useState } from "react";
@@ -11,7 +11,7 @@ export const pageSize = 10;
 
 export default function SavedDecks() {
   const router = useRouter();
-  const [data, setData] = useState<Deck[]>();
+  const [data, setData] = useState<DeckListItem[]>();
   const [page, setPage] = useState(0);
   const [total, setTotal] = useState(0);
   const [refreshKey, setRefreshKey] = useState(0);
@@ -35,7 +35,7 @@ export default function SavedDecks() {
     data &&
     <Stack>
       <RawCrudList
-        data={data.map((el: Deck) => {
+        data={data.map((el: DeckListItem) => {
           return { "id": el.id, "name": el.name, "preview": el.description }
         })}
         showUpdateBtn={false}
@@ -1,9 +1,9 @@
 import { fetchAuthDELETE, fetchAuthGET } from "@/app/lib/fetch";
-import { Deck } from "@/app/lib/types";
+import { DeckListItem } from "@/app/lib/types";
 import { Dispatch, SetStateAction } from "react";
 
 export const getSavedDecks = (
-  setData: Dispatch<SetStateAction<Deck[] | undefined>>,
+  setData: Dispatch<SetStateAction<DeckListItem[] | undefined>>,
   page: number,
   setTotal: Dispatch<SetStateAction<number>>,
   pageSize: number
@@ -16,7 +16,7 @@ export const getSavedDecks = (
   fetchAuthGET(`decks/saved?page=${page + 1}&page_size=${pageSize}`, 200, onSuccess);
 }
 
-export const removeSavedDeck = (id: number, setData: Dispatch<SetStateAction<Deck[] | undefined>>) => {
+export const removeSavedDeck = (id: number, setData: Dispatch<SetStateAction<DeckListItem[] | undefined>>) => {
   const onSuccess = async () => {
     setData(prev => prev ? prev.filter(deck => deck.id !== id) : prev)
   }
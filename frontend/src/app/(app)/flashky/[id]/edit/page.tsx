@@ -28,7 +28,7 @@ import MovieIcon from "@mui/icons-material/Movie";
 import MoreIcon from '@mui/icons-material/More';
 import SearchIcon from '@mui/icons-material/Search';
 import { editFlashcard } from '../../lib/fetch';
-import { Deck, Flashcard, MediaInfo } from '@/app/lib/types';
+import { DeckSummary, Flashcard, MediaInfo } from '@/app/lib/types';
 import { fetchAuthGET } from '@/app/lib/fetch';
 import { useParams, useRouter } from 'next/navigation';
 import { Dispatch, SetStateAction } from 'react';
@@ -64,12 +64,12 @@ type CardEditorProps = {
 }
 
 type DeckSelectionProps = {
-  selectedDecks: Deck[];
-  setSelectedDecks: (list: Deck[]) => void;
-  decksToAdd: Deck[];
-  setDecksToAdd: (list: Deck[]) => void;
-  decksToRemove: Deck[];
-  setDecksToRemove: (list: Deck[]) => void;
+  selectedDecks: DeckSummary[];
+  setSelectedDecks: (list: DeckSummary[]) => void;
+  decksToAdd: DeckSummary[];
+  setDecksToAdd: (list: DeckSummary[]) => void;
+  decksToRemove: DeckSummary[];
+  setDecksToRemove: (list: DeckSummary[]) => void;
 }
 
 type AddTagsProps = {
@@ -293,7 +293,7 @@ CardEditor.displayName = 'CardEditor';
 
 const DeckSelection = React.memo(({ selectedDecks, setSelectedDecks, decksToAdd, setDecksToAdd, decksToRemove, setDecksToRemove }: DeckSelectionProps) => {
   const [queryString, setQueryString] = React.useState("");
-  const [searchDecks, setSearchDecks] = React.useState<Deck[]>([]);
+  const [searchDecks, setSearchDecks] = React.useState<DeckSummary[]>([]);
   const TOOLTIP_LENGTH = 50;
 
   const handleKeyDown = (event: React.KeyboardEvent<HTMLInputElement>) => {
@@ -320,7 +320,7 @@ const DeckSelection = React.memo(({ selectedDecks, setSelectedDecks, decksToAdd,
     }
   }
 
-  const deleteSelectedDeck = (deck: Deck) => {
+  const deleteSelectedDeck = (deck: DeckSummary) => {
     const id = deck.id;
     setSelectedDecks(selectedDecks.filter(d => d.id !== id));
     if (decksToAdd.some(d => d.id === id)) { // if true, this deck is not being added to after all
@@ -450,9 +450,9 @@ export default function EditFlashky() {
   const [frontMediaIdsToRemove, setFrontMediaIdsToRemove] = React.useState<number[]>([]);
   const [backMediaIdsToRemove, setBackMediaIdsToRemove] = React.useState<number[]>([]);
 
-  const [decks, setDecks] = React.useState<Deck[]>([]);
-  const [decksToAdd, setDecksToAdd] = React.useState<Deck[]>([]);
-  const [decksToRemove, setDecksToRemove] = React.useState<Deck[]>([]);
+  const [decks, setDecks] = React.useState<DeckSummary[]>([]);
+  const [decksToAdd, setDecksToAdd] = React.useState<DeckSummary[]>([]);
+  const [decksToRemove, setDecksToRemove] = React.useState<DeckSummary[]>([]);
 
   const [tags, setTags] = React.useState<string[]>([]);
   const [tagsToAdd, setTagsToAdd] = React.useState<string[]>([]);
@@ -480,7 +480,7 @@ export default function EditFlashky() {
 
     const onSuccessDeck = async (response: Response) => {
       const result = await response.json();
-      result.decks.map((d: Deck) => {
+      result.decks.map((d: DeckSummary) => {
         setDecks([...decks, d]);
       })
     }
@@ -24,7 +24,7 @@ import MovieIcon from "@mui/icons-material/Movie";
 import MoreIcon from '@mui/icons-material/More';
 import SearchIcon from '@mui/icons-material/Search';
 import { createFlashcard } from '../lib/fetch';
-import { Deck } from '@/app/lib/types';
+import { DeckSummary } from '@/app/lib/types';
 import { fetchAuthGET } from '@/app/lib/fetch';
 import { useRouter } from 'next/navigation';
 import { useState } from 'react';
@@ -46,8 +46,8 @@ type CardEditorProps = {
 }
 
 type DeckSelectionProps = {
-  selectedDecks: Deck[];
-  setSelectedDecks: (list: Deck[]) => void;
+  selectedDecks: DeckSummary[];
+  setSelectedDecks: (list: DeckSummary[]) => void;
 }
 
 type AddTagsProps = {
@@ -144,7 +144,7 @@ CardEditor.displayName = 'CardEditor';
 
 const DeckSelection = React.memo(({ selectedDecks, setSelectedDecks }: DeckSelectionProps) => {
   const [queryString, setQueryString] = useState("");
-  const [searchDecks, setSearchDecks] = useState<Deck[]>([]);
+  const [searchDecks, setSearchDecks] = useState<DeckSummary[]>([]);
   const TOOLTIP_LENGTH = 50;
 
   const handleKeyDown = (event: React.KeyboardEvent<HTMLInputElement>) => {
@@ -266,7 +266,7 @@ export default function NewFlashkyInner({ deckId }: Props) {
   const frontFileInputRef = React.useRef<HTMLInputElement>(null);
   const backFileInputRef = React.useRef<HTMLInputElement>(null);
 
-  const [decks, setDecks] = useState<Deck[]>([]);
+  const [decks, setDecks] = useState<DeckSummary[]>([]);
   const [tags, setTags] = useState<string[]>([]);
 
   const { isAuthenticated } = useAuth()
@@ -1,7 +1,7 @@
 import { RequestBodyType } from "@/app/lib/fetchOptions";
 import { fetchAuthDELETE, fetchAuthGET, fetchAuthPOST, fetchAuthPUT, OK } from "@/app/lib/fetch";
 import { Dispatch, SetStateAction } from "react";
-import { Deck, DeckUpdateDTO, Flashcard, FlashcardEditDTO, FlashcardSideCreateDTO, MediaInfo, MediaUpdateDTO } from "@/app/lib/types";
+import { DeckSummary, DeckUpdateDTO, Flashcard, FlashcardEditDTO, FlashcardSideCreateDTO, MediaInfo, MediaUpdateDTO } from "@/app/lib/types";
 
 export const getFlashcard = async (id: number, setData: Dispatch<SetStateAction<Flashcard | undefined>>, setIsOwned: Dispatch<SetStateAction<boolean>>) => {
     const onSuccess = async (response: Response) => {
@@ -33,12 +33,12 @@ export const deleteMedia = async (mediaId: number) => {
     fetchAuthDELETE(`media/${mediaId}`, OK);
 }
 
-const addToDeck = async (id: number, deck: Deck) => {
+const addToDeck = async (id: number, deck: DeckSummary) => {
     const editedDeck: DeckUpdateDTO = { name: deck.name, description: deck.description, public: deck.public, flashcards_to_add: [id], flashcards_to_remove: [], tags_to_add: [], tags_to_remove: [] };
     fetchAuthPUT("decks/" + deck.id, 200, RequestBodyType.JSON, editedDeck);
 }
 
-const removeFromDeck = async (id: number, deck: Deck) => {
+const removeFromDeck = async (id: number, deck: DeckSummary) => {
     const editedDeck: DeckUpdateDTO = { name: deck.name, description: deck.description, public: deck.public, flashcards_to_add: [], flashcards_to_remove: [id], tags_to_add: [], tags_to_remove: [] };
     fetchAuthPUT("decks/" + deck.id, 200, RequestBodyType.JSON, editedDeck);
 }
@@ -50,7 +50,7 @@ export const createFlashcard = async (
     frontMediaFiles: File[],
     backMediaFiles: File[],
     tags: string[],
-    decks: Deck[],
+    decks: DeckSummary[],
 ) => {
     const content = {
         "name": name,
@@ -87,8 +87,8 @@ export const editFlashcard = async (
     backMediaToRemove: number[],
     tagsToAdd: string[],
     tagsToRemove: string[],
-    decksToAdd: Deck[],
-    decksToRemove: Deck[],
+    decksToAdd: DeckSummary[],
+    decksToRemove: DeckSummary[],
 ) => {
     const front: FlashcardSideCreateDTO = { content: frontText };
     const back: FlashcardSideCreateDTO = { content: backText };
@@ -8,7 +8,7 @@ import { AppRouterInstance } from "next/dist/shared/lib/app-router-context.share
 
 type AuthContextType = {
   isAuthenticated: boolean | null;
-  login: (token: string) => void;
+  login: (token: string, refreshToken?: string) => void;
   logout: () => void;
 };
 
@@ -23,13 +23,16 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
         checkToken(setIsAuthenticated);
     }, [])
 
-    const login = (token: string) => {
+    const login = (token: string, refreshToken?: string) => {
         localStorage.setItem('token', token);
+        if (refreshToken)
+            localStorage.setItem('refresh_token', refreshToken);
         setIsAuthenticated(true);
     };
 
     const logout = () => {
         localStorage.removeItem('token');
+        localStorage.removeItem('refresh_token');
         setIsAuthenticated(false);
     };
 
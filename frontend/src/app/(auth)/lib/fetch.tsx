@@ -8,7 +8,7 @@ export const loginFetch = async (
     username: string,
     password: string,
     router: AppRouterInstance,
-    updateContext: (token: string) => void,
+    updateContext: (token: string, refreshToken?: string) => void,
     showDialog: ShowDialog
 ) => {
     const body = {
@@ -18,7 +18,7 @@ export const loginFetch = async (
     const onSuccess = async (response: Response) => {
         const result = await response.json()
         if (result['token']) {
-            updateContext(result['token'])
+            updateContext(result['token'], result['refresh_token'])
             if (result['is_mod'])
                 router.push("/users");
             else
@@ -41,7 +41,7 @@ export const registerFetch = async (
     email: string,
     password: string,
     router: AppRouterInstance,
-    updateContext: (token: string) => void,
+    updateContext: (token: string, refreshToken?: string) => void,
     showDialog: ShowDialog
 ) => {
     const body = {
@@ -52,7 +52,7 @@ export const registerFetch = async (
     const onSuccess = async (response: Response) => {
         const result = await response.json()
         if (result['token']) {
-            updateContext(result['token'])
+            updateContext(result['token'], result['refresh_token'])
             router.push("/");
         }
         else {
@@ -90,7 +90,11 @@ export const logoutFetch = async (
         updateContext()
         router.push("/");
     }
-    fetchAuthPOST("logout", OK, RequestBodyType.EMPTY, undefined, onSuccess);
+    const refreshToken = localStorage.getItem("refresh_token");
+    if (refreshToken)
+        fetchAuthPOST("logout", OK, RequestBodyType.JSON, { "refresh_token": refreshToken }, onSuccess);
+    else
+        fetchAuthPOST("logout", OK, RequestBodyType.EMPTY, undefined, onSuccess);
 }
 
 export const checkToken = (setIsAuthenticated: Dispatch<SetStateAction<boolean | null>>) => {
@@ -105,6 +109,7 @@ export const checkToken = (setIsAuthenticated: Dispatch<SetStateAction<boolean |
         async () => { setIsAuthenticated(true) },
         async () => {
             localStorage.removeItem("token");
+            localStorage.removeItem("refresh_token");
             setIsAuthenticated(false);
         }
     )
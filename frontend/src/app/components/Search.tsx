@@ -12,7 +12,7 @@ import CloseIcon from "@mui/icons-material/Close";
 
 import { useState, useEffect } from 'react';
 import { RawCrudList } from "./crudlist";
-import { Deck } from "../lib/types";
+import { DeckListItem } from "../lib/types";
 import { fetchAuthGET, fetchAuthPOST } from "../lib/fetch";
 
 import { useRouter } from 'next/navigation';
@@ -32,7 +32,7 @@ export default function Search({ query }: { query: string }) {
   const [pageSize] = useState(20);
   const [sort, setSort] = useState(0);
 
-  const [decks, setDecks] = useState<Deck[]>([]);
+  const [decks, setDecks] = useState<DeckListItem[]>([]);
   const [total, setTotal] = useState(0);
   const [loading, setLoading] = useState(false);
 
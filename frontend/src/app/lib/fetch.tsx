@@ -2,6 +2,54 @@ import { BASE_URL } from "../constants";
 import { deleteRequestOptionsAuthorized, getRequestOptionsAuthorized, RequestBodyType, RequestOptions, requestWithBodyOptionsAuthorized } from "./fetchOptions";
 
 export const OK = 200;
+export const UNAUTHORIZED = 401;
+
+const NO_REFRESH_URLS = ["login", "register", "refresh"];
+
+// Shared by concurrent requests, a refresh token can be used only once.
+let refreshPromise: Promise<boolean> | null = null;
+
+const refreshAccessToken = async (): Promise<boolean> => {
+    const refreshToken = localStorage.getItem("refresh_token");
+    if (!refreshToken) {
+        return false;
+    }
+
+    const headers = new Headers();
+    headers.append("Content-Type", "application/json");
+    const response = await fetch(`${BASE_URL}refresh`, {
+        method: "POST",
+        headers: headers,
+        body: JSON.stringify({ "refresh_token": refreshToken })
+    });
+
+    if (response.status !== OK) {
+        localStorage.removeItem("refresh_token");
+        return false;
+    }
+
+    const result = await response.json();
+    localStorage.setItem("token", result["token"]);
+    localStorage.setItem("refresh_token", result["refresh_token"]);
+    return true;
+}
+
+const fetchWithRefresh = async (url: string, options: RequestOptions) => {
+    const response = await fetch(`${BASE_URL}${url}`, options);
+    if (response.status !== UNAUTHORIZED
+        || !options.headers.has("Authorization")
+        || NO_REFRESH_URLS.includes(url)) {
+        return response;
+    }
+
+    refreshPromise ??= refreshAccessToken().finally(() => { refreshPromise = null; });
+    if (!(await refreshPromise)) {
+        return response;
+    }
+
+    options.headers.set("Authorization", `Bearer ${localStorage.getItem("token")}`);
+    return fetch(`${BASE_URL}${url}`, options);
+}
 
 export const fetchLib = async (
     options: RequestOptions,
@@ -11,7 +59,7 @@ export const fetchLib = async (
     onFail?: (response: Response) => Promise<void>,
 ) => {
     try {
-        const response = await fetch(`${BASE_URL}${url}`, options);
+        const response = await fetchWithRefresh(url, options);
         if (response.status === expectedStatusCode) {
             await onSuccess?.(response);
         }
@@ -64,13 +64,22 @@ export type DeckUpdateDTO = {
   tags_to_remove: string[]
 }
 
-export type Deck = {
+export type DeckSummary = {
   id: number,
   name: string,
   description: string,
   public: boolean,
   has_media: boolean,
   owner_id: number,
-  tags: string[],
+  tags: string[]
+}
+
+export type Deck = DeckSummary & {
   flashcards: FlashcardInDeck[]
+}
+
+export type DeckListItem = DeckSummary & {
+  flashcards_count: number,
+  saves_count: number,
+  comments_count: number
 }
\ No newline at end of file